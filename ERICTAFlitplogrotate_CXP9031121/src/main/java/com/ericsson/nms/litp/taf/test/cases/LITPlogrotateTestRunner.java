@@ -69,16 +69,23 @@ public class LITPlogrotateTestRunner extends TorTestCaseHelper {
      * @param className
      * @param name
      * @param failures
+     * @param time
+     * @param properties
      */
     @TestId(id = "CXP9031121-3", title = "Parse xml outputs from python tests")
     @DataDriven(name = "surefire-reports")
     @Test(groups={"ACCEPTANCE"})
     public void parseNosetestsReports(@Input("classname") String className, @Input("name") String name,
             @Input("failures") List<Map<String, String>> failures, @Input("errors") List<Map<String, String>> errors,
-            @Input("skipped") List<Map<String, Object>> skipped){
+            @Input("skipped") List<Map<String, Object>> skipped, @Input("time") String time,
+            @Input("properties") Map<String, String> properties){
         logger.debug("TestCase:");
         logger.debug("    classname:" + className);
         logger.debug("    name:" + name);
+        logger.info(className + ":" + name + " took " + time + "s");
+        for (Map.Entry<String, String> property : properties.entrySet()) {
+            logger.info("    " + property.getKey() + ": " + property.getValue());
+        }
         setTestcase(className + ":" + name, "");
         setTestInfo(name);
         for (Map<String, String> failure : failures) {
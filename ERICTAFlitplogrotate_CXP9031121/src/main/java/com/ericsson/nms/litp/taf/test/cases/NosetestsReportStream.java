@@ -0,0 +1,345 @@
+package com.ericsson.nms.litp.taf.test.cases;
+
+import java.io.File;
+import java.io.FileInputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.lang.reflect.Method;
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.NoSuchElementException;
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.BlockingQueue;
+
+import javax.xml.parsers.SAXParserFactory;
+
+import org.apache.log4j.Logger;
+import org.xml.sax.Attributes;
+import org.xml.sax.InputSource;
+import org.xml.sax.SAXException;
+import org.xml.sax.helpers.DefaultHandler;
+
+import com.ericsson.cifwk.taf.annotations.DataSource;
+import com.ericsson.cifwk.taf.data.DataHandler;
+
+/**
+ * Data source for the surefire-reports data provider that streams the
+ * testcases of a nosetests xunit report.
+ *
+ * The report is parsed with SAX on a separate thread which hands each
+ * testcase over through a bounded queue as soon as its closing tag has been
+ * read, so memory use does not grow with the number of testcases.
+ * nosetests only writes the report once the run has ended, so it is read
+ * after runERIClitplogrotateTests has returned; a missing report fails the
+ * data source straight away rather than being waited for.
+ *
+ * Each record has the keys classname, name, time, failures, errors,
+ * skipped and properties, the latter holding the step timings merged into
+ * the report by perf_utils.py.
+ *
+ * The report is the file named by the surefire-reports.file attribute.
+ * Without it the records of ReportConsumer, the operators' data source
+ * which knows where PythonTestRunner leaves the report, are returned
+ * instead, with empty properties where it has none.
+ */
+public class NosetestsReportStream implements Iterable<Map<String, Object>> {
+
+    /** TAF attribute giving the path of the report. */
+    public static final String REPORT_ATTRIBUTE = "surefire-reports.file";
+
+    /** Data source used when the attribute is not set. */
+    public static final String REPORT_CONSUMER =
+            "com.ericsson.nms.litp.taf.operators.ReportConsumer";
+
+    private static final int QUEUE_CAPACITY = 256;
+
+    /** Queued after the last testcase. */
+    private static final Map<String, Object> END =
+            Collections.<String, Object>emptyMap();
+
+    private static final Logger logger =
+            Logger.getLogger(NosetestsReportStream.class);
+
+    private final File report;
+
+    public NosetestsReportStream() {
+        this(getReport());
+    }
+
+    /**
+     * @param report the report to read, or null for the records of
+     *            ReportConsumer
+     */
+    public NosetestsReportStream(File report) {
+        this.report = report;
+    }
+
+    private static File getReport() {
+        Object path = DataHandler.getAttribute(REPORT_ATTRIBUTE);
+        return path == null ? null : new File(path.toString());
+    }
+
+    /**
+     * @return the testcases of the report, read as they are iterated
+     */
+    @DataSource
+    public Iterable<Map<String, Object>> testcases() {
+        return this;
+    }
+
+    @Override
+    public Iterator<Map<String, Object>> iterator() {
+        if (report == null) {
+            return new ConsumerIterator(getConsumerRecords().iterator());
+        }
+        if (!report.isFile()) {
+            throw new IllegalStateException("No nosetests report " + report
+                    + ", did the python test run complete?");
+        }
+        return new RecordIterator();
+    }
+
+    /**
+     * @return the records of ReportConsumer's data source
+     */
+    @SuppressWarnings("unchecked")
+    private static Iterable<Map<String, Object>> getConsumerRecords() {
+        try {
+            Class<?> consumer = Class.forName(REPORT_CONSUMER);
+            Object instance = consumer.newInstance();
+            for (Method method : consumer.getMethods()) {
+                if (method.isAnnotationPresent(DataSource.class)
+                        && method.getParameterTypes().length == 0) {
+                    return (Iterable<Map<String, Object>>)
+                            method.invoke(instance);
+                }
+            }
+            if (instance instanceof Iterable) {
+                return (Iterable<Map<String, Object>>) instance;
+            }
+        } catch (Exception e) {
+            throw new IllegalStateException("Cannot read the records of "
+                    + REPORT_CONSUMER + ", set " + REPORT_ATTRIBUTE
+                    + " to the nosetests report instead", e);
+        }
+        throw new IllegalStateException(REPORT_CONSUMER
+                + " has no data source, set " + REPORT_ATTRIBUTE
+                + " to the nosetests report instead");
+    }
+
+    /**
+     * Passes on the records of ReportConsumer, adding empty properties to
+     * those which have none.
+     */
+    private static class ConsumerIterator
+            implements Iterator<Map<String, Object>> {
+
+        private final Iterator<Map<String, Object>> records;
+
+        ConsumerIterator(Iterator<Map<String, Object>> records) {
+            this.records = records;
+        }
+
+        @Override
+        public boolean hasNext() {
+            return records.hasNext();
+        }
+
+        @Override
+        public Map<String, Object> next() {
+            Map<String, Object> record = records.next();
+            if (record.get("properties") != null) {
+                return record;
+            }
+            Map<String, Object> copy = new HashMap<String, Object>(record);
+            copy.put("properties", new LinkedHashMap<String, String>());
+            return copy;
+        }
+
+        @Override
+        public void remove() {
+            throw new UnsupportedOperationException();
+        }
+    }
+
+    /**
+     * Iterates over the records queued by a parser thread of its own.
+     */
+    private class RecordIterator implements Iterator<Map<String, Object>> {
+
+        private final BlockingQueue<Map<String, Object>> queue =
+                new ArrayBlockingQueue<Map<String, Object>>(QUEUE_CAPACITY);
+        private volatile Exception failure;
+        private Map<String, Object> next;
+
+        RecordIterator() {
+            Thread parser = new Thread(new Runnable() {
+                @Override
+                public void run() {
+                    parse();
+                }
+            }, "nosetests-report-parser");
+            parser.setDaemon(true);
+            parser.start();
+        }
+
+        private void parse() {
+            InputStream input = null;
+            try {
+                input = new FileInputStream(report);
+                SAXParserFactory.newInstance().newSAXParser().parse(
+                        new InputSource(input), new ReportHandler(queue));
+            } catch (Exception e) {
+                failure = e;
+            } finally {
+                if (input != null) {
+                    try {
+                        input.close();
+                    } catch (IOException e) {
+                        logger.warn("Failed to close " + report, e);
+                    }
+                }
+                putEnd();
+            }
+        }
+
+        private void putEnd() {
+            try {
+                queue.put(END);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+            }
+        }
+
+        @Override
+        public boolean hasNext() {
+            if (next == null) {
+                try {
+                    next = queue.take();
+                } catch (InterruptedException e) {
+                    Thread.currentThread().interrupt();
+                    throw new IllegalStateException(
+                            "Interrupted while reading " + report, e);
+                }
+            }
+            if (next == END) {
+                // Keep returning the end of the stream on later calls
+                queue.offer(END);
+                next = null;
+                if (failure != null) {
+                    throw new IllegalStateException(
+                            "Failed to parse " + report, failure);
+                }
+                return false;
+            }
+            return true;
+        }
+
+        @Override
+        public Map<String, Object> next() {
+            if (!hasNext()) {
+                throw new NoSuchElementException();
+            }
+            Map<String, Object> record = next;
+            next = null;
+            return record;
+        }
+
+        @Override
+        public void remove() {
+            throw new UnsupportedOperationException();
+        }
+    }
+
+    /**
+     * Builds one record per testcase element and queues it once the
+     * element is closed.
+     */
+    private static class ReportHandler extends DefaultHandler {
+
+        private final BlockingQueue<Map<String, Object>> queue;
+        private Map<String, Object> record;
+        private Map<String, Object> result;
+        private StringBuilder text;
+
+        ReportHandler(BlockingQueue<Map<String, Object>> queue) {
+            this.queue = queue;
+        }
+
+        @Override
+        public void startElement(String uri, String localName, String qName,
+                Attributes attributes) {
+            if ("testcase".equals(qName)) {
+                record = new HashMap<String, Object>();
+                record.put("classname", attributes.getValue("classname"));
+                record.put("name", attributes.getValue("name"));
+                record.put("time", attributes.getValue("time"));
+                record.put("failures", new ArrayList<Map<String, String>>());
+                record.put("errors", new ArrayList<Map<String, String>>());
+                record.put("skipped", new ArrayList<Map<String, Object>>());
+                record.put("properties", new LinkedHashMap<String, String>());
+            } else if (record == null) {
+                return;
+            } else if ("failure".equals(qName) || "error".equals(qName)) {
+                result = new HashMap<String, Object>();
+                result.put("type", attributes.getValue("type"));
+                result.put("message", attributes.getValue("message"));
+                text = new StringBuilder();
+            } else if ("skipped".equals(qName)) {
+                result = new HashMap<String, Object>();
+                result.put("type", 1);
+                result.put("message", attributes.getValue("message"));
+            } else if ("property".equals(qName)) {
+                getMap("properties").put(attributes.getValue("name"),
+                        attributes.getValue("value"));
+            }
+        }
+
+        @Override
+        public void characters(char[] ch, int start, int length) {
+            if (text != null) {
+                text.append(ch, start, length);
+            }
+        }
+
+        @Override
+        public void endElement(String uri, String localName, String qName)
+                throws SAXException {
+            if (record == null) {
+                return;
+            } else if ("testcase".equals(qName)) {
+                try {
+                    queue.put(record);
+                } catch (InterruptedException e) {
+                    Thread.currentThread().interrupt();
+                    throw new SAXException(e);
+                }
+                record = null;
+            } else if ("failure".equals(qName) || "error".equals(qName)) {
+                result.put("text", text.toString());
+                getList(qName.equals("failure") ? "failures" : "errors")
+                        .add(result);
+                result = null;
+                text = null;
+            } else if ("skipped".equals(qName)) {
+                getList("skipped").add(result);
+                result = null;
+            }
+        }
+
+        @SuppressWarnings("unchecked")
+        private Map<String, String> getMap(String key) {
+            return (Map<String, String>) record.get(key);
+        }
+
+        @SuppressWarnings({"unchecked", "rawtypes"})
+        private List<Map<String, Object>> getList(String key) {
+            return (List) record.get(key);
+        }
+    }
+}
@@ -0,0 +1,260 @@
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Parsers for the output of the litp CLI and helpers built on
+            top of them.
+'''
+
+import collections
+import re
+import time
+
+PLAN_TERMINAL_STATES = ['Successful', 'Failed', 'Stopped', 'Invalid']
+
+TASK_STATES = ['Initial', 'Running', 'Success', 'Failed', 'Stopped']
+
+_PHASE_RE = re.compile(r'^Phase (\d+)$')
+_TASK_RE = re.compile(r'^({0})\s+(/\S*)$'.format('|'.join(TASK_STATES)))
+_PLAN_STATUS_RE = re.compile(r'^Plan Status:\s*(\w+)')
+_ITEM_PATH_RE = re.compile(r'^/\S*$')
+_ERROR_RE = re.compile(r'^(\w+Error)(?: in property: "([^"]*)")?\s+(.*)$')
+
+
+def parse_plan_output(stdout):
+    """
+    Description:
+        Parse the output of "litp show_plan".
+    Args:
+        stdout (list): output lines of show_plan
+    Returns:
+        tuple. (plan status, tasks) where tasks is a list of dicts with
+        the keys phase, state, path and desc, in plan order. The plan
+        status is None if it could not be found.
+    """
+    status = None
+    tasks = []
+    phase = None
+    task = None
+    for line in stdout:
+        line = line.strip()
+        match = _PHASE_RE.match(line)
+        if match:
+            phase = int(match.group(1))
+            task = None
+            continue
+        match = _TASK_RE.match(line)
+        if match:
+            task = {'phase': phase, 'state': match.group(1),
+                    'path': match.group(2), 'desc': ''}
+            tasks.append(task)
+            continue
+        match = _PLAN_STATUS_RE.match(line)
+        if match:
+            status = match.group(1)
+            task = None
+            continue
+        if task is not None and line and not task['desc']:
+            task['desc'] = line
+    return status, tasks
+
+
+def parse_error_output(stderr):
+    """
+    Description:
+        Parse the error output of a litp command into (path, msg) records.
+        An item path line applies to the message on the line after it;
+        messages not preceded by a path, such as usage errors, have the
+        path None.
+    Args:
+        stderr (list): error output lines
+    Returns:
+        list. (path, msg) tuples in output order. A path not followed by
+        any message gives a (path, None) record.
+    """
+    records = []
+    path = None
+    for line in stderr:
+        if path is None and _ITEM_PATH_RE.match(line):
+            path = line
+            continue
+        records.append((path, line))
+        path = None
+    if path is not None:
+        records.append((path, None))
+    return records
+
+
+def diff_errors(records, expected):
+    """
+    Description:
+        Compare error records with the expected ones as multisets: order
+        does not matter but each expected record must occur as many times
+        as it is expected.
+    Args:
+        records (list): (path, msg) tuples as returned by
+                        parse_error_output
+        expected (list): expected (path, msg) tuples
+    Returns:
+        tuple. (missing, unexpected) lists of records, both empty if the
+        records match.
+    """
+    actual = collections.Counter(records)
+    wanted = collections.Counter(expected)
+    return list((wanted - actual).elements()), \
+        list((actual - wanted).elements())
+
+
+class ErrorIndex(object):
+    """
+    Typed records of the error output of a litp command, such as
+    create_plan or update, indexed by item path and by error type.
+
+    Each record is a dict with the keys path, type, prop and msg, e.g.
+    ValidationError, MissingRequiredPropertyError or InvalidRequestError
+    for type and the property name the error is reported against for prop.
+    Lines which are not LITP errors, such as usage errors, have the type
+    None and the whole line as msg.
+    """
+
+    def __init__(self, stderr):
+        """
+        Args:
+            stderr (list): error output lines
+        """
+        self.records = []
+        self.by_path = {}
+        self.type_counts = collections.Counter()
+        for path, line in parse_error_output(stderr):
+            match = _ERROR_RE.match(line or '')
+            if match:
+                record = {'path': path, 'type': match.group(1),
+                          'prop': match.group(2), 'msg': match.group(3)}
+            else:
+                record = {'path': path, 'type': None, 'prop': None,
+                          'msg': line}
+            self.records.append(record)
+            self.by_path.setdefault(path, []).append(record)
+            self.type_counts[record['type']] += 1
+
+    def errors_on(self, path):
+        """
+        Args:
+            path (str): item path
+        Returns:
+            list. Records reported against the item, in output order.
+        """
+        return self.by_path.get(path, [])
+
+    def count(self, err_type, path=None, prop=None):
+        """
+        Description:
+            Count the errors of a type, optionally only those on an item
+            or against a property.
+        Args:
+            err_type (str): error type, e.g. ValidationError
+            path (str): only count errors on this item
+            prop (str): only count errors against this property
+        Returns:
+            int. Number of matching errors.
+        """
+        if path is None and prop is None:
+            return self.type_counts[err_type]
+        records = self.records if path is None else self.errors_on(path)
+        return len([record for record in records
+                    if record['type'] == err_type and
+                    (prop is None or record['prop'] == prop)])
+
+
+class PlanWatcher(object):
+    """
+    Follows a running plan by polling show_plan with an adaptive interval:
+    short while tasks are changing state, backing off while nothing moves.
+    Every plan and task state change is recorded with its time.
+    """
+
+    def __init__(self, show_plan, min_interval=1.0, max_interval=10.0,
+                 backoff=1.5):
+        """
+        Args:
+            show_plan (callable): returns the output lines of show_plan
+            min_interval (float): poll interval while the plan progresses
+            max_interval (float): longest poll interval
+            backoff (float): interval growth factor while idle
+        """
+        self.show_plan = show_plan
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.transitions = []
+        self._status = None
+        self._states = {}
+
+    def _record(self, status, tasks):
+        """
+        Description:
+            Record plan and task state changes since the last poll.
+        Returns:
+            bool. True if anything changed.
+        """
+        now = time.time()
+        changed = False
+        if status != self._status:
+            self.transitions.append((now, 'plan', self._status, status))
+            self._status = status
+            changed = True
+        for task in tasks:
+            key = (task['phase'], task['path'], task['desc'])
+            if self._states.get(key) != task['state']:
+                self.transitions.append(
+                    (now, task['desc'], self._states.get(key),
+                     task['state']))
+                self._states[key] = task['state']
+                changed = True
+        return changed
+
+    def wait(self, timeout_secs, task_desc=None, task_state=None):
+        """
+        Description:
+            Wait for the plan to reach a terminal state or, if task_desc
+            is given, for that task to reach task_state. Returns as soon
+            as the plan is terminal, whatever the terminal state is.
+        Args:
+            timeout_secs (int): longest time to wait
+            task_desc (str): description of a task to wait for
+            task_state (str): state the task must reach
+        Returns:
+            tuple. (plan status, task reached) from the last poll.
+        """
+        deadline = time.time() + timeout_secs
+        interval = self.min_interval
+        while True:
+            status, tasks = parse_plan_output(self.show_plan())
+            changed = self._record(status, tasks)
+            if task_desc is not None and [
+                    task for task in tasks if task['desc'] == task_desc
+                    and task['state'] == task_state]:
+                return status, True
+            if status in PLAN_TERMINAL_STATES or time.time() > deadline:
+                return status, False
+            if changed:
+                interval = self.min_interval
+            else:
+                interval = min(interval * self.backoff, self.max_interval)
+            time.sleep(interval)
+
+    def format_transitions(self):
+        """
+        Returns:
+            str. One line per recorded state change.
+        """
+        return '\n'.join(
+            ['{0} {1}: {2} -> {3}'.format(
+                time.strftime('%H:%M:%S', time.localtime(stamp)),
+                what, old, new)
+             for stamp, what, old, new in self.transitions])
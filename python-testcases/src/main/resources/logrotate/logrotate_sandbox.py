@@ -0,0 +1,419 @@
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Runs the local logrotate on a logrotate-rule's rendered
+            configuration inside a private directory, so that rotation
+            behaviour (rotate, copytruncate, dateext, compress, globbing,
+            sharedscripts, scripts) can be checked without peer nodes.
+
+            The rule's scripts are not run: each is replaced by a command
+            printing the script's name and arguments, so that a sandbox
+            never restarts services on the host it runs on, and mail is
+            turned off. Paths in the results are given as on the node.
+
+            Every sandbox has its own directory tree, configuration and
+            state file, so any number of them can run side by side. Time
+            is simulated: with faketime installed logrotate runs at the
+            sandbox's clock, and as faketime does not fake file times the
+            files logrotate writes are given the sandbox's time after each
+            run. Otherwise logrotate runs at the real time and the rotation
+            times of the state file and the mtimes of the files in the
+            sandbox are backdated by the time the clock was advanced, for
+            the daily/weekly/monthly/yearly and maxage decisions. dateext
+            names would still use the real date, so dateext rules raise
+            FaketimeRequiredError without faketime.
+
+            with LogrotateSandbox({'name': 'r1', 'path': '/var/log/r1.log',
+                                   'rotate': '2', 'compress': 'true',
+                                   'rotate_every': 'day'}) as sandbox:
+                sandbox.write_log('/var/log/r1.log', 10)
+                sandbox.advance(days=1)
+                result = sandbox.rotate()
+'''
+
+import datetime
+import glob
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from multiprocessing.pool import ThreadPool
+import logrotate_utils
+
+LOGROTATE = '/usr/sbin/logrotate'
+
+# An absolute faketime timestamp, which stops the clock at that time for
+# the whole run rather than starting it there
+FAKETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Body given to each script of a rule in the sandbox, "{0}" is replaced by
+# the script's name; logrotate passes the logs as arguments
+SCRIPT_RECORDER = '/bin/echo {0} "$@"'
+
+_STATE_LINE_RE = re.compile(
+    r'^("(?:[^"\\]|\\.)*") (\d+)-(\d+)-(\d+)(?:-(\d+):(\d+):(\d+))?$')
+
+
+def _find_executable(name):
+    """
+    Description:
+        Look for an executable on PATH.
+    Args:
+        name (str): executable name
+    Returns:
+        str. Its path, or None if it was not found.
+    """
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+    return None
+
+
+def is_available(logrotate=LOGROTATE):
+    """
+    Description:
+        Check whether a sandbox can run logrotate on this host.
+    Args:
+        logrotate (str): logrotate binary
+    Returns:
+        bool. True if the binary exists and is executable.
+    """
+    return os.path.isfile(logrotate) and os.access(logrotate, os.X_OK)
+
+
+class FaketimeRequiredError(Exception):
+    """
+    Raised when a rule cannot be rotated at the sandbox's time without
+    faketime.
+    """
+
+
+def _timestamp(stamp):
+    """
+    Returns:
+        float. Local datetime stamp as seconds since the epoch.
+    """
+    return time.mktime(stamp.timetuple()) + stamp.microsecond / 1e6
+
+
+def shift_state(lines, delta):
+    """
+    Description:
+        Move every rotation time in a logrotate state file back in time.
+    Args:
+        lines (list): lines of the state file
+        delta (datetime.timedelta): how far back to move them
+    Returns:
+        list. The lines of the shifted state file.
+    """
+    shifted = []
+    for line in lines:
+        match = _STATE_LINE_RE.match(line)
+        if not match:
+            shifted.append(line)
+            continue
+        fields = [int(field or 0) for field in match.groups()[1:]]
+        stamp = datetime.datetime(*fields) - delta
+        shifted.append('{0} {1}-{2}-{3}-{4}:{5}:{6}'.format(
+            match.group(1), stamp.year, stamp.month, stamp.day,
+            stamp.hour, stamp.minute, stamp.second))
+    return shifted
+
+
+class LogrotateSandbox(object):
+    """
+    A private directory tree in which the logrotate configuration of a
+    single logrotate-rule is run against test log files.
+    """
+
+    def __init__(self, props, root_dir=None, logrotate=LOGROTATE,
+                 clock=None, faketime=None, run_scripts=False,
+                 fs_dir=None):
+        """
+        Args:
+            props (dict): logrotate-rule properties, with paths as on a
+                          node; path and olddir are moved into the
+                          sandbox, see configure
+            root_dir (str): directory of the sandbox, a new temporary
+                            directory if None
+            logrotate (str): logrotate binary
+            clock (datetime.datetime): initial time of the sandbox's
+                                       clock, now if None
+            faketime (str): faketime binary, looked up on PATH if None;
+                            "" to backdate the state file and the file
+                            times instead
+            run_scripts (bool): run the rule's scripts and send its mail
+                                as configured, only for rules whose
+                                scripts are safe to run on this host
+            fs_dir (str): directory node paths are mapped into,
+                          <root_dir>/fs if None; it is not deleted by
+                          cleanup if outside root_dir
+        """
+        self.root_dir = root_dir or tempfile.mkdtemp(
+            prefix='logrotate_sandbox_')
+        self._makedirs(self.root_dir)
+        self.fs_dir = fs_dir or os.path.join(self.root_dir, 'fs')
+        self.logrotate = logrotate
+        self.now = clock or datetime.datetime.now()
+        self.faketime = _find_executable('faketime') if faketime is None \
+            else faketime
+        self.run_scripts = run_scripts
+        self.conf_file = os.path.join(self.root_dir, 'logrotate.conf')
+        self.state_file = os.path.join(self.root_dir, 'logrotate.status')
+        # Sandbox time less the time logrotate sees file times at
+        self._offset = datetime.timedelta(0) if self.faketime else \
+            self.now - datetime.datetime.now()
+        self.props = None
+        self.configure(props)
+
+    def configure(self, props):
+        """
+        Description:
+            Write the sandbox's configuration for a rule, as a plan
+            creating or updating the logrotate-rule would. Log files and
+            the state file are kept. Unless the sandbox runs scripts, the
+            body of each script is replaced by SCRIPT_RECORDER and mail is
+            set to false.
+        Args:
+            props (dict): logrotate-rule properties, with paths as on a
+                          node
+        """
+        self.props = dict(props)
+        self.props['path'] = ','.join(
+            [self.path(path) for path in props['path'].split(',')])
+        for path in props['path'].split(','):
+            if not glob.has_magic(os.path.dirname(path)):
+                self._makedirs(os.path.dirname(self.path(path)))
+        if props.get('olddir') not in (None, 'false'):
+            self.props['olddir'] = self.path(props['olddir'])
+            self._makedirs(self.props['olddir'])
+        if not self.run_scripts:
+            for name in logrotate_utils.SCRIPT_OPTIONS:
+                if name in self.props:
+                    self.props[name] = SCRIPT_RECORDER.format(name)
+            if 'mail' in self.props:
+                self.props['mail'] = 'false'
+        with open(self.conf_file, 'w') as conf:
+            conf.write(logrotate_utils.render_rule_file(self.props))
+        os.chmod(self.conf_file, 0o644)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cleanup()
+
+    def cleanup(self):
+        """
+        Description:
+            Delete the sandbox.
+        """
+        shutil.rmtree(self.root_dir, ignore_errors=True)
+
+    @staticmethod
+    def _makedirs(directory):
+        """
+        Description:
+            Create a directory and its parents if missing.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def path(self, path):
+        """
+        Description:
+            Map a path on a node into the sandbox.
+        Args:
+            path (str): absolute path, may contain wildcards
+        Returns:
+            str. Path inside the sandbox.
+        """
+        return os.path.join(self.fs_dir, path.lstrip('/'))
+
+    def node_path(self, text):
+        """
+        Description:
+            Map the sandbox's paths in a text back to paths on the node.
+        Args:
+            text (str): e.g. a line of logrotate output
+        Returns:
+            str. The text with the paths as on the node.
+        """
+        return text.replace(self.path('/'), '/')
+
+    def write_log(self, path, size_kb=0, text=None, compressibility=1.0):
+        """
+        Description:
+            Append to a log file, creating it if missing.
+        Args:
+            path (str): log file path on the node
+            size_kb (int): kilobytes of filler to append
+            text (str): text to append before the filler
+            compressibility (float): fraction of the filler which
+                                     compresses, the rest is random data
+        """
+        local = self.path(path)
+        self._makedirs(os.path.dirname(local))
+        random_bytes = int(size_kb * 1024 * (1 - compressibility))
+        with open(local, 'ab') as log:
+            if text:
+                log.write(text.encode('utf-8'))
+            log.write(os.urandom(random_bytes))
+            log.write(((b'x' * 1023 + b'\n') * size_kb)[random_bytes:])
+        stamp = _timestamp(self.now - self._offset)
+        os.utime(local, (stamp, stamp))
+
+    def files(self, pattern):
+        """
+        Description:
+            List the files matching a pattern, e.g. the rotated copies of
+            a log.
+        Args:
+            pattern (str): glob pattern of paths on the node, e.g.
+                           /var/log/log1.log.[1-9].gz
+        Returns:
+            list. Sorted paths, as on the node.
+        """
+        prefix = self.path('/')
+        return sorted(['/' + os.path.relpath(path, prefix)
+                       for path in glob.glob(self.path(pattern))])
+
+    def advance(self, **delta):
+        """
+        Description:
+            Move the sandbox's clock forward.
+        Args:
+            delta: datetime.timedelta arguments, e.g. days=1
+        """
+        self.now += datetime.timedelta(**delta)
+
+    def _backdate(self):
+        """
+        Description:
+            Without faketime, move the rotation times of the state file
+            and the mtimes of the files in the sandbox back by the time
+            the clock was advanced, less the real time elapsed, since they
+            were last moved, so that logrotate running at the real time
+            sees them as old as they are at the sandbox's time.
+        """
+        offset = self.now - datetime.datetime.now()
+        delta = offset - self._offset
+        self._offset = offset
+        if os.path.exists(self.state_file):
+            with open(self.state_file) as state:
+                lines = state.read().splitlines()
+            with open(self.state_file, 'w') as state:
+                state.write('\n'.join(shift_state(lines, delta)) + '\n')
+        secs = delta.total_seconds()
+        for path, (_, mtime) in self._file_times().items():
+            os.utime(path, (mtime - secs, mtime - secs))
+
+    def _file_times(self):
+        """
+        Returns:
+            dict. Path to (inode, mtime) of every file in the sandbox.
+        """
+        times = {}
+        for directory, _, filenames in os.walk(self.path('/')):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                stat = os.stat(path)
+                times[path] = (stat.st_ino, stat.st_mtime)
+        return times
+
+    def _stamp_written(self, before):
+        """
+        Description:
+            With faketime, give the files logrotate created or modified,
+            i.e. whose inode and mtime are not among those before the run,
+            the sandbox's time. Renamed files keep theirs.
+        Args:
+            before (dict): _file_times from before the run
+        """
+        unchanged = set(before.values())
+        stamp = _timestamp(self.now)
+        for path, times in self._file_times().items():
+            if times not in unchanged:
+                os.utime(path, (stamp, stamp))
+
+    def get_cmd(self, force=False):
+        """
+        Description:
+            Command line which runs logrotate in the sandbox at the
+            sandbox's time, with the clock stopped so that names with
+            dateext do not depend on how long logrotate takes to start.
+        Args:
+            force (bool): run logrotate with -f
+        Returns:
+            list. The command's arguments.
+        """
+        cmd = [self.logrotate, '-v', '-s', self.state_file]
+        if force:
+            cmd.append('-f')
+        cmd.append(self.conf_file)
+        if self.faketime:
+            cmd = [self.faketime, '-f',
+                   self.now.strftime(FAKETIME_FORMAT)] + cmd
+        return cmd
+
+    def rotate(self, force=False):
+        """
+        Description:
+            Run logrotate once at the sandbox's current time.
+        Args:
+            force (bool): force the rotation, as logrotate -f does
+        Returns:
+            dict. As returned by logrotate_utils.parse_rotate_output, with
+            paths as on the node and the return code of logrotate added
+            as rc.
+        Raises:
+            FaketimeRequiredError if the rule uses dateext and faketime is
+            not available.
+        """
+        if self.faketime:
+            before = self._file_times()
+        elif self.props.get('dateext') == 'true':
+            raise FaketimeRequiredError(
+                'dateext names use the real date without faketime')
+        else:
+            self._backdate()
+        proc = subprocess.Popen(self.get_cmd(force), stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        stdout, stderr = proc.communicate()
+        if self.faketime:
+            self._stamp_written(before)
+        result = logrotate_utils.parse_rotate_output(
+            [self.node_path(line) for line in stdout.splitlines()] +
+            ['V:' + self.node_path(line) for line in stderr.splitlines()])
+        result['rc'] = proc.returncode
+        return result
+
+
+def map_sandboxes(func, cases, workers=8):
+    """
+    Description:
+        Run a function over many cases in parallel, each case being
+        expected to use sandboxes of its own.
+    Args:
+        func (callable): given a case, returns its result
+        cases (list): cases, e.g. rule properties
+        workers (int): number of cases run at the same time
+    Returns:
+        list. Results, in the order of cases.
+    """
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(func, cases)
+    finally:
+        pool.close()
+        pool.join()
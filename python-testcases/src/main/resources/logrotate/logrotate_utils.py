@@ -0,0 +1,531 @@
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Offline helpers for logrotate-rule items: property parsing
+            and rendering of the file Puppet writes to /etc/logrotate.d
+'''
+
+import base64
+import hashlib
+import io
+import shlex
+import tarfile
+from xml.sax.saxutils import escape, quoteattr
+
+LOGROTATE_FILE_HEADER = [
+    "# THIS FILE IS AUTOMATICALLY DISTRIBUTED BY PUPPET.  ANY CHANGES WILL BE",
+    "# OVERWRITTEN."]
+
+# Properties rendered as "<name>" when true and "<false>" when false
+BOOLEAN_OPTIONS = {
+    'compress': 'nocompress',
+    'copy': 'nocopy',
+    'copytruncate': 'nocopytruncate',
+    'dateext': 'nodateext',
+    'delaycompress': 'nodelaycompress',
+    'ifempty': 'notifempty',
+    'missingok': 'nomissingok',
+    'sharedscripts': 'nosharedscripts',
+    'shred': 'noshred',
+}
+
+# Properties rendered only when true
+TRUE_ONLY_OPTIONS = ['mailfirst', 'maillast']
+
+# Properties rendered as "<name> <value>", or "<false>" when set to false
+VALUE_OPTIONS = {
+    'compresscmd': None,
+    'compressext': None,
+    'compressoptions': None,
+    'dateformat': None,
+    'extension': None,
+    'mail': 'nomail',
+    'maxage': None,
+    'minsize': None,
+    'olddir': 'noolddir',
+    'rotate': None,
+    'shredcycles': None,
+    'size': None,
+    'start': None,
+    'uncompresscmd': None,
+}
+
+ROTATE_EVERY = {
+    'day': 'daily',
+    'week': 'weekly',
+    'month': 'monthly',
+    'year': 'yearly',
+}
+
+# Script properties, in the order the template writes them
+SCRIPT_OPTIONS = ['postrotate', 'prerotate', 'firstaction', 'lastaction']
+
+
+def parse_props(props):
+    """
+    Description:
+        Parse a litp "-o" properties string into a dict.
+    Args:
+        props (str): properties, e.g. "name='rule1' rotate=3"
+    Returns:
+        dict. Property name to value.
+    """
+    parsed = {}
+    for token in shlex.split(props):
+        name, _, value = token.partition('=')
+        parsed[name] = value
+    return parsed
+
+
+def _create_option(props):
+    """
+    Description:
+        Render the create/nocreate option of a rule.
+    Args:
+        props (dict): logrotate-rule properties
+    Returns:
+        str. The option, or None if create is not set.
+    """
+    if 'create' not in props:
+        return None
+    if props['create'] != 'true':
+        return 'nocreate'
+    option = 'create'
+    for name in ['create_mode', 'create_owner', 'create_group']:
+        if name not in props:
+            break
+        option += ' ' + props[name]
+    return option
+
+
+def get_rule_options(props):
+    """
+    Description:
+        Work out the options written inside the braces of a rule file,
+        excluding scripts, in the order they appear in the file.
+    Args:
+        props (dict): logrotate-rule properties
+    Returns:
+        list. Options as they appear in the file.
+    """
+    options = []
+    for name, false_option in BOOLEAN_OPTIONS.items():
+        if name in props:
+            options.append(name if props[name] == 'true' else false_option)
+    for name in TRUE_ONLY_OPTIONS:
+        if props.get(name) == 'true':
+            options.append(name)
+    for name, false_option in VALUE_OPTIONS.items():
+        if name not in props:
+            continue
+        if props[name] == 'false' and false_option:
+            options.append(false_option)
+        else:
+            options.append('{0} {1}'.format(name, props[name]))
+    if 'rotate_every' in props:
+        options.append(ROTATE_EVERY[props['rotate_every']])
+    create = _create_option(props)
+    if create:
+        options.append(create)
+    return sorted(options)
+
+
+def render_rule_file(props):
+    """
+    Description:
+        Render the file written to /etc/logrotate.d for a logrotate-rule.
+    Args:
+        props (dict): logrotate-rule properties
+    Returns:
+        str. Contents of /etc/logrotate.d/<name>.
+    """
+    lines = LOGROTATE_FILE_HEADER + [
+        '',
+        '{0} {{'.format(' '.join(props['path'].split(',')))]
+    for option in get_rule_options(props):
+        lines.append('  ' + option)
+    for name in SCRIPT_OPTIONS:
+        if name in props:
+            lines.extend(['  ' + name, '    ' + props[name], '  endscript'])
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_rule_lines(props):
+    """
+    Description:
+        Render a rule file as the list of lines returned by
+        GenericTest.get_file_contents, i.e. stripped and without blank
+        lines.
+    Args:
+        props (dict): logrotate-rule properties
+    Returns:
+        list. Non blank, stripped lines of the rule file.
+    """
+    return [line.strip() for line in render_rule_file(props).splitlines()
+            if line.strip()]
+
+
+def rule_lines_sha256(lines):
+    """
+    Description:
+        Hash a list of rule file lines so that expected and actual files
+        can be compared by digest.
+    Args:
+        lines (list): lines as returned by render_rule_lines
+    Returns:
+        str. Hex sha256 digest.
+    """
+    return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+def get_snapshot_cmd(directory):
+    """
+    Description:
+        Command which streams every file in a directory as a base64
+        encoded, gzipped tar archive.
+    Args:
+        directory (str): directory to snapshot, e.g. /etc/logrotate.d/
+    Returns:
+        str. The command.
+    """
+    return "/bin/tar -C {0} -czf - . | /usr/bin/base64".format(directory)
+
+
+class DirSnapshot(object):
+    """
+    In-memory, indexed view of a directory fetched with get_snapshot_cmd.
+    """
+
+    def __init__(self, stdout):
+        """
+        Args:
+            stdout (list): output lines of the snapshot command
+        """
+        archive = base64.b64decode(''.join(stdout))
+        self.files = {}
+        tar = tarfile.open(fileobj=io.BytesIO(archive), mode='r:gz')
+        for member in tar.getmembers():
+            if not member.isfile():
+                continue
+            data = tar.extractfile(member).read()
+            name = member.name[2:] if member.name.startswith('./') \
+                else member.name
+            self.files[name] = {
+                'size': member.size,
+                'mtime': member.mtime,
+                'sha256': hashlib.sha256(data).hexdigest(),
+                'contents': data.decode('utf-8', 'replace')}
+        tar.close()
+
+    def names(self):
+        """
+        Returns:
+            list. Sorted names of the files in the directory.
+        """
+        return sorted(self.files)
+
+    def matching(self, text):
+        """
+        Description:
+            Names containing text, as "ls | grep text" would list them.
+        Args:
+            text (str): text to look for
+        Returns:
+            list. Sorted matching file names.
+        """
+        return [name for name in self.names() if text in name]
+
+    def has(self, name):
+        """
+        Returns:
+            bool. True if the directory contains a file called name.
+        """
+        return name in self.files
+
+    def stat(self, name):
+        """
+        Returns:
+            dict. Size, mtime and sha256 of the file.
+        """
+        info = self.files[name]
+        return {'size': info['size'], 'mtime': info['mtime'],
+                'sha256': info['sha256']}
+
+    def contents(self, name):
+        """
+        Returns:
+            str. Raw contents of the file.
+        """
+        return self.files[name]['contents']
+
+    def lines(self, name):
+        """
+        Description:
+            Lines of a file as GenericTest.get_file_contents returns
+            them, i.e. stripped and without blank lines.
+        Returns:
+            list. The file's lines.
+        """
+        return [line.strip() for line in self.contents(name).splitlines()
+                if line.strip()]
+
+
+def get_targeted_rotate_cmd(rule_file, conf_file, state_file,
+                            main_conf='/etc/logrotate.conf'):
+    """
+    Description:
+        Command which runs logrotate on a single rule file with a private
+        state file. The private configuration keeps the global options of
+        the main configuration, but none of its includes or log blocks,
+        and includes only the rule file. Script output is written to
+        stdout and the verbose output of logrotate to stdout with a "V:"
+        prefix, see parse_rotate_output.
+    Args:
+        rule_file (str): rule file to rotate, e.g. /etc/logrotate.d/rule1
+        conf_file (str): path the private configuration is written to
+        state_file (str): private state file
+        main_conf (str): configuration the global options are taken from
+    Returns:
+        str. The command.
+    """
+    return (
+        "/usr/bin/awk '/{{/ {{b = 1}} "
+        "!b && $1 != \"include\" {{print}} "
+        "/}}/ {{b = 0}}' {0} > {1} && "
+        "echo 'include {2}' >> {1} && "
+        "/usr/sbin/logrotate -v -s {3} {1} 2> {1}.v; _rc=$?; "
+        "/bin/sed 's/^/V:/' {1}.v; /bin/rm -f {1}.v; exit $_rc".format(
+            main_conf, conf_file, rule_file, state_file))
+
+
+def parse_rotate_output(stdout):
+    """
+    Description:
+        Parse the output of the command built by get_targeted_rotate_cmd.
+    Args:
+        stdout (list): output lines of the command
+    Returns:
+        dict. With the keys:
+            rotated: logs which were rotated, in order
+            skipped: log to the reason it was not rotated
+            errors: error lines reported by logrotate
+            output: lines written by the rule's scripts
+    """
+    result = {'rotated': [], 'skipped': {}, 'errors': [], 'output': []}
+    log = None
+    for line in stdout:
+        if not line.startswith('V:'):
+            result['output'].append(line)
+            continue
+        line = line[2:].strip()
+        if line.startswith('considering log '):
+            log = line[len('considering log '):]
+        elif line.startswith('error:'):
+            result['errors'].append(line)
+        elif line.endswith('does not exist -- skipping') and \
+                line.startswith('log '):
+            result['skipped'][line.split()[1]] = 'does not exist'
+        elif log is None:
+            continue
+        elif line == 'log needs rotating':
+            result['rotated'].append(log)
+        elif line.startswith('log does not need rotating'):
+            reason = line[len('log does not need rotating'):].strip()
+            result['skipped'][log] = reason.strip('()') or \
+                'does not need rotating'
+    return result
+
+
+WORKLOAD_CYCLE_MARKER = "@@WORKLOAD_CYCLE@@"
+
+
+def build_workload_script(log_files, rotate_cmd, cycles, size_kb,
+                          compressibility=0.0, spacing_secs=0):
+    """
+    Description:
+        Build a bash script which runs on a node and performs a number of
+        append and rotate cycles: each cycle appends size_kb of data to
+        every log file and runs the rotate command. For each cycle it
+        prints a marker line with the cycle number, the return code and
+        duration in milliseconds of the rotate command and the total size
+        of the log files before rotation, followed by the command's output.
+    Args:
+        log_files (list): log files appended to on every cycle, or glob
+                          patterns matching them; neither may contain
+                          spaces
+        rotate_cmd (str): command run after every append, typically from
+                          get_targeted_rotate_cmd
+        cycles (int): number of cycles
+        size_kb (int): KB appended to each log file per cycle
+        compressibility (float): fraction of the data, between 0 and 1,
+                                 which is a repeated character rather than
+                                 random bytes
+        spacing_secs (float): time between cycles, e.g. to give dateext
+                              rules a new timestamp per rotation
+    Returns:
+        str. The bash script.
+    """
+    total = int(size_kb * 1024)
+    fill = int(total * compressibility)
+    files = ' '.join(log_files)
+    lines = [
+        '_w=$(/bin/mktemp)',
+        "{{ /usr/bin/head -c {0} /dev/urandom; /usr/bin/head -c {1} "
+        "/dev/zero | /usr/bin/tr '\\0' 'x'; }} >\"$_w\"".format(
+            total - fill, fill),
+        'for _c in $(/usr/bin/seq 1 {0}); do'.format(cycles),
+        'for _f in {0}; do /bin/cat "$_w" >>"$_f"; done'.format(files),
+        "_b=$(/usr/bin/stat -c %s {0} | "
+        "/usr/bin/awk '{{s += $1}} END {{print s}}')".format(files),
+        '_s=$(/bin/date +%s%N)',
+        '( {0}'.format(rotate_cmd),
+        ') >"$_w.out" 2>&1; _rc=$?',
+        '_e=$(/bin/date +%s%N)',
+        'echo "{0} $_c $_rc $(((_e - _s) / 1000000)) $_b"'.format(
+            WORKLOAD_CYCLE_MARKER),
+        '/bin/cat "$_w.out"']
+    if spacing_secs:
+        lines.append('[ $_c -lt {0} ] && /bin/sleep {1}'.format(
+            cycles, spacing_secs))
+    lines.extend(['done', '/bin/rm -f "$_w" "$_w.out"'])
+    return '\n'.join(lines) + '\n'
+
+
+def get_workload_cmd(log_files, rotate_cmd, cycles, size_kb,
+                     compressibility=0.0, spacing_secs=0):
+    """
+    Description:
+        Wrap the workload script, see build_workload_script, in a single
+        command line.
+    Returns:
+        str. Command line which runs the whole workload.
+    """
+    script = base64.b64encode(build_workload_script(
+        log_files, rotate_cmd, cycles, size_kb, compressibility,
+        spacing_secs).encode('utf-8'))
+    return '/bin/echo {0} | /usr/bin/base64 -d | /bin/bash'.format(
+        script.decode('ascii'))
+
+
+def parse_workload_output(stdout):
+    """
+    Description:
+        Parse the output of a workload command into a per cycle report.
+    Args:
+        stdout (list): output lines of the workload command
+    Returns:
+        list. One dict per cycle, in order, with the keys cycle, rc,
+        millis and log_bytes and the keys returned by
+        parse_rotate_output for the cycle's rotation.
+    """
+    report = []
+    cycle_lines = None
+    for line in stdout + [WORKLOAD_CYCLE_MARKER]:
+        if not line.startswith(WORKLOAD_CYCLE_MARKER):
+            if cycle_lines is not None:
+                cycle_lines.append(line)
+            continue
+        if cycle_lines is not None:
+            report[-1].update(parse_rotate_output(cycle_lines))
+        fields = line.split()[1:]
+        if not fields:
+            break
+        report.append({'cycle': int(fields[0]), 'rc': int(fields[1]),
+                       'millis': int(fields[2]),
+                       'log_bytes': int(fields[3]) if len(fields) > 3
+                                    else 0})
+        cycle_lines = []
+    return report
+
+
+# Property mixes cycled through by default_rule_props, "{0}" is replaced by
+# the rule's index
+RULE_PROP_MIXES = [
+    {'name': 'rule_{0}', 'path': '/var/log/rule_{0}.log', 'rotate': '4',
+     'size': '10k', 'compress': 'true', 'copytruncate': 'true'},
+    {'name': 'rule_{0}', 'path': '/var/log/rule_{0}/*.log',
+     'rotate_every': 'day', 'rotate': '7', 'dateext': 'true',
+     'missingok': 'true', 'ifempty': 'false'},
+    {'name': 'rule_{0}', 'path': '/var/log/rule_{0}.log,/var/log/rule_{0}.err',
+     'size': '1M', 'rotate': '2', 'compress': 'true', 'delaycompress': 'true',
+     'sharedscripts': 'true',
+     'postrotate': '/bin/kill -HUP $(/bin/cat /var/run/rule_{0}.pid)'},
+]
+
+LITP_XML_HEADER = (
+    "<?xml version='1.0' encoding='utf-8'?>\n"
+    "<litp:logrotate-rule-config "
+    "xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\" "
+    "xmlns:litp=\"http://www.ericsson.com/litp\" "
+    "xsi:schemaLocation=\"http://www.ericsson.com/litp "
+    "litp-xml-schema/litp.xsd\" id={0}>\n"
+    "  <litp:logrotate-rule-config-rules-collection id=\"rules\">\n")
+
+LITP_XML_FOOTER = (
+    "  </litp:logrotate-rule-config-rules-collection>\n"
+    "</litp:logrotate-rule-config>\n")
+
+
+def default_rule_props(index):
+    """
+    Description:
+        Properties of the index'th generated rule, cycling through
+        RULE_PROP_MIXES.
+    Args:
+        index (int): index of the rule
+    Returns:
+        dict. logrotate-rule properties.
+    """
+    mix = RULE_PROP_MIXES[index % len(RULE_PROP_MIXES)]
+    return dict([(name, value.format(index)) for name, value in mix.items()])
+
+
+def iter_rule_config_xml(config_id, rules, rule_props=default_rule_props):
+    """
+    Description:
+        Generate a litp:logrotate-rule-config document, as litp export
+        writes it, with any number of litp:logrotate-rule children. The
+        document is yielded a rule at a time so it can be written out in
+        bounded memory whatever the number of rules.
+    Args:
+        config_id (str): id of the logrotate-rule-config
+        rules (int): number of logrotate-rule children
+        rule_props (callable): given a rule's index, returns its
+                               properties
+    Returns:
+        generator. Chunks of the document.
+    """
+    yield LITP_XML_HEADER.format(quoteattr(config_id))
+    for index in range(rules):
+        props = rule_props(index)
+        chunk = ['    <litp:logrotate-rule id={0}>\n'.format(
+            quoteattr('rule_{0}'.format(index)))]
+        for name in sorted(props):
+            chunk.append('      <{0}>{1}</{0}>\n'.format(
+                name, escape(props[name])))
+        chunk.append('    </litp:logrotate-rule>\n')
+        yield ''.join(chunk)
+    yield LITP_XML_FOOTER
+
+
+def write_rule_config_xml(fileobj, config_id, rules,
+                          rule_props=default_rule_props):
+    """
+    Description:
+        Write a document from iter_rule_config_xml to a file object.
+    Args:
+        fileobj (file): binary file object written to
+        config_id (str): id of the logrotate-rule-config
+        rules (int): number of logrotate-rule children
+        rule_props (callable): given a rule's index, returns its
+                               properties
+    """
+    for chunk in iter_rule_config_xml(config_id, rules, rule_props):
+        fileobj.write(chunk.encode('utf-8'))
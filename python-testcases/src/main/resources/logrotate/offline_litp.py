@@ -0,0 +1,1637 @@
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   In memory stand-in for the LITP model and the litp commands
+            used by the logrotate testsets, so that helpers and scenarios
+            can be exercised without a deployment.
+
+            OfflineModel holds a deployment of two peer nodes and the MS
+            and implements create, update, remove, show, export, load,
+            create_plan, run_plan, stop_plan and remove_plan for
+            logrotate-rule-config and logrotate-rule items, with the
+            validation messages of the logrotate plugin. Running a plan
+            renders each rule into <root>/<hostname>/etc/logrotate.d/ the
+            way Puppet does on the nodes. Commands run on a node are split
+            into simple commands; litp commands go to the model and the
+            file commands the testsets use act on the node's files.
+
+            OfflineCLIMixin puts the model behind the execute_cli_*,
+            model query and command helpers of a testset, and
+            OfflineDeploymentMixin stands in for the deployment facing
+            parts of GenericTest, see testset_story664_offline.py:
+
+            class OfflineGenericTest(offline_litp.OfflineDeploymentMixin,
+                                     GenericTest):
+                pass
+
+            class Story664Offline(offline_litp.OfflineCLIMixin, Story664,
+                                  OfflineGenericTest):
+                pass
+
+            Run as a script, it replays the rule sets a testset method
+            passes to _assert_invalid_creates through the model and lists
+            the cases whose errors differ from the expected ones:
+
+            offline_litp.py testset_story664.py \
+                test_02_n_create_logrotate_rule_negative_validation
+'''
+
+import ast
+import base64
+import glob
+import io
+import os
+import re
+import shlex
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+import litp_output_utils
+import logrotate_sandbox
+import logrotate_utils
+
+LITP_NS = 'http://www.ericsson.com/litp'
+
+# Item types the model knows besides the seeded deployment structure: the
+# type they extend, if any, and the child collections created with them
+ITEM_TYPES = {
+    'logrotate-rule-config': {'extends': 'node-config',
+                              'collections': {'rules': 'logrotate-rule'}},
+    'logrotate-rule': {'extends': None, 'collections': {}},
+}
+
+REQUIRED_RULE_PROPS = ['name', 'path']
+
+READONLY_RULE_PROPS = ['name']
+
+_NAME_RE = re.compile(r'^[a-zA-Z0-9_\-\.]+$')
+_PATH_RE = re.compile(r'^[^\s,]+(,[^\s,]+)*$')
+_INT_RE = re.compile(r'^\d+$')
+_SIZE_RE = re.compile(r'^\d+[kMG]?$')
+_DATEFORMAT_RE = re.compile(r'^[^%\s]*(%[Ymds][^%\s]*)+$')
+_MODE_RE = re.compile(r'^[0-7]{3,4}$')
+_USER_RE = re.compile(r'^[a-z_][a-z0-9_\-]*$')
+_TEXT_RE = re.compile(r'^[^\n]+$')
+
+# Regular expression each logrotate-rule property must match
+RULE_PROP_PATTERNS = {'name': _NAME_RE, 'path': _PATH_RE,
+                      'create_mode': _MODE_RE, 'create_owner': _USER_RE,
+                      'create_group': _USER_RE, 'dateformat': _DATEFORMAT_RE,
+                      'rotate_every': re.compile(r'^({0})$'.format(
+                          '|'.join(logrotate_utils.ROTATE_EVERY)))}
+for _name in list(logrotate_utils.BOOLEAN_OPTIONS) + \
+        logrotate_utils.TRUE_ONLY_OPTIONS + ['create']:
+    RULE_PROP_PATTERNS[_name] = re.compile(r'^(true|false)$')
+for _name in ['rotate', 'maxage', 'start', 'shredcycles']:
+    RULE_PROP_PATTERNS[_name] = _INT_RE
+for _name in ['size', 'minsize']:
+    RULE_PROP_PATTERNS[_name] = _SIZE_RE
+for _name in list(logrotate_utils.VALUE_OPTIONS) + \
+        logrotate_utils.SCRIPT_OPTIONS:
+    RULE_PROP_PATTERNS.setdefault(_name, _TEXT_RE)
+
+# Usage lines argparse prints with a command line error, by action
+CLI_USAGE = {'create': 'Usage: litp create [-h] -t TYPE -p PATH '
+                       '[-o PROPERTIES [PROPERTIES ...]] [-j]'}
+
+# Shell variable references, which expand to nothing on the MS
+_SHELL_VAR_RE = re.compile(r'\$(\w+|\{\w+\})')
+
+# References to the variables and the return code set by a command line
+# run on a node, and the assignments which set them
+_NODE_VAR_RE = re.compile(r'\$(\?|\w+|\{\w+\})')
+_ASSIGNMENT_RE = re.compile(r'^(\w+)=(.*)$')
+
+LITP_COMMANDS = ('litp', '/usr/bin/litp')
+
+# Rule the model seeds on every node and the MS with rule_configs, as a
+# deployment's own logrotate-rule-config holds one
+SEEDED_RULE_PROPS = {'name': 'deployment_logs',
+                     'path': '/var/log/deployment/*.log',
+                     'rotate_every': 'day', 'rotate': '7',
+                     'missingok': 'true'}
+
+# Files the nodes' OS ships in /etc/logrotate.d, written with rule_configs
+OS_LOGROTATE_FILES = {'yum': ['/var/log/yum.log {', '    missingok',
+                              '    notifempty', '    size 30k',
+                              '    yearly',
+                              '    create 0600 root root', '}']}
+
+# The create_* properties and the properties each of them requires
+CREATE_PREREQUISITES = [('create_mode', ['create']),
+                        ('create_owner', ['create', 'create_mode']),
+                        ('create_group',
+                         ['create', 'create_mode', 'create_owner'])]
+
+
+class CLIError(Exception):
+    """
+    Raised when a litp command fails, with the error output the litp CLI
+    would print.
+    """
+
+    def __init__(self, errors):
+        """
+        Args:
+            errors (list): (path, line) tuples, path being None for errors
+                           not reported against an item
+        """
+        self.errors = errors
+        super(CLIError, self).__init__('\n'.join(self.lines()))
+
+    def lines(self):
+        """
+        Returns:
+            list. The error output lines, each path on the line before its
+            error.
+        """
+        lines = []
+        for path, line in self.errors:
+            if path is not None:
+                lines.append(path)
+            lines.append(line)
+        return lines
+
+
+def _expand_vars(cmd):
+    """
+    Description:
+        Expand the shell variables of a command line outside single
+        quotes, as the shell on the MS does. The variables used by the
+        testsets are unset there, so they expand to nothing.
+    Args:
+        cmd (str): command line
+    Returns:
+        str. The command line with its variables expanded.
+    """
+    expanded = []
+    quote = None
+    index = 0
+    while index < len(cmd):
+        char = cmd[index]
+        if char == '\\' and quote != "'":
+            expanded.append(cmd[index:index + 2])
+            index += 2
+            continue
+        if char in '\'"' and quote in (None, char):
+            quote = None if quote else char
+        elif char == '$' and quote != "'":
+            var = _SHELL_VAR_RE.match(cmd, index)
+            if var:
+                index = var.end()
+                continue
+        expanded.append(char)
+        index += 1
+    return ''.join(expanded)
+
+
+def split_commands(cmd):
+    """
+    Description:
+        Split a command line into its commands at the ;, &&, || and
+        newline separators outside quotes. Pipelines are left whole.
+    Args:
+        cmd (str): command line
+    Returns:
+        list. (separator, command) tuples, the separator being the one
+        before the command, None for the first command.
+    """
+    commands = []
+    current = []
+    separator = None
+    quote = None
+    index = 0
+    while index < len(cmd):
+        char = cmd[index]
+        pair = cmd[index:index + 2]
+        if char == '\\' and quote != "'":
+            current.append(pair)
+            index += 2
+            continue
+        if char in '\'"' and quote in (None, char):
+            quote = None if quote else char
+        elif quote is None and (pair in ('&&', '||') or char in ';\n'):
+            commands.append((separator, ''.join(current).strip()))
+            separator = pair if pair in ('&&', '||') else ';'
+            current = []
+            index += len(separator)
+            continue
+        current.append(char)
+        index += 1
+    commands.append((separator, ''.join(current).strip()))
+    return [(sep, command) for sep, command in commands if command]
+
+
+def _parent(path):
+    """
+    Returns:
+        str. Path of the parent item.
+    """
+    return path.rstrip('/').rsplit('/', 1)[0] or '/'
+
+
+def _item_id(path):
+    """
+    Returns:
+        str. Last part of the path.
+    """
+    return path.rstrip('/').rsplit('/', 1)[1]
+
+
+class OfflineModel(object):
+    """
+    LITP model held in memory, with the files written by plans rendered
+    into a directory per node.
+    """
+
+    def __init__(self, root_dir=None, nodes=('node1', 'node2'),
+                 ms_hostname='ms1', rule_configs=False):
+        """
+        Args:
+            root_dir (str): directory the node files are rendered into, a
+                            new temporary directory if None
+            nodes (tuple): hostnames of the peer nodes
+            ms_hostname (str): hostname of the MS
+            rule_configs (bool): start with an applied
+                                 logrotate-rule-config "logrotate" on
+                                 every node and the MS, holding the rule
+                                 of SEEDED_RULE_PROPS and the files of
+                                 OS_LOGROTATE_FILES, as in a deployment
+        """
+        self.root_dir = root_dir or tempfile.mkdtemp(prefix='offline_litp_')
+        self.ms_hostname = ms_hostname
+        self.nodes = list(nodes)
+        self.items = {}
+        self.plan = None
+        self.plan_status = None
+        self._seed('/', 'root')
+        self._seed('/ms', 'ms', {'hostname': ms_hostname})
+        self._seed('/ms/configs', 'collection-of-node-config')
+        self._seed('/deployments', 'collection-of-deployment')
+        self._seed('/deployments/d1', 'deployment')
+        self._seed('/deployments/d1/clusters', 'collection-of-cluster')
+        self._seed('/deployments/d1/clusters/c1', 'cluster')
+        nodes_path = '/deployments/d1/clusters/c1/nodes'
+        self._seed(nodes_path, 'collection-of-node')
+        for index, hostname in enumerate(nodes):
+            node_path = '{0}/n{1}'.format(nodes_path, index + 1)
+            self._seed(node_path, 'node', {'hostname': hostname})
+            self._seed(node_path + '/configs', 'collection-of-node-config')
+        for hostname in [ms_hostname] + list(nodes):
+            for directory in ('/etc/logrotate.d', '/tmp', '/var/log'):
+                os.makedirs(self.node_file(hostname, directory))
+        if rule_configs:
+            for hostname in [ms_hostname] + list(nodes):
+                for filename, lines in OS_LOGROTATE_FILES.items():
+                    with open(self.node_file(
+                            hostname, '/etc/logrotate.d/' + filename),
+                            'w') as os_file:
+                        os_file.write('\n'.join(lines) + '\n')
+            self._seed_rule_config('/ms', ms_hostname)
+            for index, hostname in enumerate(nodes):
+                self._seed_rule_config(
+                    '{0}/n{1}'.format(nodes_path, index + 1), hostname)
+
+    def _seed(self, path, item_type, props=None):
+        """
+        Description:
+            Add an applied item of the deployment structure.
+        """
+        self.items[path] = {'type': item_type, 'props': dict(props or {}),
+                            'applied': dict(props or {}),
+                            'state': 'Applied'}
+
+    def _seed_rule_config(self, node_path, hostname):
+        """
+        Description:
+            Add an applied logrotate-rule-config holding the rule of
+            SEEDED_RULE_PROPS to a node, and the rule's file.
+        """
+        config = node_path + '/configs/logrotate'
+        self._seed(config, 'logrotate-rule-config')
+        self._seed(config + '/rules', 'collection-of-logrotate-rule')
+        self._seed(config + '/rules/' + SEEDED_RULE_PROPS['name'],
+                   'logrotate-rule', SEEDED_RULE_PROPS)
+        with open(self.node_file(hostname, '/etc/logrotate.d/' +
+                                 SEEDED_RULE_PROPS['name']),
+                  'w') as rule_file:
+            rule_file.write(
+                logrotate_utils.render_rule_file(SEEDED_RULE_PROPS))
+
+    def cleanup(self):
+        """
+        Description:
+            Delete the directory the node files were rendered into.
+        """
+        shutil.rmtree(self.root_dir, ignore_errors=True)
+
+    def node_file(self, hostname, path):
+        """
+        Description:
+            Map a path on a node, or on the MS, into the node's directory.
+        Args:
+            hostname (str): node hostname
+            path (str): path on the node, e.g. /etc/logrotate.d/rule1
+        Returns:
+            str. Local path.
+        """
+        return os.path.join(self.root_dir, hostname, path.lstrip('/'))
+
+    def _get(self, path):
+        """
+        Returns:
+            dict. The item at path.
+        Raises:
+            CLIError if there is no such item.
+        """
+        path = path.rstrip('/') or '/'
+        if path not in self.items:
+            raise CLIError([(path, 'InvalidLocationError    Not found')])
+        return self.items[path]
+
+    def _children(self, path):
+        """
+        Returns:
+            list. Paths of the direct children of an item, sorted.
+        """
+        return sorted([child for child in self.items
+                       if child != '/' and _parent(child) == path])
+
+    def _subtree(self, path):
+        """
+        Returns:
+            list. Paths of an item and all its descendants, sorted.
+        """
+        prefix = path.rstrip('/') + '/'
+        return sorted([other for other in self.items
+                       if other == path or other.startswith(prefix)])
+
+    def _hostname(self, path):
+        """
+        Returns:
+            str. Hostname of the node or MS an item belongs to, None if it
+            does not belong to one.
+        """
+        while path != '/':
+            if self.items[path]['type'] in ('node', 'ms'):
+                return self.items[path]['props']['hostname']
+            path = _parent(path)
+        return None
+
+    @staticmethod
+    def _is_a(item_type, wanted):
+        """
+        Returns:
+            bool. True if item_type is wanted or extends it.
+        """
+        return item_type == wanted or \
+            ITEM_TYPES.get(item_type, {}).get('extends') == wanted
+
+    @staticmethod
+    def _validate_props(item_type, props):
+        """
+        Description:
+            Check property values as the CLI does before changing the
+            model.
+        Returns:
+            list. (path, line) error tuples.
+        """
+        errors = []
+        if item_type != 'logrotate-rule':
+            for name in sorted(props):
+                errors.append((None, 'PropertyNotAllowedError in property: '
+                               '"{0}"    "{0}" is not an allowed property '
+                               'of {1}'.format(name, item_type)))
+            return errors
+        for name in sorted(props):
+            if name not in RULE_PROP_PATTERNS:
+                errors.append((None, 'PropertyNotAllowedError in property: '
+                               '"{0}"    "{0}" is not an allowed property '
+                               'of logrotate-rule'.format(name)))
+            elif not RULE_PROP_PATTERNS[name].match(props[name]):
+                if name == 'path':
+                    msg = 'Value "{0}" is not a valid path.'
+                else:
+                    msg = "Invalid value '{0}'."
+                errors.append((None, 'ValidationError in property: "{0}"'
+                               '    {1}'.format(name,
+                                                msg.format(props[name]))))
+        if props.get('mailfirst') == 'true' and \
+                props.get('maillast') == 'true':
+            errors.append((None, 'ValidationError    The properties '
+                           '"mailfirst" and "maillast" can not both be set '
+                           'to true'))
+        for name in REQUIRED_RULE_PROPS:
+            if name not in props:
+                errors.append((None, 'MissingRequiredPropertyError in '
+                               'property: "{0}"    ItemType '
+                               '"logrotate-rule" is required to have a '
+                               'property with name "{0}"'.format(name)))
+        return errors
+
+    def _set_props(self, path, props):
+        """
+        Description:
+            Replace the properties of an existing item and work out its
+            state from the properties last applied.
+        """
+        item = self.items[path]
+        item['props'] = props
+        if item['applied'] is None:
+            item['state'] = 'Initial'
+        elif props == item['applied']:
+            item['state'] = 'Applied'
+        else:
+            item['state'] = 'Updated'
+
+    def create(self, path, item_type, props=None):
+        """
+        Description:
+            Create an item, and the collections of its type.
+        Args:
+            path (str): path of the new item
+            item_type (str): item type
+            props (dict): item properties
+        Raises:
+            CLIError if the item cannot be created.
+        """
+        props = dict(props or {})
+        parent = self._get(_parent(path))
+        if item_type not in ITEM_TYPES:
+            raise CLIError([(None, 'InvalidTypeError    Item type "{0}" '
+                             'not registered'.format(item_type))])
+        allowed = parent['type'][len('collection-of-'):]
+        if not parent['type'].startswith('collection-of-') or \
+                not self._is_a(item_type, allowed):
+            raise CLIError([(path, 'InvalidChildTypeError    "{0}" is not '
+                             'an allowed type for collection of item type '
+                             '"{1}"'.format(item_type, allowed))])
+        errors = self._validate_props(item_type, props)
+        if errors:
+            raise CLIError(errors)
+        existing = self.items.get(path)
+        if existing is not None:
+            if existing['state'] != 'ForRemoval' or \
+                    existing['type'] != item_type:
+                raise CLIError([(path, 'ItemExistsError    Item {0} '
+                                 'already exists'.format(path))])
+            self._set_props(path, props)
+            return
+
+        self.items[path] = {'type': item_type, 'props': props,
+                            'applied': None, 'state': 'Initial'}
+        for name, child_type in ITEM_TYPES[item_type]['collections'].items():
+            self.items['{0}/{1}'.format(path, name)] = {
+                'type': 'collection-of-' + child_type, 'props': {},
+                'applied': None, 'state': 'Initial'}
+
+    def update(self, path, props=None, delete=None):
+        """
+        Description:
+            Update and delete properties of an item.
+        Args:
+            path (str): item path
+            props (dict): properties to set
+            delete (list): names of properties to delete
+        Raises:
+            CLIError if the update is not valid.
+        """
+        item = self._get(path)
+        props = dict(props or {})
+        new_props = dict(item['props'])
+        new_props.update(props)
+        for name in delete or []:
+            new_props.pop(name, None)
+        errors = self._validate_props(item['type'], new_props)
+        if item['type'] == 'logrotate-rule' and item['applied'] is not None:
+            for name in READONLY_RULE_PROPS:
+                if new_props.get(name) != item['applied'].get(name) and \
+                        name in new_props:
+                    errors.append((path, 'InvalidRequestError in property: '
+                                   '"{0}"    Unable to modify readonly '
+                                   'property: {0}'.format(name)))
+        if errors:
+            raise CLIError(errors)
+        self._set_props(path, new_props)
+
+    def remove(self, path):
+        """
+        Description:
+            Remove an item and its descendants: items never applied are
+            deleted, the others are marked for removal.
+        Args:
+            path (str): item path
+        """
+        self._get(path)
+        for child in self._subtree(path):
+            if self.items[child]['applied'] is None:
+                del self.items[child]
+            else:
+                self.items[child]['state'] = 'ForRemoval'
+
+    def show(self, path):
+        """
+        Args:
+            path (str): item path
+        Returns:
+            dict. The item's type, state and a copy of its properties.
+        """
+        item = self._get(path)
+        return {'type': item['type'], 'state': item['state'],
+                'properties': dict(item['props'])}
+
+    def find(self, path, item_type, collections=False):
+        """
+        Description:
+            Find the items of a type, or the collections of a type, below
+            a path.
+        Args:
+            path (str): path to search from
+            item_type (str): item type, matching types extending it too
+            collections (bool): find collections of item_type instead
+        Returns:
+            list. Sorted paths.
+        """
+        found = []
+        for child in self._subtree(path.rstrip('/') or '/'):
+            child_type = self.items[child]['type']
+            if collections:
+                if child_type == 'collection-of-' + item_type:
+                    found.append(child)
+            elif self._is_a(child_type, item_type):
+                found.append(child)
+        return found
+
+    def export(self, path, filepath):
+        """
+        Description:
+            Export an item and its descendants as LITP XML, written on the
+            MS.
+        Args:
+            path (str): item path
+            filepath (str): file on the MS
+        """
+        self._get(path)
+        lines = ["<?xml version='1.0' encoding='utf-8'?>"]
+        self._export_item(path, lines, 0)
+        xml_file = self.node_file(self.ms_hostname, filepath)
+        if not os.path.isdir(os.path.dirname(xml_file)):
+            os.makedirs(os.path.dirname(xml_file))
+        with open(xml_file, 'w') as xml:
+            xml.write('\n'.join(lines) + '\n')
+
+    def _export_item(self, path, lines, depth):
+        """
+        Description:
+            Append the XML of an item and its descendants to lines.
+        """
+        item = self.items[path]
+        indent = '  ' * depth
+        if item['type'].startswith('collection-of-'):
+            tag = 'litp:{0}-{1}-collection'.format(
+                self.items[_parent(path)]['type'], _item_id(path))
+        else:
+            tag = 'litp:' + item['type']
+        attrs = ''
+        if depth == 0:
+            attrs = (' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+                     ' xmlns:litp="{0}" xsi:schemaLocation="{0} '
+                     'litp-xml-schema/litp.xsd"'.format(LITP_NS))
+        lines.append('{0}<{1}{2} id={3}>'.format(
+            indent, tag, attrs, quoteattr(_item_id(path))))
+        for name in sorted(item['props']):
+            lines.append('{0}  <{1}>{2}</{1}>'.format(
+                indent, name, escape(item['props'][name])))
+        for child in self._children(path):
+            if self.items[child]['state'] != 'ForRemoval':
+                self._export_item(child, lines, depth + 1)
+        lines.append('{0}</{1}>'.format(indent, tag))
+
+    def load(self, path, filepath, mode=None):
+        """
+        Description:
+            Load LITP XML from the MS into a collection.
+        Args:
+            path (str): path of the collection loaded into
+            filepath (str): file on the MS
+            mode (str): None to only create new items, "merge" to also
+                        update existing items or "replace" to also delete
+                        the properties and children of existing items
+                        which are not in the XML
+        Raises:
+            CLIError if an item exists and no mode was given, or an item
+            or property is not valid.
+        """
+        self._get(path)
+        root = ET.parse(self.node_file(self.ms_hostname, filepath)).getroot()
+        self._load_item(path.rstrip('/'), root, mode)
+
+    def _load_item(self, parent, element, mode):
+        """
+        Description:
+            Create or update the item of an XML element and its children.
+        """
+        tag = element.tag.split('}')[-1]
+        path = '{0}/{1}'.format(parent, element.get('id'))
+        if tag.endswith('-collection'):
+            self._get(path)
+        else:
+            props = dict([(child.tag, child.text or '')
+                          for child in element
+                          if not child.tag.startswith('{')])
+            item = self.items.get(path)
+            if item is None or item['state'] == 'ForRemoval':
+                self.create(path, tag, props)
+            elif mode is None:
+                raise CLIError([(path, 'ItemExistsError    Item {0} '
+                                 'already exists'.format(path))])
+            elif mode == 'replace':
+                self.update(path, props, [name for name in item['props']
+                                          if name not in props])
+            else:
+                self.update(path, props)
+
+        loaded = []
+        for child in element:
+            if child.tag.startswith('{'):
+                loaded.append('{0}/{1}'.format(path, child.get('id')))
+                self._load_item(path, child, mode)
+        if mode == 'replace' and tag.endswith('-collection'):
+            for child in self._children(path):
+                if child not in loaded:
+                    self.remove(child)
+
+    def _plan_errors(self):
+        """
+        Returns:
+            list. (path, line) tuples of the create_plan validation errors.
+        """
+        errors = []
+        live = [path for path in sorted(self.items)
+                if self.items[path]['state'] != 'ForRemoval']
+        for path in live:
+            if self.items[path]['type'] == 'collection-of-logrotate-rule' \
+                    and not [child for child in self._children(path)
+                             if child in live]:
+                errors.append((path, 'CardinalityError    Create plan '
+                               'failed: This collection requires a minimum '
+                               'of 1 items not marked for removal'))
+
+        for configs in self.find('/', 'node-config', collections=True):
+            rule_configs = [path for path in self._children(configs)
+                            if path in live and self.items[path]['type']
+                            == 'logrotate-rule-config']
+            if len(rule_configs) > 1:
+                for path in rule_configs:
+                    errors.append((path, 'ValidationError    Create plan '
+                                   'failed: Only one "logrotate-rule-config"'
+                                   ' may be configured per node'))
+
+            names = {}
+            for config in rule_configs:
+                # Rules marked for removal keep their name until applied
+                for rule in self._children(config + '/rules'):
+                    names.setdefault(
+                        self.items[rule]['props']['name'], []).append(rule)
+            for name, rules in sorted(names.items()):
+                if len(rules) > 1:
+                    for rule in rules:
+                        errors.append((rule, 'ValidationError    Create plan '
+                                       'failed: The property "name" with '
+                                       'value "{0}" must be unique per '
+                                       'node'.format(name)))
+
+        for path in live:
+            props = self.items[path]['props']
+            # With create "false" the create_* properties are not rendered
+            if self.items[path]['type'] != 'logrotate-rule' or \
+                    props.get('create') == 'false':
+                continue
+            missing = []
+            for name, needs in CREATE_PREREQUISITES:
+                if name not in props:
+                    continue
+                for need in needs:
+                    if need not in props and need not in missing:
+                        missing.append(need)
+            for need in missing:
+                if need == 'create':
+                    msg = ('The property "create" must be set to "true" '
+                           'when any of the create_* properties is set')
+                else:
+                    msg = 'The property "{0}" must be set'.format(need)
+                errors.append((path, 'ValidationError    Create plan '
+                               'failed: ' + msg))
+        return errors
+
+    def create_plan(self):
+        """
+        Description:
+            Validate the model and create a plan with a task for every
+            logrotate-rule to write or delete, one phase per node.
+        Returns:
+            list. The plan's tasks, dicts with the keys phase, state, path
+            and desc as returned by litp_output_utils.parse_plan_output.
+        Raises:
+            CLIError if the model is not valid or there is nothing to do.
+        """
+        errors = self._plan_errors()
+        if errors:
+            raise CLIError(errors)
+        tasks = []
+        phases = {}
+        for path in self.find('/', 'logrotate-rule'):
+            item = self.items[path]
+            if item['state'] == 'Applied':
+                continue
+            hostname = self._hostname(path)
+            phase = phases.setdefault(hostname, len(phases) + 1)
+            name = (item['applied'] or item['props'])['name']
+            action = 'Remove' if item['state'] == 'ForRemoval' else \
+                'Create'
+            tasks.append({'phase': phase, 'state': 'Initial', 'path': path,
+                          'desc': '{0} logrotate rule "{1}" on node '
+                                  '"{2}"'.format(action, name, hostname)})
+        if not tasks:
+            raise CLIError([(None, 'DoNothingPlanError    Create plan '
+                             'failed: no tasks were generated')])
+        self.plan = sorted(tasks, key=lambda task: task['phase'])
+        self.plan_status = 'Initial'
+        return self.plan
+
+    def run_plan(self):
+        """
+        Description:
+            Start the plan. Tasks then progress each time the plan is
+            shown or step is called, as they would while polling a real
+            plan.
+        """
+        if self.plan is None or self.plan_status != 'Initial':
+            raise CLIError([(None, 'InvalidRequestError    Plan not '
+                             'in Initial state')])
+        self.plan_status = 'Running'
+
+    def stop_plan(self):
+        """
+        Description:
+            Stop the running plan once its running task has completed.
+        """
+        if self.plan_status != 'Running':
+            raise CLIError([(None, 'InvalidRequestError    Plan not '
+                             'currently running')])
+        self.plan_status = 'Stopping'
+
+    def remove_plan(self):
+        """
+        Description:
+            Remove the plan, unless it is running.
+        """
+        if self.plan is None:
+            raise CLIError([(None, 'InvalidLocationError    Plan does not '
+                             'exist')])
+        if self.plan_status in ('Running', 'Stopping'):
+            raise CLIError([(None, 'InvalidRequestError    Removing a '
+                             'running/stopping plan is not allowed')])
+        self.plan = None
+        self.plan_status = None
+
+    def step(self):
+        """
+        Description:
+            Progress a running plan by one task state change: start the
+            next task, or complete the running one and apply its effect.
+        Returns:
+            str. The plan status afterwards.
+        """
+        if self.plan_status not in ('Running', 'Stopping'):
+            return self.plan_status
+        running = [task for task in self.plan if task['state'] == 'Running']
+        if running:
+            self._apply(running[0])
+            running[0]['state'] = 'Success'
+        pending = [task for task in self.plan if task['state'] == 'Initial']
+        if self.plan_status == 'Stopping':
+            self.plan_status = 'Stopped'
+        elif not pending:
+            self.plan_status = 'Successful'
+            self._apply_structure()
+        elif not running:
+            pending[0]['state'] = 'Running'
+        return self.plan_status
+
+    def run_to_completion(self):
+        """
+        Description:
+            Step the plan until it is no longer running.
+        Returns:
+            str. The final plan status.
+        """
+        while self.step() in ('Running', 'Stopping'):
+            pass
+        return self.plan_status
+
+    def _apply(self, task):
+        """
+        Description:
+            Write or delete the file of a task's logrotate-rule on its node
+            and update the item.
+        """
+        item = self.items[task['path']]
+        hostname = self._hostname(task['path'])
+        if item['applied'] is not None:
+            old_file = self.node_file(hostname, '/etc/logrotate.d/' +
+                                      item['applied']['name'])
+            if os.path.exists(old_file):
+                os.remove(old_file)
+        if item['state'] == 'ForRemoval':
+            del self.items[task['path']]
+            return
+        with open(self.node_file(hostname, '/etc/logrotate.d/' +
+                                 item['props']['name']), 'w') as rule_file:
+            rule_file.write(logrotate_utils.render_rule_file(item['props']))
+        item['applied'] = dict(item['props'])
+        item['state'] = 'Applied'
+        # The rules collection and config have no tasks of their own
+        parent = task['path'].rsplit('/', 1)[0]
+        while parent in self.items and \
+                self.items[parent]['state'] == 'Initial':
+            self.items[parent]['applied'] = dict(self.items[parent]['props'])
+            self.items[parent]['state'] = 'Applied'
+            parent = parent.rsplit('/', 1)[0]
+
+    def _apply_structure(self):
+        """
+        Description:
+            Once a plan has succeeded, apply the items which have no tasks
+            of their own.
+        """
+        for path in sorted(self.items, reverse=True):
+            item = self.items[path]
+            if item['state'] == 'ForRemoval':
+                del self.items[path]
+            elif item['state'] != 'Applied':
+                item['applied'] = dict(item['props'])
+                item['state'] = 'Applied'
+
+    def show_plan(self):
+        """
+        Description:
+            Progress the plan by one step and render it as litp show_plan
+            does.
+        Returns:
+            list. Output lines.
+        """
+        if self.plan is None:
+            raise CLIError([(None, 'InvalidLocationError    Plan does not '
+                             'exist')])
+        self.step()
+        lines = []
+        phase = None
+        for task in self.plan:
+            if task['phase'] != phase:
+                phase = task['phase']
+                lines.extend(['', 'Phase {0}'.format(phase),
+                              'Task status', '-----------'])
+            lines.append('{0}\t\t{1}'.format(task['state'], task['path']))
+            lines.append('\t\t' + task['desc'])
+        lines.extend(['', 'Plan Status: {0}'.format(self.plan_status)])
+        return lines
+
+    def run_cli(self, cmd):
+        """
+        Description:
+            Run a litp command line against the model, split into
+            arguments and with its variables expanded as the shell on the
+            MS would.
+        Args:
+            cmd (str): command, e.g. "litp create -t logrotate-rule -p
+                       /path -o name=rule1 path=/var/log/rule1.log"
+        Returns:
+            tuple. (stdout, stderr, rc) as run_command returns them.
+        """
+        args = shlex.split(_expand_vars(cmd))[1:]
+        action = args.pop(0) if args else None
+        opts = {'-o': [], '-d': []}
+        while args:
+            arg = args.pop(0)
+            if arg in ('-o', '-d'):
+                while args and not args[0].startswith('-'):
+                    opts[arg].append(args.pop(0))
+            elif arg in ('-t', '-p', '-f') and args:
+                opts[arg] = args.pop(0)
+            else:
+                opts[arg] = True
+        invalid = [token for token in opts['-o'] if '=' not in token]
+        if invalid:
+            # Rejected by the CLI's argument parser, which names the first
+            usage = [CLI_USAGE[action]] if action in CLI_USAGE else []
+            return [], usage + [
+                'litp {0}: error: argument -o/--options: invalid option : '
+                '{1}'.format(action, invalid[:1])], 2
+        props = dict([token.partition('=')[::2] for token in opts['-o']])
+
+        stdout = []
+        try:
+            if action == 'create':
+                self.create(opts.get('-p'), opts.get('-t'), props)
+            elif action == 'update':
+                # -d takes names separated by spaces or commas
+                delete = [name for names in opts['-d']
+                          for name in names.split(',') if name]
+                self.update(opts.get('-p'), props, delete)
+            elif action == 'remove':
+                self.remove(opts.get('-p'))
+            elif action == 'show':
+                item = self.show(opts.get('-p'))
+                stdout = [opts.get('-p'), '    type: ' + item['type'],
+                          '    state: ' + item['state']]
+                if item['properties']:
+                    stdout.append('    properties:')
+                    for name in sorted(item['properties']):
+                        stdout.append('        {0}: {1}'.format(
+                            name, item['properties'][name]))
+            elif action == 'export':
+                self.export(opts.get('-p'), opts.get('-f'))
+            elif action == 'load':
+                mode = 'merge' if '--merge' in opts else \
+                    'replace' if '--replace' in opts else None
+                self.load(opts.get('-p'), opts.get('-f'), mode)
+            elif action == 'create_plan':
+                self.create_plan()
+            elif action == 'run_plan':
+                self.run_plan()
+            elif action == 'stop_plan':
+                self.stop_plan()
+            elif action == 'remove_plan':
+                self.remove_plan()
+            elif action == 'show_plan':
+                stdout = self.show_plan()
+            else:
+                raise CLIError([(None, 'litp: error: invalid choice: '
+                                 '{0!r}'.format(action))])
+        except CLIError as err:
+            return [], err.lines(), 1
+        return stdout, [], 0
+
+    def applied_rule(self, hostname, name):
+        """
+        Args:
+            hostname (str): node hostname
+            name (str): name of a rule file in /etc/logrotate.d
+        Returns:
+            dict. Applied properties of the logrotate-rule whose file it
+            is, None if no rule of the node has that name.
+        """
+        for path in self.find('/', 'logrotate-rule'):
+            applied = self.items[path]['applied']
+            if applied and applied.get('name') == name and \
+                    self._hostname(path) == hostname:
+                return dict(applied)
+        return None
+
+    def snapshot(self, hostname, directory):
+        """
+        Description:
+            Archive a directory of a node as the command built by
+            logrotate_utils.get_snapshot_cmd does.
+        Args:
+            hostname (str): node hostname
+            directory (str): directory on the node
+        Returns:
+            list. The output lines, to be passed to
+            logrotate_utils.DirSnapshot.
+        """
+        archive = io.BytesIO()
+        tar = tarfile.open(fileobj=archive, mode='w:gz')
+        tar.add(self.node_file(hostname, directory), arcname='.')
+        tar.close()
+        return [base64.b64encode(archive.getvalue()).decode('ascii')]
+
+    def run_cmd(self, hostname, cmd):
+        """
+        Description:
+            Run a command line on a node, command by command as
+            split_commands splits it and with the shell's ;, && and ||
+            semantics: litp commands against the model, assignments of
+            variables, exit and the file commands of _run_file_cmd.
+        Args:
+            hostname (str): node hostname
+            cmd (str): command line
+        Returns:
+            tuple. (stdout, stderr, rc) as run_command returns them.
+        """
+        std_out, std_err, rc = [], [], 0
+        variables = {}
+        for separator, command in split_commands(cmd):
+            if separator == '&&' and rc != 0 or \
+                    separator == '||' and rc == 0:
+                continue
+            if command.split(' ', 1)[0] in LITP_COMMANDS:
+                out, err, rc = self.run_cli(command)
+                std_out.extend(out)
+                std_err.extend(err)
+                continue
+            last_rc = rc
+            words = shlex.split(_NODE_VAR_RE.sub(
+                lambda var: str(last_rc) if var.group(1) == '?' else
+                variables.get(var.group(1).strip('{}'), ''), command))
+            assignment = _ASSIGNMENT_RE.match(words[0])
+            if assignment and len(words) == 1:
+                variables[assignment.group(1)] = assignment.group(2)
+                rc = 0
+            elif words[0] == 'exit':
+                return std_out, std_err, \
+                    int(words[1]) if len(words) > 1 else rc
+            else:
+                out, err, rc = self._run_file_cmd(hostname, words)
+                std_out.extend(out)
+                std_err.extend(err)
+        return std_out, std_err, rc
+
+    def _run_file_cmd(self, hostname, words):
+        """
+        Description:
+            Run cat, du, rm, mkdir or mv, with the flags the testsets use, on
+            the files of a node. Any other command fails as a command the
+            node does not have.
+        Args:
+            hostname (str): node hostname
+            words (list): the command's words, after quote removal
+        Returns:
+            tuple. (stdout, stderr, rc)
+        """
+        program = os.path.basename(words[0])
+        flags = ''.join([word[1:] for word in words[1:]
+                         if word.startswith('-')])
+        paths = [word for word in words[1:] if not word.startswith('-')]
+        local = [self.node_file(hostname, path) for path in paths]
+        missing = '{0}: {1}: No such file or directory'
+        if program == 'cat':
+            std_out = []
+            for path, local_path in zip(paths, local):
+                if not os.path.isfile(local_path):
+                    return std_out, [missing.format(words[0], path)], 1
+                with open(local_path) as local_file:
+                    std_out.extend(local_file.read().splitlines())
+            return std_out, [], 0
+        if program == 'du' and 's' in flags and 'k' in flags:
+            std_out = []
+            for path, local_path in zip(paths, local):
+                if not os.path.exists(local_path):
+                    return std_out, [missing.format(words[0], path)], 1
+                local_files = [local_path]
+                for dirpath, _, filenames in os.walk(local_path):
+                    local_files.extend([os.path.join(dirpath, filename)
+                                        for filename in filenames])
+                # Disk usage, as du reports it, rather than file size
+                blocks = sum([os.lstat(local_file).st_blocks
+                              for local_file in local_files])
+                std_out.append('{0}\t{1}'.format(blocks // 2, path))
+            return std_out, [], 0
+        if program == 'rm':
+            for path, local_path in zip(paths, local):
+                matches = glob.glob(local_path)
+                if not matches and 'f' not in flags:
+                    return [], [missing.format(words[0], path)], 1
+                for match in matches:
+                    if os.path.isdir(match) and 'r' in flags:
+                        shutil.rmtree(match)
+                    elif os.path.isdir(match):
+                        return [], ['{0}: {1}: Is a directory'.format(
+                            words[0], path)], 1
+                    else:
+                        os.remove(match)
+            return [], [], 0
+        if program == 'mkdir':
+            for path, local_path in zip(paths, local):
+                if os.path.isdir(local_path) and 'p' in flags:
+                    continue
+                if os.path.exists(local_path) or not os.path.isdir(
+                        os.path.dirname(local_path)) and 'p' not in flags:
+                    return [], ['{0}: cannot create directory {1}'.format(
+                        words[0], path)], 1
+                os.makedirs(local_path)
+            return [], [], 0
+        if program == 'mv' and len(paths) > 1:
+            sources = []
+            for path, local_path in zip(paths[:-1], local[:-1]):
+                matches = sorted(glob.glob(local_path))
+                if not matches:
+                    return [], [missing.format(words[0], path)], 1
+                sources.extend(matches)
+            for source in sources:
+                target = local[-1]
+                if os.path.isdir(target):
+                    target = os.path.join(target, os.path.basename(source))
+                shutil.move(source, target)
+            return [], [], 0
+        return [], ['{0}: command not available offline'.format(
+            words[0])], 127
+
+
+class OfflineCLIMixin(object):
+    """
+    Mixed in ahead of a testset, runs its litp commands, model queries
+    and node commands against the OfflineModel of an
+    OfflineDeploymentMixin instead of the MS and nodes, including the
+    litp commands of _run_cmds_batch and _run_cli_batch batches. Nothing
+    goes over SSH: the testset's connection pool is never opened.
+    """
+
+    use_conn_pool = False
+    conn_pool = None
+
+    def _offline_cli(self, cmd, expect_positive):
+        """
+        Description:
+            Run a litp command against the model with the asserts of the
+            execute_cli_* helpers.
+        Returns:
+            tuple. (stdout, stderr, rc)
+        """
+        std_out, std_err, rc = self.offline_model.run_cli(cmd)
+        if expect_positive:
+            self.assertEqual(0, rc, std_err)
+            self.assertEqual([], std_err)
+        else:
+            self.assertNotEqual(0, rc)
+            self.assertNotEqual([], std_err)
+        return std_out, std_err, rc
+
+    def run_command(self, node, cmd, add_to_cleanup=True, su_root=False,
+                    default_asserts=False, **kwargs):
+        """
+        Description:
+            Run a command line on a node of the model, see
+            OfflineModel.run_cmd.
+        Returns:
+            tuple. (stdout, stderr, rc)
+        """
+        std_out, std_err, rc = self.offline_model.run_cmd(node, cmd)
+        if default_asserts:
+            self.assertEqual(0, rc, std_err)
+            self.assertEqual([], std_err)
+        return std_out, std_err, rc
+
+    def _fan_out(self, func, nodes):
+        """
+        Description:
+            Run a per-node operation on every node in turn: the model
+            gains nothing from threads, and a test skipped in func has to
+            be skipped in the test's thread.
+        Returns:
+            dict. node to the value returned by func for that node.
+        """
+        return dict([(node, func(node)) for node in nodes])
+
+    def _run_cmds_batch(self, node, cmds, su_root=False):
+        """
+        Description:
+            Run a batch command by command, so that its litp commands go
+            to the model rather than to the MS inside a batch script.
+        Returns:
+            list. One (stdout, stderr, rc) tuple per command.
+        """
+        return [self.run_command(node, cmd, su_root=su_root)
+                for cmd in cmds]
+
+    def _run_cli_batch(self, cmds, check=True):
+        """
+        Description:
+            Run the litp commands of a benchmark batch against the model.
+        """
+        for cmd in cmds:
+            _, std_err, rc = self.offline_model.run_cli(cmd)
+            if check:
+                self.assertEqual(0, rc, "{0}: {1}".format(cmd, std_err))
+
+    def execute_cli_create_cmd(self, node, url, class_type, props='',
+                               args='', expect_positive=True, **kwargs):
+        """
+        Description:
+            litp create against the model.
+        """
+        return self._offline_cli('litp create -t {0} -p {1} -o {2} {3}'.format(
+            class_type, url, props, args), expect_positive)
+
+    def execute_cli_update_cmd(self, node, url, props, args='',
+                               action_del=False, expect_positive=True,
+                               **kwargs):
+        """
+        Description:
+            litp update against the model, deleting the properties named
+            in props if action_del is set.
+        """
+        return self._offline_cli('litp update -p {0} {1} {2} {3}'.format(
+            url, '-d' if action_del else '-o', props, args), expect_positive)
+
+    def execute_cli_remove_cmd(self, node, url, args='',
+                               expect_positive=True, **kwargs):
+        """
+        Description:
+            litp remove against the model.
+        """
+        return self._offline_cli('litp remove -p {0} {1}'.format(url, args),
+                                 expect_positive)
+
+    def execute_cli_export_cmd(self, node, url, filepath='', args='',
+                               expect_positive=True, **kwargs):
+        """
+        Description:
+            litp export against the model.
+        """
+        return self._offline_cli('litp export -p {0} -f {1} {2}'.format(
+            url, filepath, args), expect_positive)
+
+    def execute_cli_load_cmd(self, node, url, filepath, args='',
+                             expect_positive=True, **kwargs):
+        """
+        Description:
+            litp load against the model.
+        """
+        return self._offline_cli('litp load -p {0} -f {1} {2}'.format(
+            url, filepath, args), expect_positive)
+
+    def execute_cli_createplan_cmd(self, node, args='',
+                                   expect_positive=True, **kwargs):
+        """
+        Description:
+            litp create_plan against the model.
+        """
+        return self._offline_cli('litp create_plan ' + args,
+                                 expect_positive)
+
+    def execute_cli_runplan_cmd(self, node, args='', expect_positive=True,
+                                **kwargs):
+        """
+        Description:
+            litp run_plan against the model.
+        """
+        return self._offline_cli('litp run_plan ' + args, expect_positive)
+
+    def execute_cli_stopplan_cmd(self, node, args='', expect_positive=True,
+                                 **kwargs):
+        """
+        Description:
+            litp stop_plan against the model.
+        """
+        return self._offline_cli('litp stop_plan ' + args, expect_positive)
+
+    def execute_cli_removeplan_cmd(self, node, args='',
+                                   expect_positive=True, **kwargs):
+        """
+        Description:
+            litp remove_plan against the model.
+        """
+        return self._offline_cli('litp remove_plan ' + args,
+                                 expect_positive)
+
+    def execute_cli_showplan_cmd(self, node, args='', expect_positive=True,
+                                 **kwargs):
+        """
+        Description:
+            litp show_plan against the model.
+        """
+        return self._offline_cli('litp show_plan ' + args, expect_positive)
+
+    def wait_for_plan_state(self, node, state, *args, **kwargs):
+        """
+        Description:
+            Step the plan until it stops running.
+        Returns:
+            bool. True if the plan ended in the given state.
+        """
+        return self.offline_model.run_to_completion() == state
+
+    def find(self, node, path, resource, rtn_type_children=True,
+             assert_not_empty=True, **kwargs):
+        """
+        Description:
+            Find items, or collections if rtn_type_children is False, of a
+            type in the model.
+        """
+        found = self.offline_model.find(path, resource,
+                                        collections=not rtn_type_children)
+        if assert_not_empty:
+            self.assertNotEqual([], found)
+        return found
+
+    def get_props_from_url(self, node, url, filter_prop=None, **kwargs):
+        """
+        Description:
+            Properties of a model item, or the value of one of them.
+        """
+        props = self.offline_model.show(url)['properties']
+        if filter_prop:
+            return props.get(filter_prop)
+        return props
+
+    def execute_show_data_cmd(self, node, url, filter_value,
+                              expect_positive=True, **kwargs):
+        """
+        Description:
+            Value of a property of a model item, asserted to be set, or to
+            be unset if expect_positive is False.
+        """
+        props = self.offline_model.show(url)['properties']
+        if expect_positive:
+            self.assertTrue(filter_value in props, props)
+        else:
+            self.assertFalse(filter_value in props, props)
+        return props.get(filter_value)
+
+    def get_item_state(self, node, url, **kwargs):
+        """
+        Description:
+            State of a model item.
+        """
+        return self.offline_model.show(url)['state']
+
+    def is_all_applied(self, node, **kwargs):
+        """
+        Description:
+            Check whether every item of the model is applied.
+        """
+        return not [item for item in self.offline_model.items.values()
+                    if item['state'] != 'Applied']
+
+    def _snapshot_logrotated(self, node):
+        """
+        Description:
+            Snapshot /etc/logrotate.d on a node of the model.
+        Returns:
+            logrotate_utils.DirSnapshot of the directory.
+        """
+        return logrotate_utils.DirSnapshot(
+            self.offline_model.snapshot(node, '/etc/logrotate.d'))
+
+    def _run_rotation_workload(self, node, rule_filename, log_files, cycles,
+                               size_kb, compressibility=0.0, spacing_secs=0):
+        """
+        Description:
+            Run the append and rotate cycles of a workload with the local
+            logrotate, in a LogrotateSandbox on the node's files, for the
+            rule the model applied on the node. Rather than sleeping
+            between cycles the sandbox's clock is advanced. The test is
+            skipped where logrotate is not installed, or where the rule
+            needs faketime and it is not.
+        Returns:
+            list. The per cycle report, as the testset's
+            _run_rotation_workload returns it.
+        """
+        if not logrotate_sandbox.is_available():
+            self.skipTest("{0} is not installed".format(
+                logrotate_sandbox.LOGROTATE))
+        name = os.path.basename(rule_filename)
+        props = self.offline_model.applied_rule(node, name)
+        self.assertNotEqual(None, props, "No rule {0} on {1}".format(
+            name, node))
+        sandbox = logrotate_sandbox.LogrotateSandbox(
+            props, root_dir=os.path.join(
+                self.offline_model.root_dir, 'sandboxes', node, name),
+            fs_dir=self.offline_model.node_file(node, '/'))
+
+        report = []
+        for cycle in range(1, cycles + 1):
+            paths = []
+            for pattern in log_files:
+                paths.extend(sandbox.files(pattern) or
+                             ([] if glob.has_magic(pattern) else [pattern]))
+            for path in paths:
+                sandbox.write_log(path, size_kb,
+                                  compressibility=compressibility)
+            log_bytes = sum([os.path.getsize(sandbox.path(path))
+                             for path in paths])
+            if spacing_secs and cycle > 1:
+                sandbox.advance(seconds=spacing_secs)
+            start = time.time()
+            try:
+                result = sandbox.rotate()
+            except logrotate_sandbox.FaketimeRequiredError as err:
+                self.skipTest(str(err))
+            result.update({'cycle': cycle, 'log_bytes': log_bytes,
+                           'millis': int((time.time() - start) * 1000)})
+            self.assertEqual(0, result['rc'], result)
+            self.assertEqual([], result['errors'], result)
+            report.append(result)
+        return report
+
+
+class OfflineDeploymentMixin(object):
+    """
+    Stands in for the deployment facing parts of GenericTest on the node
+    files of an OfflineModel: setUp, tearDown, the node names and the
+    node file helpers. GenericTest's own setUp and tearDown, which
+    connect to the deployment, are never called, so the mixin must come
+    right before GenericTest in the method resolution order: mix it into
+    a GenericTest subclass given as the last base of the offline testset.
+    """
+
+    offline_model = None
+
+    def setUp(self):
+        """
+        Description:
+            Create a fresh model for every test, with the
+            logrotate-rule-configs of a deployment.
+        """
+        self.offline_model = OfflineModel(rule_configs=True)
+
+    def tearDown(self):
+        """
+        Description:
+            Delete the model's node files.
+        """
+        self.offline_model.cleanup()
+
+    def get_management_node_filename(self):
+        """
+        Returns:
+            str. Hostname of the model's MS.
+        """
+        return self.offline_model.ms_hostname
+
+    def get_managed_node_filenames(self):
+        """
+        Returns:
+            list. Hostnames of the model's peer nodes.
+        """
+        return list(self.offline_model.nodes)
+
+    def get_file_contents(self, node, filepath, su_root=False, **kwargs):
+        """
+        Description:
+            Lines of a node file, stripped and without blank lines.
+        """
+        local_path = self.offline_model.node_file(node, filepath)
+        self.assertTrue(os.path.isfile(local_path),
+                        "{0} not found on {1}".format(filepath, node))
+        with open(local_path) as local_file:
+            return [line.strip() for line in local_file.read().splitlines()
+                    if line.strip()]
+
+    def list_dir_contents(self, node, dirpath, su_root=False,
+                          grep_args=None, **kwargs):
+        """
+        Description:
+            Names in a node directory, sorted, filtered by the pattern of
+            grep_args if given. The pattern is matched as a Python regular
+            expression, which agrees with grep on the testsets' patterns.
+        """
+        local_path = self.offline_model.node_file(node, dirpath)
+        self.assertTrue(os.path.isdir(local_path),
+                        "{0} not found on {1}".format(dirpath, node))
+        names = sorted(os.listdir(local_path))
+        if grep_args:
+            pattern = re.compile(shlex.split(grep_args)[-1])
+            names = [name for name in names if pattern.search(name)]
+        return names
+
+    def remote_path_exists(self, node, path, expect_file=True,
+                           su_root=False, **kwargs):
+        """
+        Returns:
+            bool. True if the node has a file at path, or anything at path
+            if expect_file is False.
+        """
+        local_path = self.offline_model.node_file(node, path)
+        if expect_file:
+            return os.path.isfile(local_path)
+        return os.path.exists(local_path)
+
+    def generate_file(self, node, filepath, size, **kwargs):
+        """
+        Description:
+            Write a node file of size KB of random data.
+        """
+        local_path = self.offline_model.node_file(node, filepath)
+        if not os.path.isdir(os.path.dirname(local_path)):
+            os.makedirs(os.path.dirname(local_path))
+        with open(local_path, 'wb') as local_file:
+            local_file.write(os.urandom(size * 1024))
+
+    def append_files(self, node, target, source, **kwargs):
+        """
+        Description:
+            Append a node file to another, creating it if missing.
+        """
+        target_path = self.offline_model.node_file(node, target)
+        if not os.path.isdir(os.path.dirname(target_path)):
+            os.makedirs(os.path.dirname(target_path))
+        with open(self.offline_model.node_file(node, source), 'rb') as src:
+            with open(target_path, 'ab') as dst:
+                dst.write(src.read())
+
+    def copy_file_to(self, node, local_filepath, remote_filepath,
+                     **kwargs):
+        """
+        Returns:
+            bool. True once the local file is copied to the node file.
+        """
+        target_path = self.offline_model.node_file(node, remote_filepath)
+        if not os.path.isdir(os.path.dirname(target_path)):
+            os.makedirs(os.path.dirname(target_path))
+        shutil.copy(local_filepath, target_path)
+        return True
+
+    def backup_dir(self, node, dirpath, **kwargs):
+        """
+        Description:
+            Nothing to back up: the node files are deleted with the model.
+        """
+
+
+def get_invalid_creates(testset_file, test_name):
+    """
+    Description:
+        Read the rule sets a testset method passes to
+        _assert_invalid_creates, i.e. the literal rule_set dictionaries
+        assigned since the last "rule_sets = []" before each call.
+    Args:
+        testset_file (str): path of the testset
+        test_name (str): name of the test method
+    Returns:
+        list. The rule sets, one list per call.
+    """
+    with open(testset_file) as source:
+        tree = ast.parse(source.read())
+    method = [node for node in ast.walk(tree)
+              if isinstance(node, ast.FunctionDef) and
+              node.name == test_name][0]
+    statements = sorted([node for node in ast.walk(method)
+                         if isinstance(node, (ast.Assign, ast.Expr))],
+                        key=lambda node: node.lineno)
+    calls = []
+    rule_sets = []
+    for node in statements:
+        if isinstance(node, ast.Assign):
+            name = getattr(node.targets[0], 'id', None)
+            if name == 'rule_sets':
+                rule_sets = []
+            elif name == 'rule_set' and isinstance(node.value, ast.Dict):
+                try:
+                    rule_sets.append(ast.literal_eval(node.value))
+                except ValueError:
+                    pass
+        elif isinstance(node.value, ast.Call) and getattr(
+                node.value.func, 'attr', None) == '_assert_invalid_creates':
+            calls.append(rule_sets)
+    return calls
+
+
+def check_invalid_creates(rule_sets):
+    """
+    Description:
+        Run invalid logrotate-rule creates against a fresh model, as
+        _assert_invalid_creates sends them, and compare their errors with
+        the expected ones.
+    Args:
+        rule_sets (list): dictionaries with the description, param and
+                          results of each case
+    Returns:
+        list. (description, rc, missing, unexpected) tuples of the cases
+        which did not fail with exactly the expected errors.
+    """
+    model = OfflineModel()
+    try:
+        config = '/deployments/d1/clusters/c1/nodes/n1/configs/logrotate'
+        model.create(config, 'logrotate-rule-config')
+        mismatches = []
+        for index, rule in enumerate(rule_sets):
+            _, std_err, rc = model.run_cli(
+                'litp create -t logrotate-rule -p {0}/rules/rule_{1} '
+                '-o {2}'.format(config, index, rule['param']))
+            missing, unexpected = litp_output_utils.diff_errors(
+                litp_output_utils.parse_error_output(std_err),
+                [(result['path'], result['msg'])
+                 for result in rule['results']])
+            if rc == 0 or missing or unexpected:
+                mismatches.append(
+                    (rule['description'], rc, missing, unexpected))
+        return mismatches
+    finally:
+        model.cleanup()
+
+
+if __name__ == '__main__':
+    # offline_litp.py <testset file> <test method>
+    FAILED = 0
+    for RULE_SETS in get_invalid_creates(*sys.argv[1:3]):
+        MISMATCHES = check_invalid_creates(RULE_SETS)
+        for MISMATCH in MISMATCHES:
+            print('{0}\n    rc: {1}\n    missing: {2}\n    unexpected: '
+                  '{3}'.format(*MISMATCH))
+        print('{0} of {1} invalid creates match'.format(
+            len(RULE_SETS) - len(MISMATCHES), len(RULE_SETS)))
+        FAILED += len(MISMATCHES)
+    sys.exit(1 if FAILED else 0)
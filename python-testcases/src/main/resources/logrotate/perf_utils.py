@@ -0,0 +1,461 @@
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Timing of the numbered steps of a test and of its helpers:
+            wall time, remote calls and characters transferred, written out
+            per test and merged into the nosetests xunit report when the
+            nosetests process exits.
+'''
+
+import atexit
+import base64
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+# Numbered step log messages, e.g. "3. Force a logrotate on syslog" or
+# "9.2 Create plan"
+STEP_LOG_RE = re.compile(r'^\s*\d+\s*\.')
+
+STEP_TIMING_DIR = os.environ.get("STEP_TIMING_DIR", "step_timings")
+
+# Upper bounds, in seconds, of the remote call latency histogram buckets
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float('inf')]
+
+# Batch and workload command lines, see session_utils.get_batch_cmd
+BATCH_CMD_RE = re.compile(
+    r'^/bin/echo (\S+) \| /usr/bin/base64 -d \| /bin/bash$')
+
+# Command categories, the first whose pattern matches a command is used
+CMD_CATEGORIES = [
+    ('litp', re.compile(r'(^|[\s/;&|(])litp\s')),
+    ('logrotate', re.compile(r'logrotate\s|logrotate$')),
+    ('puppet', re.compile(r'(^|[\s/])(puppet|mco)\s')),
+    ('file', re.compile(
+        r'(^|[\s/])(cat|ls|rm|cp|mv|mkdir|touch|stat|tar|sed|grep|du|'
+        r'find|tail|head|echo|chmod|chown|test)\s')),
+]
+
+
+def categorise(cmd):
+    """
+    Description:
+        Work out the category of a remote command for latency accounting.
+        A batch or workload script is categorised by the commands it
+        runs, e.g. a batch which runs logrotate is a logrotate call.
+    Args:
+        cmd (str): command
+    Returns:
+        str. One of the CMD_CATEGORIES names or "other".
+    """
+    batch = BATCH_CMD_RE.match(cmd)
+    if batch:
+        try:
+            cmd = base64.b64decode(batch.group(1)).decode('utf-8')
+        except (TypeError, ValueError):
+            pass
+    for name, pattern in CMD_CATEGORIES:
+        if pattern.search(cmd):
+            return name
+    return 'other'
+
+
+def _new_counters():
+    """
+    Returns:
+        dict. Zeroed counters of a step or helper.
+    """
+    return {'wall_secs': 0.0, 'calls': 0, 'chars': 0}
+
+
+class StepTimer(object):
+    """
+    Records, per step of a test and per helper method, the wall time, the
+    number of remote calls and the characters of the commands sent and of
+    the output lines received by them.
+
+    Steps start with start_step or when a numbered step is logged, see
+    log_step. A step entered more than once, e.g. in a loop, accumulates
+    its figures.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.steps = []
+        self.step_index = {}
+        self.helpers = {}
+        self.categories = {}
+        self.current = None
+        self.step_start = None
+        self.start_step('setUp')
+
+    def start_step(self, name):
+        """
+        Description:
+            End the current step and start a new one.
+        Args:
+            name (str): step name, e.g. "4. Create plan"
+        """
+        with self.lock:
+            now = time.time()
+            if self.current is not None:
+                self.current['wall_secs'] += now - self.step_start
+            self.current = self.step_index.get(name)
+            if self.current is None:
+                self.current = dict(_new_counters(), name=name)
+                self.step_index[name] = self.current
+                self.steps.append(self.current)
+            self.step_start = now
+
+    def log_step(self, message):
+        """
+        Description:
+            Start a new step if message is a numbered step.
+        Args:
+            message (str): logged message
+        """
+        if STEP_LOG_RE.match(message):
+            self.start_step(message.strip())
+
+    def record_call(self, cmd, result, secs=0.0):
+        """
+        Description:
+            Count a remote call against the current step and every helper
+            the calling thread is in, and add its latency to the histogram
+            of its command category.
+        Args:
+            cmd (str): command sent
+            result (tuple): (stdout, stderr, rc) received
+            secs (float): latency of the call
+        """
+        chars = len(cmd) + sum([len(line) + 1
+                               for line in result[0] + result[1]])
+        bucket = [index for index, bound in enumerate(LATENCY_BUCKETS)
+                  if secs <= bound][0]
+        with self.lock:
+            category = self.categories.setdefault(
+                categorise(cmd), {'calls': 0, 'total_secs': 0.0,
+                                  'max_secs': 0.0,
+                                  'histogram': [0] * len(LATENCY_BUCKETS)})
+            category['calls'] += 1
+            category['total_secs'] += secs
+            category['max_secs'] = max(category['max_secs'], secs)
+            category['histogram'][bucket] += 1
+
+            counters = [self.helpers[name] for name in
+                        set(getattr(self.local, 'helpers', []))]
+            if self.current is not None:
+                counters.append(self.current)
+            for counter in counters:
+                counter['calls'] += 1
+                counter['chars'] += chars
+
+    def helper(self, name, func, *args, **kwargs):
+        """
+        Description:
+            Call a helper, timing it and counting its remote calls.
+        Args:
+            name (str): helper name
+            func (callable): the helper
+        Returns:
+            The helper's return value.
+        """
+        stack = getattr(self.local, 'helpers', None)
+        if stack is None:
+            stack = self.local.helpers = []
+        with self.lock:
+            counters = self.helpers.setdefault(
+                name, dict(_new_counters(), count=0))
+            counters['count'] += 1
+        stack.append(name)
+        start = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stack.pop()
+            if name not in stack:
+                with self.lock:
+                    counters['wall_secs'] += time.time() - start
+
+    def finish(self):
+        """
+        Description:
+            End the current step.
+        Returns:
+            dict. The steps, in order, the helpers by name and the remote
+            call categories by name.
+        """
+        with self.lock:
+            if self.current is not None:
+                self.current['wall_secs'] += time.time() - self.step_start
+                self.current = None
+            return {'steps': list(self.steps), 'helpers': dict(self.helpers),
+                    'categories': dict(self.categories)}
+
+    def total_calls(self):
+        """
+        Returns:
+            int. Number of remote calls recorded so far.
+        """
+        with self.lock:
+            return sum([category['calls']
+                        for category in self.categories.values()])
+
+    def format_categories(self):
+        """
+        Returns:
+            str. One line per command category with its call count,
+            total and maximum latency and latency histogram.
+        """
+        with self.lock:
+            return '\n'.join([
+                '{0}: {1} calls, {2:.1f}s total, {3:.1f}s max, {4}'.format(
+                    name, category['calls'], category['total_secs'],
+                    category['max_secs'], ' '.join([
+                        '<={0}s:{1}'.format(bound, count) for bound, count
+                        in zip(LATENCY_BUCKETS, category['histogram'])
+                        if count]))
+                for name, category in sorted(self.categories.items())])
+
+
+def timed(func):
+    """
+    Description:
+        Decorator for test helpers: if the test has a StepTimer as
+        step_timer, the helper's calls are timed and counted.
+    """
+    def _timed(self, *args, **kwargs):
+        timer = getattr(self, 'step_timer', None)
+        if timer is None:
+            return func(self, *args, **kwargs)
+        return timer.helper(func.__name__, func, self, *args, **kwargs)
+    _timed.__name__ = func.__name__
+    _timed.__doc__ = func.__doc__
+    return _timed
+
+
+def budget(max_calls=None, max_secs=None):
+    """
+    Description:
+        Decorator, declared next to a test's @attr tags, which fails the
+        test if it makes more remote calls or takes longer than allowed.
+        The remote calls are those counted by the test's step_timer. The
+        budget is only checked if the test itself passed.
+    Args:
+        max_calls (int): most remote round trips allowed
+        max_secs (float): longest wall time allowed for the test method
+    """
+    def _decorator(func):
+        @functools.wraps(func)
+        def _budgeted(self, *args, **kwargs):
+            start = time.time()
+            result = func(self, *args, **kwargs)
+            secs = time.time() - start
+            timer = getattr(self, 'step_timer', None)
+            calls = timer.total_calls() if timer is not None else 0
+            over = []
+            if max_calls is not None and calls > max_calls:
+                over.append('{0} remote round trips (budget {1})'.format(
+                    calls, max_calls))
+            if max_secs is not None and secs > max_secs:
+                over.append('{0:.0f}s wall time (budget {1}s)'.format(
+                    secs, max_secs))
+            if over:
+                raise AssertionError(
+                    '{0} exceeded its performance budget: {1}{2}'.format(
+                        func.__name__, ', '.join(over),
+                        '\n' + timer.format_categories() if timer else ''))
+            return result
+        _budgeted.__wrapped__ = func
+        return _budgeted
+    return _decorator
+
+
+class StepTimingMixin(object):
+    """
+    Mixed in ahead of GenericTest, times the numbered steps the test logs
+    and the remote calls it makes. setUp calls start_timing once the
+    super class setUp has run, tearDown calls finish_timing before the
+    super class tearDown.
+    """
+
+    step_timer = None
+
+    def start_timing(self):
+        """
+        Description:
+            Start timing the test method as a step of its own, until the
+            first numbered step is logged.
+        """
+        self.step_timer = StepTimer()
+        self.step_timer.start_step(self._testMethodName)
+
+    def finish_timing(self):
+        """
+        Description:
+            Log the remote calls by category and write the step timings
+            of the test, see write_report.
+        """
+        self.log("info", "Remote calls by category:\n{0}".format(
+            self.step_timer.format_categories()))
+        write_report(self.id(), self.step_timer.finish())
+
+    def log(self, level, message, *args, **kwargs):
+        """
+        Description:
+            Logs a message, starting a new timed step if it is a numbered
+            step such as "3. Force log rotation"
+        Args:
+            level (str): log level
+            message (str): message to be logged
+        """
+        if self.step_timer is not None:
+            self.step_timer.log_step(message)
+        return super(StepTimingMixin, self).log(
+            level, message, *args, **kwargs)
+
+
+def get_xunit_file(argv=None, environ=None):
+    """
+    Description:
+        Work out the xunit report written by the running nosetests
+        process from its command line and environment.
+    Args:
+        argv (list): command line, defaults to sys.argv
+        environ (dict): environment, defaults to os.environ
+    Returns:
+        str. Absolute path of the report, or None if nosetests does not
+        write one.
+    """
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    if '--with-xunit' not in argv and not environ.get('NOSE_WITH_XUNIT'):
+        return None
+    xunit_file = environ.get('NOSE_XUNIT_FILE', 'nosetests.xml')
+    for index, arg in enumerate(argv):
+        if arg == '--xunit-file' and index + 1 < len(argv):
+            xunit_file = argv[index + 1]
+        elif arg.startswith('--xunit-file='):
+            xunit_file = arg.split('=', 1)[1]
+    return os.path.abspath(xunit_file)
+
+
+_merge_lock = threading.Lock()
+_merges = set()
+
+
+def _merge_at_exit(xunit_file, directory):
+    """
+    Description:
+        atexit handler which merges the step timings into the xunit
+        report nosetests has written by then.
+    """
+    if os.path.isfile(xunit_file):
+        merge_into_xunit(xunit_file, directory)
+
+
+def write_report(test_id, report, directory=STEP_TIMING_DIR):
+    """
+    Description:
+        Write a test's step timings to directory/<test id>.json. The first
+        report written by a nosetests process which writes an xunit report
+        arranges for the timings to be merged into it, see
+        merge_into_xunit, when the process exits.
+    Args:
+        test_id (str): unittest id of the test
+        report (dict): as returned by StepTimer.finish
+        directory (str): directory the report is written to
+    """
+    directory = os.path.abspath(directory)
+    xunit_file = get_xunit_file()
+    with _merge_lock:
+        if xunit_file and (xunit_file, directory) not in _merges:
+            _merges.add((xunit_file, directory))
+            atexit.register(_merge_at_exit, xunit_file, directory)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(os.path.join(directory, test_id + '.json'), 'w') as out:
+        json.dump(report, out, indent=2, sort_keys=True)
+
+
+def get_properties(report):
+    """
+    Description:
+        Flatten a test's step timings into name, value pairs.
+    Args:
+        report (dict): as returned by StepTimer.finish
+    Returns:
+        list. (name, value) tuples, e.g. ("step.4. Create plan.calls", 3)
+    """
+    properties = []
+    for step in report['steps']:
+        for key in ['wall_secs', 'calls', 'chars']:
+            properties.append(('step.{0}.{1}'.format(step['name'], key),
+                               step[key]))
+    for name in sorted(report['helpers']):
+        for key in sorted(report['helpers'][name]):
+            properties.append(('helper.{0}.{1}'.format(name, key),
+                               report['helpers'][name][key]))
+    for name, category in sorted(report.get('categories', {}).items()):
+        for key in ['calls', 'total_secs', 'max_secs']:
+            properties.append(('remote.{0}.{1}'.format(name, key),
+                               category[key]))
+        for bound, count in zip(LATENCY_BUCKETS, category['histogram']):
+            properties.append(('remote.{0}.le_{1}s'.format(name, bound),
+                               count))
+    return properties
+
+
+def merge_into_xunit(xunit_file, directory=STEP_TIMING_DIR):
+    """
+    Description:
+        Add the step timings written by write_report to the matching
+        testcases of a nosetests xunit report, as properties. Properties
+        merged before are replaced, so merging again is harmless.
+    Args:
+        xunit_file (str): report to update in place
+        directory (str): directory the timings were written to
+    Returns:
+        int. Number of testcases updated.
+    """
+    reports = {}
+    if os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if filename.endswith('.json'):
+                parts = filename[:-len('.json')].split('.')
+                with open(os.path.join(directory, filename)) as report:
+                    reports[tuple(parts[-2:])] = json.load(report)
+
+    tree = ET.parse(xunit_file)
+    updated = 0
+    for case in tree.getroot().iter('testcase'):
+        key = (case.get('classname', '').split('.')[-1], case.get('name'))
+        if key not in reports:
+            continue
+        for properties in case.findall('properties'):
+            case.remove(properties)
+        properties = ET.SubElement(case, 'properties')
+        for name, value in get_properties(reports[key]):
+            ET.SubElement(properties, 'property', name=name,
+                          value=str(value))
+        updated += 1
+    tree.write(xunit_file, encoding='utf-8', xml_declaration=True)
+    return updated
+
+
+if __name__ == '__main__':
+    # perf_utils.py nosetests.xml [step timing directory]
+    print('Added step timings to {0} testcases'.format(
+        merge_into_xunit(*sys.argv[1:3])))
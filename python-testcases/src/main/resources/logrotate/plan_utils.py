@@ -0,0 +1,121 @@
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Scheduling of LITP model changes into as few plans as
+            possible.
+'''
+
+import sys
+import traceback
+
+
+class ScenarioError(AssertionError):
+    """
+    Raised when the verification of one or more coalesced scenarios
+    failed.
+    """
+
+    def __init__(self, failures):
+        """
+        Args:
+            failures (dict): scenario name to formatted traceback
+        """
+        self.failures = failures
+        msg = "{0} scenario(s) failed verification:\n{1}".format(
+            len(failures), "\n".join(
+                ["--- {0} ---\n{1}".format(name, failures[name])
+                 for name in sorted(failures)]))
+        super(ScenarioError, self).__init__(msg)
+
+
+def paths_overlap(path1, path2):
+    """
+    Description:
+        Check whether two model paths are the same item or one is an
+        ancestor of the other.
+    Args:
+        path1 (str): model path
+        path2 (str): model path
+    Returns:
+        bool. True if the paths overlap.
+    """
+    path1 = path1.rstrip('/') + '/'
+    path2 = path2.rstrip('/') + '/'
+    return path1.startswith(path2) or path2.startswith(path1)
+
+
+class PlanCoalescer(object):
+    """
+    Collects independent model changes from several scenarios, applies
+    them all and deploys them with one plan, then runs each scenario's
+    own verification.
+    """
+
+    def __init__(self, run_plan):
+        """
+        Args:
+            run_plan (callable): creates and runs a plan and returns True
+                                 if it completed successfully
+        """
+        self.run_plan = run_plan
+        self.scenarios = []
+
+    def add(self, name, items, mutate, verify):
+        """
+        Description:
+            Add a scenario to the next plan.
+        Args:
+            name (str): scenario name, used when reporting failures
+            items (list): model paths the scenario changes
+            mutate (callable): makes the scenario's model changes
+            verify (callable): checks the scenario's result once the
+                               plan has completed
+        Raises:
+            ValueError if the scenario touches items already claimed by
+            another scenario, as their changes would not be independent.
+        """
+        for other in self.scenarios:
+            for item in items:
+                for other_item in other['items']:
+                    if paths_overlap(item, other_item):
+                        raise ValueError(
+                            'Scenario "{0}" item {1} overlaps scenario '
+                            '"{2}" item {3}'.format(
+                                name, item, other['name'], other_item))
+        self.scenarios.append({'name': name, 'items': items,
+                               'mutate': mutate, 'verify': verify})
+
+    def run(self):
+        """
+        Description:
+            Apply every scenario's changes, run a single plan and verify
+            every scenario, reporting all failed verifications together.
+        Returns:
+            bool. The result of run_plan; scenarios are only verified if
+            the plan was successful.
+        Raises:
+            ScenarioError if any scenario's verification failed.
+        """
+        scenarios = self.scenarios
+        self.scenarios = []
+        for scenario in scenarios:
+            scenario['mutate']()
+        if not self.run_plan():
+            return False
+
+        failures = {}
+        for scenario in scenarios:
+            try:
+                scenario['verify']()
+            except Exception:  # pylint: disable=broad-except
+                failures[scenario['name']] = "".join(
+                    traceback.format_exception(*sys.exc_info()))
+        if failures:
+            raise ScenarioError(failures)
+        return True
@@ -0,0 +1,170 @@
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Rotation and batching helpers shared by the logrotate testsets,
+            so that the benchmark times the same code path as the suite.
+'''
+
+import os
+import logrotate_utils
+import perf_utils
+import session_utils
+import test_constants
+
+
+class RotationHelpersMixin(object):
+    """
+    Mixed in ahead of GenericTest. The test's setUp must set
+    self.rotate_files to an empty dict and its tearDown call
+    _remove_rotate_files.
+    """
+
+    def _remove_rotate_files(self):
+        """
+        Description:
+            Removes the private configuration and state files written by
+            targeted rotations on every node
+        """
+        for node, paths in self.rotate_files.items():
+            self.run_command(node, "/bin/rm -f {0}".format(" ".join(paths)),
+                             add_to_cleanup=False, su_root=True)
+        self.rotate_files = {}
+
+    @perf_utils.timed
+    def _force_rotate(self, node, rule_filename=None):
+        """
+        Description:
+            Function that forces the rotation of log files. By default
+            every rule on the node is evaluated; if a rule file is given
+            only that rule is evaluated, against a state file private to
+            the test
+        Args:
+            node (str) node on which command is to executed
+            rule_filename (str) name of the rule file in /etc/logrotate.d
+        Actions:
+            Execute the command
+        Result:
+            Successful log rotation. For a single rule, returns the parsed
+            verbose output of logrotate: the logs rotated, the logs
+            skipped with the reason and the output of the rule's scripts
+        """
+        if rule_filename is None:
+            rotatecmd = '/usr/sbin/logrotate {0}'.format(
+                        test_constants.LOGROTATE_CFG_FILE)
+            std_out, std_err, rc = self.run_command(
+                node, rotatecmd, su_root=True)
+            self.assertEquals(0, rc)
+            self.assertEquals([], std_out)
+            self.assertEquals([], std_err)
+            return None
+
+        std_out, std_err, rc = self.run_command(
+            node, self._get_targeted_rotate_cmd(node, rule_filename),
+            add_to_cleanup=False, su_root=True)
+        result = logrotate_utils.parse_rotate_output(std_out)
+        self.assertEquals(0, rc)
+        self.assertEquals([], std_err)
+        self.assertEquals([], result['errors'])
+        return result
+
+    def _get_targeted_rotate_cmd(self, node, rule_filename):
+        """
+        Description:
+            Builds the command which rotates a single rule against a
+            state file private to the test. The private files are removed
+            in tearDown
+        Args:
+            node (str) node on which command is to executed
+            rule_filename (str) name of the rule file in /etc/logrotate.d,
+                                or the absolute path of a rule file or
+                                directory of rule files elsewhere
+        Result:
+            Returns the command
+        """
+        prefix = "/tmp/{0}_{1}".format(self.id().split(".")[-1],
+                                       os.path.basename(rule_filename))
+        self.rotate_files.setdefault(node, set()).update(
+            [prefix + ".conf", prefix + ".state"])
+        return logrotate_utils.get_targeted_rotate_cmd(
+            os.path.join(test_constants.LOGROTATE_PATH, rule_filename),
+            prefix + ".conf", prefix + ".state",
+            test_constants.LOGROTATE_CFG_FILE)
+
+    @perf_utils.timed
+    def _run_rotation_workload(self, node, rule_filename, log_files, cycles,
+                               size_kb, compressibility=0.0, spacing_secs=0):
+        """
+        Description:
+            Runs a number of append and rotate cycles on a node in one
+            call: each cycle appends size_kb of data to every log file and
+            rotates the rule with _force_rotate's targeted mode
+        Args:
+            node (str) node on which the workload is run
+            rule_filename (str) name of the rule file in /etc/logrotate.d
+            log_files (list) log files, or glob patterns matching them,
+                             appended to on every cycle
+            cycles (int) number of cycles
+            size_kb (int) KB appended to each log file per cycle
+            compressibility (float) fraction of the appended data which
+                                    compresses, 0 for random data
+            spacing_secs (float) time between cycles
+        Result:
+            Returns the per cycle report, see
+            logrotate_utils.parse_workload_output
+        """
+        cmd = logrotate_utils.get_workload_cmd(
+            log_files, self._get_targeted_rotate_cmd(node, rule_filename),
+            cycles, size_kb, compressibility, spacing_secs)
+        # Typed into a root shell, a longer line would be truncated
+        self.assertTrue(len(cmd) <= session_utils.SU_ROOT_CMD_MAX_LEN,
+                        "Workload command of {0} characters is longer than "
+                        "{1}".format(len(cmd),
+                                     session_utils.SU_ROOT_CMD_MAX_LEN))
+        std_out, std_err, rc = self.run_command(node, cmd, su_root=True)
+        self.assertEquals(0, rc)
+        self.assertEquals([], std_err)
+        report = logrotate_utils.parse_workload_output(std_out)
+        self.assertEqual(list(range(1, cycles + 1)),
+                         [cycle['cycle'] for cycle in report])
+        for cycle in report:
+            self.assertEqual(0, cycle['rc'], cycle)
+            self.assertEqual([], cycle['errors'], cycle)
+        return report
+
+    @perf_utils.timed
+    def _run_cmds_batch(self, node, cmds, su_root=False):
+        """
+        Description:
+            Runs a list of commands on a node in as few remote sessions
+            as possible, one session unless the commands must be typed
+            into a root shell and do not fit on a single line
+        Args:
+            node (str): node on which the commands are executed
+            cmds (list): commands to be run, in order
+            su_root (bool): run the commands as root
+        Actions:
+            1. Run the commands as one batch script per session
+        Results:
+            Returns a list with one (stdout, stderr, rc) tuple per command
+        """
+        if su_root:
+            chunks = session_utils.split_batch(
+                cmds, session_utils.SU_ROOT_CMD_MAX_LEN)
+        else:
+            chunks = [cmds]
+
+        results = []
+        for chunk in chunks:
+            std_out, std_err, rc = self.run_command(
+                node, session_utils.get_batch_cmd(chunk), su_root=su_root)
+            self.assertEquals(0, rc)
+            self.assertEquals([], std_err)
+            results.extend(
+                session_utils.parse_batch_output(std_out, len(chunk)))
+        return results
@@ -0,0 +1,487 @@
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Helpers that reduce the number of remote round trips made by
+            the logrotate testsets.
+'''
+
+import atexit
+import base64
+import sys
+import threading
+import time
+import traceback
+import paramiko
+import perf_utils
+
+BATCH_MARKER = "@@LITP_BATCH@@"
+
+# Commands run as root are typed into a pty by the framework, so the
+# line length is bounded by the terminal's canonical input buffer.
+SU_ROOT_CMD_MAX_LEN = 4000
+
+# Other commands are passed to the remote shell as a single argument,
+# which the kernel limits to 128 KB.
+EXEC_CMD_MAX_LEN = 100000
+
+POOL_DONE_MARKER = "@@LITP_POOL_DONE@@"
+
+
+def build_batch_script(cmds):
+    """
+    Description:
+        Build a bash script which runs each command in turn and prints,
+        for every command, a marker line with its index and return code
+        followed by its stdout ("O:" prefix) and stderr ("E:" prefix).
+    Args:
+        cmds (list): commands to be run
+    Returns:
+        str. The bash script.
+    """
+    lines = ['_d=$(/bin/mktemp -d)']
+    for index, cmd in enumerate(cmds):
+        lines.append('( {0}'.format(cmd))
+        lines.append(') >"$_d/{0}.out" 2>"$_d/{0}.err"; '
+                     'echo $? >"$_d/{0}.rc"'.format(index))
+    lines.append('for _i in {0}; do'.format(
+        ' '.join([str(index) for index in range(len(cmds))])))
+    lines.append('echo "{0} $_i $(/bin/cat "$_d/$_i.rc")"'.format(
+        BATCH_MARKER))
+    lines.append('/bin/sed "s/^/O:/" "$_d/$_i.out"')
+    lines.append('/bin/sed "s/^/E:/" "$_d/$_i.err"')
+    lines.append('done')
+    lines.append('/bin/rm -rf "$_d"')
+    return '\n'.join(lines) + '\n'
+
+
+def get_batch_cmd(cmds):
+    """
+    Description:
+        Wrap the batch script for the given commands in a single shell
+        command line, base64 encoded so that the quoting of the individual
+        commands is preserved.
+    Args:
+        cmds (list): commands to be run
+    Returns:
+        str. Command line which runs the whole batch.
+    """
+    script = base64.b64encode(build_batch_script(cmds).encode('utf-8'))
+    return '/bin/echo {0} | /usr/bin/base64 -d | /bin/bash'.format(
+        script.decode('ascii'))
+
+
+def split_batch(cmds, max_len):
+    """
+    Description:
+        Split a list of commands into consecutive chunks whose batch
+        command line does not exceed max_len characters.
+    Args:
+        cmds (list): commands to be run
+        max_len (int): maximum length of a batch command line
+    Returns:
+        list. List of lists of commands.
+    """
+    chunks = []
+    chunk = []
+    for cmd in cmds:
+        if chunk and len(get_batch_cmd(chunk + [cmd])) > max_len:
+            chunks.append(chunk)
+            chunk = []
+        chunk.append(cmd)
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def parse_batch_output(stdout, count):
+    """
+    Description:
+        Parse the output of a batch script into per command results.
+    Args:
+        stdout (list): stdout lines returned by the batch command
+        count (int): number of commands in the batch
+    Returns:
+        list. One (stdout, stderr, rc) tuple per command, in order. A
+        command which produced no marker line has an rc of None.
+    """
+    results = [([], [], None) for _ in range(count)]
+    current = None
+    for line in stdout:
+        if line.startswith(BATCH_MARKER):
+            fields = line.split()
+            current = int(fields[1])
+            rcode = int(fields[2]) if len(fields) > 2 else None
+            results[current] = ([], [], rcode)
+        elif current is not None and line.startswith('O:'):
+            results[current][0].append(line[2:])
+        elif current is not None and line.startswith('E:'):
+            results[current][1].append(line[2:])
+    return results
+
+
+class RootShell(object):
+    """
+    An interactive shell on an open transport which has been switched to
+    root once and is then reused for every root command.
+    """
+
+    def __init__(self, transport, rootpw, timeout):
+        self.timeout = timeout
+        self.chan = transport.open_session()
+        self.chan.settimeout(timeout)
+        self.chan.get_pty()
+        self.chan.invoke_shell()
+        self.chan.send('/bin/su -\n')
+        self._read_until('assword:')
+        self.chan.send(rootpw + '\n')
+        self.chan.send('/bin/stty -echo; PS1=""; PS2=""\n')
+        self._sync()
+
+    def _read_until(self, text):
+        """
+        Description:
+            Read from the shell until text has been received.
+        Args:
+            text (str): text to wait for
+        Returns:
+            str. Everything received up to and including text.
+        """
+        data = ''
+        deadline = time.time() + self.timeout
+        while text not in data:
+            if time.time() > deadline:
+                raise IOError('Timed out waiting for "{0}"'.format(text))
+            data += self.chan.recv(65536).decode('utf-8', 'replace')
+        return data
+
+    def _sync(self):
+        """
+        Description:
+            Discard any pending output by waiting for a fresh marker.
+        """
+        self.chan.send('echo {0} sync\n'.format(POOL_DONE_MARKER))
+        self._read_until('{0} sync'.format(POOL_DONE_MARKER))
+
+    def run(self, cmd):
+        """
+        Description:
+            Run a command as root in this shell.
+        Args:
+            cmd (str): command to be run
+        Returns:
+            tuple. (stdout, stderr, rc) of the command.
+        """
+        script = get_batch_cmd([cmd]).split()[1]
+        self.chan.send('_s=$(/bin/mktemp)\n')
+        for start in range(0, len(script), SU_ROOT_CMD_MAX_LEN):
+            self.chan.send('/bin/echo -n {0} >>"$_s"\n'.format(
+                script[start:start + SU_ROOT_CMD_MAX_LEN]))
+        self.chan.send('/usr/bin/base64 -d "$_s" | /bin/bash; '
+                       '/bin/rm -f "$_s"; echo {0} done\n'.format(
+                           POOL_DONE_MARKER))
+        data = self._read_until('{0} done'.format(POOL_DONE_MARKER))
+        lines = [line.strip('\r') for line in data.split('\n')]
+        return parse_batch_output(lines, 1)[0]
+
+    def close(self):
+        """
+        Description:
+            Close the shell channel.
+        """
+        self.chan.close()
+
+
+class SSHConnectionPool(object):
+    """
+    Keeps one authenticated SSH transport per host open for the lifetime
+    of the pool. Plain commands are multiplexed as concurrent channels on
+    the transport, root commands reuse shells which have already switched
+    to root.
+    """
+
+    def __init__(self, connect, get_rootpw, timeout=300):
+        """
+        Args:
+            connect (callable): given a host, returns an authenticated
+                                paramiko.Transport
+            get_rootpw (callable): given a host, returns its root password
+            timeout (int): seconds to wait for a command to complete
+        """
+        self.connect = connect
+        self.get_rootpw = get_rootpw
+        self.timeout = timeout
+        self.transports = {}
+        self.root_shells = {}
+        self.hits = 0
+        self.misses = 0
+        self.latencies = {}
+        self.commands = []
+        self.lock = threading.Lock()
+
+    def _get_transport(self, host, count=True):
+        """
+        Description:
+            Returns the open transport to host, connecting if needed.
+        Args:
+            host (str): host to connect to
+            count (bool): count the lookup as a pool hit or miss
+        """
+        with self.lock:
+            transport = self.transports.get(host)
+            hit = transport is not None and transport.is_active()
+            if count:
+                if hit:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if not hit:
+                transport = self.connect(host)
+                self.transports[host] = transport
+            return transport
+
+    def _get_root_shell(self, host):
+        """
+        Description:
+            Takes an idle root shell for host out of the pool, opening a
+            new one if all of the host's shells are busy. Only the shell
+            lookup counts as a pool hit or miss.
+        """
+        transport = self._get_transport(host, count=False)
+        with self.lock:
+            idle = self.root_shells.setdefault(host, [])
+            if idle:
+                self.hits += 1
+                return idle.pop()
+            self.misses += 1
+        return RootShell(transport, self.get_rootpw(host), self.timeout)
+
+    def run(self, host, cmd, su_root=False):
+        """
+        Description:
+            Run a command on host over the pooled connection.
+        Args:
+            host (str): host on which the command is run
+            cmd (str): command to be run
+            su_root (bool): run the command as root
+        Returns:
+            tuple. (stdout, stderr, rc) of the command.
+        """
+        start = time.time()
+        result = None
+        if su_root:
+            shell = self._get_root_shell(host)
+            try:
+                result = shell.run(cmd)
+            finally:
+                # A shell left in an unknown state is not reused
+                if result is None:
+                    shell.close()
+                else:
+                    with self.lock:
+                        self.root_shells[host].append(shell)
+        else:
+            chan = self._get_transport(host).open_session()
+            try:
+                chan.settimeout(self.timeout)
+                chan.exec_command(cmd)
+                std_out = chan.makefile('rb').read().decode(
+                    'utf-8', 'replace')
+                std_err = chan.makefile_stderr('rb').read().decode(
+                    'utf-8', 'replace')
+                rcode = chan.recv_exit_status()
+            finally:
+                chan.close()
+            result = (std_out.splitlines(), std_err.splitlines(), rcode)
+        secs = time.time() - start
+        with self.lock:
+            self.latencies.setdefault(host, []).append(secs)
+            self.commands.append((host, cmd, secs))
+        return result
+
+    def report(self):
+        """
+        Description:
+            Summarise pool usage, and the latency of every command run
+            since the previous report.
+        Returns:
+            dict. Pool hits and misses, per host the number of commands
+            run and their mean and maximum latency in seconds, and under
+            commands a (host, command, seconds) tuple per command.
+        """
+        with self.lock:
+            hosts = {}
+            for host, latencies in self.latencies.items():
+                hosts[host] = {'commands': len(latencies),
+                               'mean_secs': sum(latencies) / len(latencies),
+                               'max_secs': max(latencies)}
+            commands = self.commands
+            self.commands = []
+            return {'hits': self.hits, 'misses': self.misses,
+                    'hosts': hosts, 'commands': commands}
+
+    def close(self):
+        """
+        Description:
+            Close every shell and transport held by the pool.
+        """
+        with self.lock:
+            for shells in self.root_shells.values():
+                for shell in shells:
+                    shell.close()
+            for transport in self.transports.values():
+                transport.close()
+            self.root_shells = {}
+            self.transports = {}
+
+
+class PooledCommandsMixin(object):
+    """
+    Mixed in ahead of GenericTest, runs every command other than litp
+    commands over an SSHConnectionPool shared by the tests of the class.
+    litp commands, including batches which run any, and calls which need
+    one of the framework's connection options go to
+    GenericTest.run_command, which tracks litp items for cleanup. Every
+    call is recorded by the test's step_timer, if it has one.
+    """
+
+    use_conn_pool = True
+    conn_pool = None
+
+    def open_conn_pool(self):
+        """
+        Description:
+            Create the class's connection pool on first use, to be closed
+            when the interpreter exits.
+        """
+        cls = type(self)
+        if cls.use_conn_pool and cls.conn_pool is None:
+            cls.conn_pool = SSHConnectionPool(
+                self._connect_node,
+                lambda node: self.get_node_att(node, "rootpw"))
+            atexit.register(cls.conn_pool.close)
+
+    def log_conn_pool(self):
+        """
+        Description:
+            Log the pool usage and the latency of every pooled command run
+            since the previous call.
+        """
+        if type(self).conn_pool is None:
+            return
+        report = type(self).conn_pool.report()
+        commands = report.pop('commands')
+        self.log("info", "Connection pool usage: {0}".format(report))
+        for host, cmd, secs in commands:
+            self.log("info", "Pooled command on {0} took {1:.3f}s: "
+                     "{2}".format(host, secs, cmd[:80]))
+
+    def _connect_node(self, node):
+        """
+        Description:
+            Opens an authenticated SSH transport to a node for the
+            connection pool
+        Args:
+            node (str): node to connect to
+        Returns:
+            paramiko.Transport. The connected transport.
+        """
+        transport = paramiko.Transport((self.get_node_att(node, "ipv4"), 22))
+        transport.connect(username=self.get_node_att(node, "username"),
+                          password=self.get_node_att(node, "password"))
+        return transport
+
+    def run_command(self, node, cmd, add_to_cleanup=True, su_root=False,
+                    default_asserts=False, **kwargs):
+        """
+        Description:
+            Runs a command over the pooled connection to the node, or
+            through GenericTest.run_command for litp commands and calls
+            with connection options other than logging.
+        Args:
+            node (str): node on which the command is executed
+            cmd (str): command to be run
+            add_to_cleanup (bool): passed on to GenericTest.run_command
+                                   for litp commands
+            su_root (bool): run the command as root
+            default_asserts (bool): assert rc is 0 and stderr is empty
+        Returns:
+            tuple. stdout, stderr and rc of the command.
+        """
+        start = time.time()
+        pool = type(self).conn_pool
+        if pool is None or set(kwargs) - set(['logging']) or \
+                perf_utils.categorise(cmd) == 'litp':
+            result = super(PooledCommandsMixin, self).run_command(
+                node, cmd, add_to_cleanup=add_to_cleanup, su_root=su_root,
+                default_asserts=default_asserts, **kwargs)
+        else:
+            if kwargs.get('logging', True):
+                self.log("info", "Running '{0}' on {1}".format(cmd, node))
+            result = pool.run(node, cmd, su_root)
+            if default_asserts:
+                self.assertEquals(0, result[2])
+                self.assertEquals([], result[1])
+        timer = getattr(self, 'step_timer', None)
+        if timer is not None:
+            timer.record_call(cmd, result, time.time() - start)
+        return result
+
+
+class FanOutError(AssertionError):
+    """
+    Raised when a fanned out operation failed on one or more nodes.
+    """
+
+    def __init__(self, failures):
+        """
+        Args:
+            failures (dict): node to formatted traceback of its failure
+        """
+        self.failures = failures
+        msg = "Operation failed on {0} node(s):\n{1}".format(
+            len(failures), "\n".join(
+                ["--- {0} ---\n{1}".format(node, failures[node])
+                 for node in sorted(failures)]))
+        super(FanOutError, self).__init__(msg)
+
+
+def fan_out(func, nodes):
+    """
+    Description:
+        Run func(node) concurrently, one thread per node, and wait for all
+        of them to finish.
+    Args:
+        func (callable): operation to run, called with the node
+        nodes (list): nodes on which to run the operation
+    Returns:
+        dict. node to the value returned by func for that node.
+    Raises:
+        FanOutError if func raised on any node; the error reports every
+        failed node, not just the first.
+    """
+    results = {}
+    failures = {}
+
+    def _run(node):
+        try:
+            results[node] = func(node)
+        except Exception:  # pylint: disable=broad-except
+            failures[node] = "".join(
+                traceback.format_exception(*sys.exc_info()))
+
+    threads = [threading.Thread(target=_run, args=(node,))
+               for node in nodes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if failures:
+        raise FanOutError(failures)
+    return results
@@ -0,0 +1,443 @@
+#!/usr/bin/env python
+
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Logrotate benchmarks. Not part of the "all" runs, select them
+            with the "benchmark" attribute. Results are written as JSON to
+            the file named by LOGROTATE_BENCH_REPORT, default
+            logrotate_benchmark.json.
+'''
+
+from litp_cli_utils import CLIUtils
+from litp_generic_test import GenericTest, attr
+import litp_output_utils
+import logrotate_utils
+import rotation_helpers
+import session_utils
+import base64
+import json
+import os
+import tempfile
+import time
+
+# Sweeps can be narrowed or widened without editing the testset, e.g.
+# LOGROTATE_BENCH_SIZES_KB="1 1024 8388608". Each size needs about
+# twice its space free on the node, for the log and the data appended to it
+RULE_COUNTS = [int(count) for count in os.environ.get(
+    "LOGROTATE_BENCH_RULE_COUNTS", "1 10 100 1000 5000").split()]
+LOG_SIZES_KB = [int(size) for size in os.environ.get(
+    "LOGROTATE_BENCH_SIZES_KB",
+    "1 1024 102400 1048576 4194304").split()]
+PLAN_RULE_COUNTS = [int(count) for count in os.environ.get(
+    "LOGROTATE_BENCH_PLAN_RULES", "10 100 1000 10000").split()]
+XML_RULE_COUNTS = [int(count) for count in os.environ.get(
+    "LOGROTATE_BENCH_XML_RULES", "100 1000 10000").split()]
+
+# logrotate-rule properties for each compression setting swept
+COMPRESSION_PROPS = [
+    ("none", {'compress': 'false'}),
+    ("gzip", {'compress': 'true'}),
+    ("gzip_delaycompress", {'compress': 'true', 'delaycompress': 'true'}),
+    ("gzip_fast", {'compress': 'true', 'compressoptions': '-1'}),
+    ("bzip2", {'compress': 'true', 'compresscmd': '/usr/bin/bzip2',
+               'uncompresscmd': '/usr/bin/bunzip2', 'compressext': '.bz2',
+               'compressoptions': '-9'}),
+]
+
+# Log data is half random, half repeated characters, so that compression
+# has realistic work to do
+COMPRESSIBILITY = 0.5
+
+# Size of the logs used by the compression sweep
+COMPRESSION_LOG_SIZE_KB = 102400
+
+# Runs a command on the MS and prints its return code, its duration in
+# milliseconds, the peak VmRSS of litpd sampled while it ran and the
+# VmHWM of litpd afterwards, both in KB
+LITPD_MEASURED_CMD = (
+    "_p=$(/usr/bin/systemctl show -p MainPID litpd | /usr/bin/cut -d= -f2); "
+    "_m=$(/bin/mktemp); "
+    "( while :; do /bin/grep VmRSS /proc/$_p/status; /bin/sleep 0.2; "
+    "done ) >\"$_m\" 2>/dev/null & _w=$!; "
+    "_s=$(/bin/date +%s%N); {0} >/dev/null; _rc=$?; "
+    "_e=$(/bin/date +%s%N); kill $_w; "
+    "echo \"$_rc $(((_e - _s) / 1000000)) "
+    "$(/usr/bin/awk '{{if ($2 > m) m = $2}} END {{print m + 0}}' \"$_m\") "
+    "$(/usr/bin/awk '/VmHWM/ {{print $2}}' /proc/$_p/status)\"; "
+    "/bin/rm -f \"$_m\"")
+
+
+class LogrotateBenchmark(rotation_helpers.RotationHelpersMixin,
+                         session_utils.PooledCommandsMixin, GenericTest):
+
+    '''
+    Measures the wall time of logrotate passes on a node as the number of
+    rules, the size of the logs and the compression settings vary. Passes
+    are run by the append and rotate workload of the Story664 suite
+    '''
+
+    report = []
+
+    def setUp(self):
+        """
+        Description:
+            Runs before every single test
+        Actions:
+            1. Call the super class setup method
+            2. Set up variables used in the tests
+        Results:
+            The super class prints out diagnostics and variables
+            common to all tests are available.
+        """
+        super(LogrotateBenchmark, self).setUp()
+        self.test_ms = self.get_management_node_filename()
+        self.test_node1 = self.get_managed_node_filenames()[0]
+        self.bench_dir = "/tmp/logrotate_bench"
+        self.cli = CLIUtils()
+        self.rotate_files = {}
+        self.open_conn_pool()
+        self.report_file = os.environ.get(
+            "LOGROTATE_BENCH_REPORT", "logrotate_benchmark.json")
+
+    def tearDown(self):
+        """
+        Description:
+            Runs after every single test
+        Actions:
+            1. Remove the benchmark directory and the rotation state
+            2. Write the results gathered so far to the report
+        Results:
+            Items used in the test are cleaned up and the
+            super class prints out end test diagnostics
+        """
+        self.run_command(self.test_node1,
+                         "/bin/rm -rf {0}".format(self.bench_dir),
+                         su_root=True)
+        self._remove_rotate_files()
+        self.log_conn_pool()
+        with open(self.report_file, "w") as report:
+            json.dump(LogrotateBenchmark.report, report, indent=2,
+                      sort_keys=True)
+        super(LogrotateBenchmark, self).tearDown()
+
+    def _get_setup_cmds(self, rules, props):
+        """
+        Description:
+            Builds the commands which create a benchmark directory on the
+            node with a directory of the given number of rule files, as
+            Puppet would render them, each rotating its own empty log
+            file whenever it is not empty
+        Args:
+            rules (int) number of rules
+            props (dict) logrotate-rule properties common to all rules
+        Result:
+            Returns the commands, in order
+        """
+        # dateext would stop a log being rotated twice in the same day
+        rule_props = {'name': 'bench', 'rotate': '2', 'size': '1',
+                      'dateext': 'false',
+                      'path': '{0}/logs/log@@N@@.log'.format(self.bench_dir)}
+        rule_props.update(props)
+        template = logrotate_utils.render_rule_file(rule_props)
+        return [
+            "/bin/rm -rf {0}".format(self.bench_dir),
+            "/bin/mkdir -p {0}/rules {0}/logs".format(self.bench_dir),
+            "echo '{1}' | /usr/bin/base64 -d > {0}/rule.tmpl".format(
+                self.bench_dir,
+                base64.b64encode(template.encode('utf-8')).decode('ascii')),
+            "for _i in $(/usr/bin/seq 1 {1}); do "
+            "/bin/sed \"s/@@N@@/$_i/g\" {0}/rule.tmpl > {0}/rules/rule$_i "
+            "&& : > {0}/logs/log$_i.log || exit 1; done".format(
+                self.bench_dir, rules)]
+
+    def _run_logrotate_passes(self, sweep, rules, size_kb, compression,
+                              props, passes=1):
+        """
+        Description:
+            Sets up a benchmark directory and runs the rotation workload
+            over it, adding a result per pass to the report. Each pass
+            appends size_kb to every log and rotates the rules directory
+            as a targeted rotation, so later passes also measure the work
+            deferred by settings such as delaycompress
+        Args:
+            sweep (str) name of the sweep
+            rules (int) number of rules
+            size_kb (int) size appended to each log file per pass
+            compression (str) name of the compression setting
+            props (dict) logrotate-rule properties common to all rules
+            passes (int) number of passes
+        Result:
+            Returns the results added to the report
+        """
+        self._run_cmds_batch(
+            self.test_node1, self._get_setup_cmds(rules, props),
+            su_root=True)
+        workload = self._run_rotation_workload(
+            self.test_node1, "{0}/rules".format(self.bench_dir),
+            ["{0}/logs/*.log".format(self.bench_dir)], passes, size_kb,
+            COMPRESSIBILITY)
+
+        results = []
+        for cycle in workload:
+            self.assertEqual(rules, len(cycle['rotated']), cycle)
+            result = {'sweep': sweep, 'node': self.test_node1,
+                      'rules': rules, 'log_size_kb': size_kb,
+                      'compression': compression, 'pass': cycle['cycle'],
+                      'wall_secs': cycle['millis'] / 1000.0,
+                      'log_bytes': cycle['log_bytes'],
+                      'timestamp': int(time.time())}
+            self.log("info", "Logrotate pass: {0}".format(result))
+            LogrotateBenchmark.report.append(result)
+            results.append(result)
+        return results
+
+    def _run_cli_batch(self, cmds, check=True):
+        """
+        Description:
+            Runs litp commands on the MS in as few sessions as the
+            command line length allows and asserts they all succeeded
+        Args:
+            cmds (list) commands to be run, in order
+            check (bool) assert that every command succeeded
+        """
+        for chunk in session_utils.split_batch(
+                cmds, session_utils.EXEC_CMD_MAX_LEN):
+            std_out, std_err, rc = self.run_command(
+                self.test_ms, session_utils.get_batch_cmd(chunk))
+            self.assertEqual(0, rc)
+            self.assertEqual([], std_err)
+            if not check:
+                continue
+            for cmd, (_, cmd_err, cmd_rc) in zip(
+                    chunk, session_utils.parse_batch_output(
+                        std_out, len(chunk))):
+                self.assertEqual(0, cmd_rc, "{0}: {1}".format(cmd, cmd_err))
+
+    def _time_create_plan(self, rules, configs):
+        """
+        Description:
+            Creates logrotate-rule items spread over the given
+            logrotate-rule-configs, times create_plan on the MS and
+            counts the tasks generated, then removes the plan and the
+            items again
+        Args:
+            rules (int) number of logrotate-rule items to create
+            configs (list) logrotate-rule-config paths
+        Result:
+            Returns the result added to the report
+        """
+        urls = ["{0}/rules/bench_rule_{1}".format(
+                    configs[index % len(configs)], index)
+                for index in range(rules)]
+        try:
+            self._run_cli_batch([
+                self.cli.get_create_cmd(
+                    url, "logrotate-rule",
+                    "name='bench_rule_{0}' path='/var/log/bench_{0}.log' "
+                    "rotate=2 size=10k".format(index))
+                for index, url in enumerate(urls)])
+
+            timecmd = (
+                "_s=$(/bin/date +%s%N); /usr/bin/litp create_plan; "
+                "_rc=$?; _e=$(/bin/date +%s%N); "
+                "echo \"$_rc $(((_e - _s) / 1000000))\"")
+            start = time.time()
+            std_out, _, _ = self.run_command(self.test_ms, timecmd)
+            client_secs = time.time() - start
+            plan_rc, server_millis = std_out[-1].split()
+            self.assertEqual("0", plan_rc, std_out)
+
+            std_out, _, _ = self.run_command(
+                self.test_ms, self.cli.get_show_plan_cmd(),
+                default_asserts=True)
+            _, tasks = litp_output_utils.parse_plan_output(std_out)
+            rule_tasks = [task for task in tasks
+                          if task['desc'].startswith('Create logrotate rule')]
+        finally:
+            # Items whose create failed are not there to be removed
+            self.run_command(self.test_ms, "/usr/bin/litp remove_plan")
+            self._run_cli_batch(
+                [self.cli.get_remove_cmd(url) for url in urls], check=False)
+
+        result = {'sweep': 'create_plan', 'node': self.test_ms,
+                  'rules': rules, 'configs': len(configs),
+                  'create_plan_secs': int(server_millis) / 1000.0,
+                  'client_secs': client_secs,
+                  'millis_per_rule': float(server_millis) / rules,
+                  'tasks': len(tasks), 'rule_tasks': len(rule_tasks),
+                  'timestamp': int(time.time())}
+        self.log("info", "create_plan: {0}".format(result))
+        LogrotateBenchmark.report.append(result)
+        return result
+
+    def _time_litpd_cmd(self, operation, rules, cmd):
+        """
+        Description:
+            Times a litp command on the MS while sampling the memory use
+            of litpd, adding the result to the report
+        Args:
+            operation (str) name of the operation
+            rules (int) number of logrotate-rules in the document
+            cmd (str) litp command
+        Result:
+            Returns the result added to the report
+        """
+        std_out, _, _ = self.run_command(
+            self.test_ms, LITPD_MEASURED_CMD.format(cmd))
+        rcode, millis, peak_rss, hwm = std_out[-1].split()
+        self.assertEqual("0", rcode, "{0} failed".format(cmd))
+        result = {'sweep': 'xml', 'node': self.test_ms,
+                  'operation': operation, 'rules': rules,
+                  'secs': int(millis) / 1000.0,
+                  'litpd_peak_rss_kb': int(peak_rss),
+                  'litpd_vmhwm_kb': int(hwm or 0),
+                  'timestamp': int(time.time())}
+        self.log("info", "{0}: {1}".format(operation, result))
+        LogrotateBenchmark.report.append(result)
+        return result
+
+    @attr('benchmark', 'logrotate_benchmark', 'logrotate_benchmark_tc01')
+    def test_01_rule_count_sweep(self):
+        """
+        @tms_id: logrotate_benchmark_tc01
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Logrotate pass time by number of rules
+        @tms_description: Time a targeted logrotate pass over 1 to 5000
+            rule files, each rotating a small log
+        @tms_test_steps:
+            @step: Create the rule files and logs, fill the logs and run a
+            timed logrotate pass, for each rule count
+            @result: Wall time and log size are added to the report
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        for rules in RULE_COUNTS:
+            self._run_logrotate_passes(
+                "rule_count", rules, 1, "gzip", {'compress': 'true'})
+
+    @attr('benchmark', 'logrotate_benchmark', 'logrotate_benchmark_tc02')
+    def test_02_log_size_sweep(self):
+        """
+        @tms_id: logrotate_benchmark_tc02
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Logrotate pass time by log size
+        @tms_description: Time a targeted logrotate pass of one rule whose
+            log ranges from 1 KB to 4 GB in size
+        @tms_test_steps:
+            @step: Create the rule file and log, fill the log and run a
+            timed logrotate pass, for each log size
+            @result: Wall time and log size are added to the report
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        for size_kb in LOG_SIZES_KB:
+            self._run_logrotate_passes(
+                "log_size", 1, size_kb, "gzip", {'compress': 'true'})
+
+    @attr('benchmark', 'logrotate_benchmark', 'logrotate_benchmark_tc03')
+    def test_03_compression_sweep(self):
+        """
+        @tms_id: logrotate_benchmark_tc03
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Logrotate pass time by compression setting
+        @tms_description: Time two targeted logrotate passes of one rule
+            with each of the compression settings of the logrotate-rule
+            item, so that delayed compression is measured too
+        @tms_test_steps:
+            @step: Create the rule file and log and run two timed logrotate
+            passes, filling the log before each, for each compression
+            setting
+            @result: Wall time and log size are added to the report
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        for compression, props in COMPRESSION_PROPS:
+            self._run_logrotate_passes(
+                "compression", 1, COMPRESSION_LOG_SIZE_KB, compression,
+                props, passes=2)
+
+    @attr('benchmark', 'logrotate_benchmark', 'logrotate_benchmark_tc04')
+    def test_04_create_plan_scaling(self):
+        """
+        @tms_id: logrotate_benchmark_tc04
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: create_plan latency by number of logrotate-rules
+        @tms_description: Time create_plan with 10 to 10000 logrotate-rule
+            items spread over the logrotate-rule-configs of the nodes,
+            and count the tasks generated
+        @tms_test_steps:
+            @step: Create the logrotate-rule items, for each rule count
+            @result: Items are created
+            @step: Time create_plan and count the tasks in the plan
+            @result: Time, tasks and time per rule are added to the report
+            @step: Remove the plan and the items
+            @result: Model is as it was before the test
+        @tms_test_precondition: A logrotate-rule-config on each node
+        @tms_execution_type: Automated
+        """
+        configs = self.find(
+            self.test_ms, "/deployments", "logrotate-rule-config", True)
+        for rules in PLAN_RULE_COUNTS:
+            result = self._time_create_plan(rules, configs)
+            self.assertEqual(rules, result['rule_tasks'])
+
+    @attr('benchmark', 'logrotate_benchmark', 'logrotate_benchmark_tc05')
+    def test_05_xml_load_export_scaling(self):
+        """
+        @tms_id: logrotate_benchmark_tc05
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: litp load and export time by number of logrotate-rules
+        @tms_description: Generate logrotate-rule-config documents with
+            100 to 10000 logrotate-rules and time loading them with
+            --merge and --replace and exporting them again, recording the
+            peak memory use of litpd
+        @tms_test_steps:
+            @step: Generate the document and copy it to the MS, for each
+            rule count
+            @result: Document is on the MS
+            @step: Load the document with --merge, then with --replace
+            @result: Time and litpd memory use are added to the report
+            @step: Export the logrotate-rule-config
+            @result: Time and litpd memory use are added to the report
+            @step: Remove the logrotate-rule-config
+            @result: Model is as it was before the test
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        node_configs = self.find(
+            self.test_ms, "/deployments", "node-config", False)[0]
+        config_url = node_configs + "/bench_config"
+        xml_file = "/tmp/bench_config.xml"
+
+        for rules in XML_RULE_COUNTS:
+            local_file = tempfile.NamedTemporaryFile(suffix=".xml")
+            try:
+                logrotate_utils.write_rule_config_xml(
+                    local_file, "bench_config", rules)
+                local_file.flush()
+                self.assertTrue(self.copy_file_to(
+                    self.test_ms, local_file.name, xml_file))
+            finally:
+                local_file.close()
+
+            try:
+                self._time_litpd_cmd(
+                    "load_merge", rules, "/usr/bin/litp load -p {0} -f {1} "
+                    "--merge".format(node_configs, xml_file))
+                self._time_litpd_cmd(
+                    "load_replace", rules, "/usr/bin/litp load -p {0} -f {1} "
+                    "--replace".format(node_configs, xml_file))
+                self._time_litpd_cmd(
+                    "export", rules, "/usr/bin/litp export -p {0} -f "
+                    "/tmp/bench_export.xml".format(config_url))
+            finally:
+                self.run_command(
+                    self.test_ms, "/usr/bin/litp remove -p {0}; /bin/rm -f "
+                    "{1} /tmp/bench_export.xml".format(config_url, xml_file))
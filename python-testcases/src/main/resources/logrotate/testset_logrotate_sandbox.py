@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   The rotation expectations of Story664 tests 03 and 04, run by
+            the local /usr/sbin/logrotate in LogrotateSandbox rather than
+            on the nodes, so that they can be checked against the
+            logrotate shipped with the nodes' OS in seconds. The tests
+            are skipped where logrotate is not installed; dateext cases
+            are skipped without faketime.
+'''
+
+from litp_generic_test import GenericTest, attr
+import logrotate_sandbox
+import gzip
+import itertools
+
+
+class LogrotateSandboxRotation(GenericTest):
+
+    '''
+    Rotation behaviour of logrotate-rule configurations, checked in local
+    logrotate sandboxes
+    '''
+
+    def setUp(self):
+        """
+        Description:
+            Runs before every single test
+        Actions:
+            1. Skip the test if logrotate is not installed
+            2. Call the super class setup method
+        Results:
+            The super class prints out diagnostics
+        """
+        if not logrotate_sandbox.is_available():
+            self.skipTest("{0} is not installed".format(
+                logrotate_sandbox.LOGROTATE))
+        super(LogrotateSandboxRotation, self).setUp()
+
+    def tearDown(self):
+        """
+        Description:
+            Runs after every single test
+        Actions:
+            1. Perform Test Cleanup
+        Results:
+            The super class prints out end test diagnostics
+        """
+        super(LogrotateSandboxRotation, self).tearDown()
+
+    def _rotate(self, sandbox, paths, cycles, size_kb, **delta):
+        """
+        Description:
+            Runs a number of append and rotate cycles in a sandbox, as
+            _run_rotation_workload does on a node
+        Args:
+            sandbox (LogrotateSandbox): sandbox of the rule
+            paths (list): log files appended to on every cycle
+            cycles (int): number of cycles
+            size_kb (int): KB appended to each log file per cycle
+            delta: time the sandbox's clock is advanced by before each
+                   rotation, as datetime.timedelta arguments
+        Actions:
+            1. Append to the logs, advance the clock and rotate, for each
+               cycle
+        Results:
+            Returns the result of every rotation, the test is skipped if
+            the rule needs faketime and it is not installed
+        """
+        results = []
+        for _ in range(cycles):
+            for path in paths:
+                sandbox.write_log(path, size_kb)
+            if delta:
+                sandbox.advance(**delta)
+            try:
+                result = sandbox.rotate()
+            except logrotate_sandbox.FaketimeRequiredError as err:
+                self.skipTest(str(err))
+            self.assertEqual(0, result['rc'], result)
+            self.assertEqual([], result['errors'])
+            results.append(result)
+        return results
+
+    @attr('all', 'sandbox', 'logrotate_sandbox', 'logrotate_sandbox_tc01')
+    def test_01_p_rotate_by_size_copytruncate(self):
+        """
+        @tms_id: logrotate_sandbox_tc01
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Rotation by size with copytruncate, as in
+            story664 test_03
+        @tms_description: A rule rotating by size keeps the number of
+            copies given by rotate, before and after rotate is updated
+        @tms_test_steps:
+            @step: Append the rule's size to the log and rotate, rotate
+            times
+            @result: The log is rotated every time and rotate copies are
+            kept beside the log
+            @step: Increase rotate and repeat one more time than rotate
+            @result: The log is rotated every time and the new number of
+            copies is kept
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        log = "/var/log/logrotatetest.log"
+        props = {'name': 'rule1', 'path': log, 'rotate': '3',
+                 'size': '3k', 'copytruncate': 'true', 'compress': 'false',
+                 'delaycompress': 'false'}
+        with logrotate_sandbox.LogrotateSandbox(props) as sandbox:
+            for result in self._rotate(sandbox, [log], 3, 3):
+                self.assertEqual([log], result['rotated'])
+            self.assertEqual(4, len(sandbox.files(log + "*")))
+
+            props['rotate'] = '4'
+            sandbox.configure(props)
+            for result in self._rotate(sandbox, [log], 5, 3):
+                self.assertEqual([log], result['rotated'])
+            self.assertEqual(5, len(sandbox.files(log + "*")))
+
+    @attr('all', 'sandbox', 'logrotate_sandbox', 'logrotate_sandbox_tc02')
+    def test_02_p_rotate_by_size_compress(self):
+        """
+        @tms_id: logrotate_sandbox_tc02
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Rotation by size with compress, as in story664 test_04
+            on the MS
+        @tms_description: A rule rotating by size with compress keeps
+            rotate gzip copies holding the data appended before each
+            rotation
+        @tms_test_steps:
+            @step: Append 10 KB to the log and rotate, rotate times
+            @result: The log is rotated every time and log1.log.[1-6].gz
+            exist
+            @step: Uncompress the most recent copy
+            @result: It holds the 10 KB appended before the last rotation
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        log = "/var/log/log1.log"
+        props = {'name': 'compress_rule1', 'path': log, 'rotate': '6',
+                 'size': '10k', 'copytruncate': 'true', 'compress': 'true'}
+        with logrotate_sandbox.LogrotateSandbox(props) as sandbox:
+            for result in self._rotate(sandbox, [log], 6, 10):
+                self.assertEqual([log], result['rotated'])
+            self.assertEqual(6, len(sandbox.files(log + ".[1-6].gz")))
+
+            copy = gzip.open(sandbox.path(log + ".1.gz"))
+            try:
+                self.assertEqual(10 * 1024, len(copy.read()))
+            finally:
+                copy.close()
+
+    @attr('all', 'sandbox', 'logrotate_sandbox', 'logrotate_sandbox_tc03')
+    def test_03_p_rotate_every_week_overrides_size(self):
+        """
+        @tms_id: logrotate_sandbox_tc03
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Rotation every week despite size, as in story664
+            test_04 on nodeX
+        @tms_description: A rule with rotate_every week and a size is not
+            rotated within the week once the size is met, and its
+            postrotate script is not run
+        @tms_test_steps:
+            @step: Append 10 KB to both logs and rotate a second later,
+            four times
+            @result: Nothing is rotated and no script output is seen
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        logs = ["/tmp/log_test04/log1.log", "/tmp/log_test04/log2.log"]
+        props = {'name': 'time_rule1', 'path': ','.join(logs),
+                 'size': '8k', 'dateext': 'true',
+                 'dateformat': '-%Y%m%d-%s', 'compress': 'true',
+                 'delaycompress': 'true', 'rotate_every': 'week',
+                 'create': 'false', 'sharedscripts': 'true', 'rotate': '4',
+                 'postrotate': '/sbin/service rsyslog restart || true'}
+        with logrotate_sandbox.LogrotateSandbox(props) as sandbox:
+            for result in self._rotate(sandbox, logs, 4, 10, seconds=1):
+                self.assertEqual([], result['rotated'])
+                self.assertEqual([], result['output'])
+            self.assertEqual(1, len(sandbox.files(logs[0] + "*")))
+
+    @attr('all', 'sandbox', 'logrotate_sandbox', 'logrotate_sandbox_tc04')
+    def test_04_p_rotate_globbing_dateext_postrotate(self):
+        """
+        @tms_id: logrotate_sandbox_tc04
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Rotation of globbed paths with dateext, as in story664
+            test_04 on nodeY
+        @tms_description: A rule whose path includes a glob rotates every
+            matching log with a dated name, runs its shared postrotate
+            script and keeps rotate copies of each log
+        @tms_test_steps:
+            @step: Append 10 KB to both logs and rotate a second later,
+            four times
+            @result: log1.log is rotated and the postrotate script is run
+            every time
+            @step: List the dated copies of both logs
+            @result: rotate copies of each log are kept
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        logs = ["/var/logs_test04/log1.log",
+                "/var/logs_test04/logs_t04/log2.log"]
+        props = {'name': 'jboss',
+                 'path': '/var/logs_test04/log1.log,'
+                         '/var/logs_test04/*/*.log',
+                 'size': '4k', 'dateext': 'true',
+                 'dateformat': '-%Y%m%d-%s', 'rotate': '4',
+                 'compress': 'true', 'copytruncate': 'true',
+                 'delaycompress': 'true', 'create': 'false',
+                 'sharedscripts': 'true',
+                 'postrotate': '/sbin/service rsyslog restart || true'}
+        with logrotate_sandbox.LogrotateSandbox(props) as sandbox:
+            for result in self._rotate(sandbox, logs, 4, 10, seconds=1):
+                self.assertTrue(logs[0] in result['rotated'], result)
+                self.assertNotEqual([], result['output'])
+            self.assertEqual(
+                4, len(sandbox.files("/var/logs_test04/log1.log-2*")))
+            self.assertEqual(4, len(sandbox.files(
+                "/var/logs_test04/logs_t04/log2.log-2*")))
+
+    @attr('all', 'sandbox', 'logrotate_sandbox', 'logrotate_sandbox_tc05')
+    def test_05_p_maxage_removes_old_copies(self):
+        """
+        @tms_id: logrotate_sandbox_tc05
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Removal of old copies by maxage
+        @tms_description: A daily rule with maxage removes the copies
+            older than maxage days even though rotate allows more
+        @tms_test_steps:
+            @step: Append to the log and rotate
+            @result: The log is not rotated, only added to the state file
+            @step: Append to the log and rotate a day later, five times
+            @result: The log is rotated every time and only the copies
+            of the last two days are kept
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        log = "/var/log/maxage.log"
+        props = {'name': 'maxage_rule', 'path': log, 'rotate': '10',
+                 'rotate_every': 'day', 'maxage': '2',
+                 'compress': 'false'}
+        with logrotate_sandbox.LogrotateSandbox(props) as sandbox:
+            for result in self._rotate(sandbox, [log], 1, 1):
+                self.assertEqual([], result['rotated'])
+            for result in self._rotate(sandbox, [log], 5, 1, days=1):
+                self.assertEqual([log], result['rotated'])
+            copies = sandbox.files(log + ".*")
+            self.assertTrue(log + ".1" in copies, copies)
+            self.assertTrue(len(copies) <= 2, copies)
+
+    @attr('all', 'sandbox', 'logrotate_sandbox', 'logrotate_sandbox_tc06')
+    def test_06_p_rotate_count_matrix(self):
+        """
+        @tms_id: logrotate_sandbox_tc06
+        @tms_requirements_id: LITPCDS-664
+        @tms_title: Number and names of the copies kept, by rotate,
+            compress and copytruncate
+        @tms_description: For every combination, in parallel sandboxes,
+            a rule rotated two more times than rotate keeps rotate
+            copies, compressed only if compress is set
+        @tms_test_steps:
+            @step: Rotate each rule two more times than rotate
+            @result: Each rule keeps rotate copies with the expected
+            extension
+        @tms_test_precondition: NA
+        @tms_execution_type: Automated
+        """
+        log = "/var/log/matrix.log"
+
+        def _run_case(case):
+            rotate, compress, copytruncate = case
+            props = {'name': 'matrix', 'path': log, 'rotate': str(rotate),
+                     'size': '1k', 'compress': compress,
+                     'copytruncate': copytruncate}
+            with logrotate_sandbox.LogrotateSandbox(props) as sandbox:
+                for _ in range(rotate + 2):
+                    sandbox.write_log(log, 1)
+                    sandbox.rotate()
+                expected = [
+                    "{0}.{1}{2}".format(
+                        log, index, ".gz" if compress == 'true' else "")
+                    for index in range(1, rotate + 1)]
+                return expected, sorted(sandbox.files(log + ".*"))
+
+        cases = list(itertools.product(
+            range(1, 6), ['true', 'false'], ['true', 'false']))
+        results = logrotate_sandbox.map_sandboxes(_run_case, cases)
+        mismatches = [(case, kept) for case, (expected, kept)
+                      in zip(cases, results) if sorted(expected) != kept]
+        self.assertEqual([], mismatches)
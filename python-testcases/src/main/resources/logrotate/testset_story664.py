@@ -16,13 +16,21 @@ program(s) have been supplied.
 '''
 
 from redhat_cmd_utils import RHCmdUtils
+from litp_cli_utils import CLIUtils
 from litp_generic_test import GenericTest, attr
+import litp_output_utils
+import logrotate_utils
+import perf_utils
+import plan_utils
+import rotation_helpers
+import session_utils
 import test_constants
 import os
-import time
 
 
-class Story664(GenericTest):
+class Story664(perf_utils.StepTimingMixin,
+               rotation_helpers.RotationHelpersMixin,
+               session_utils.PooledCommandsMixin, GenericTest):
 
     '''
     As a LITP user I want the Logrotate Plug-in to be migrated from LITP 1.x
@@ -48,6 +56,10 @@ class Story664(GenericTest):
         self.test_node2 = test_nodes[1]
         self.ranfile_path = "/tmp/rantest1_file.txt"
         self.redhatutils = RHCmdUtils()
+        self.cli = CLIUtils()
+        self.rotate_files = {}
+        self.open_conn_pool()
+        self.start_timing()
 
     def tearDown(self):
         """
@@ -59,8 +71,13 @@ class Story664(GenericTest):
             Items used in the test are cleaned up and the
             super class prints out end test diagnostics
         """
+        self.step_timer.start_step('tearDown')
+        self._remove_rotate_files()
+        self.log_conn_pool()
+        self.finish_timing()
         super(Story664, self).tearDown()
 
+    @perf_utils.timed
     def _create_logrotate_config(self, config_path, log_config_name):
         """
         Description:
@@ -79,6 +96,7 @@ class Story664(GenericTest):
             self.test_ms, logrotate_url, "logrotate-rule-config")
         return logrotate_url
 
+    @perf_utils.timed
     def _create_logrotate_rule(self, rule_path, rule_name, props):
         """
         Description:
@@ -100,6 +118,7 @@ class Story664(GenericTest):
             self.test_ms, log_rule_path, "logrotate-rule", props)
         return log_rule_path
 
+    @perf_utils.timed
     def _update_logrotate_rule_props(self, rule_path, props):
         """
         Description:
@@ -115,6 +134,7 @@ class Story664(GenericTest):
         self.execute_cli_update_cmd(
             self.test_ms, rule_path, props)
 
+    @perf_utils.timed
     def _remove_logrotate_rule(self, rule_path):
         """
         Description:
@@ -129,6 +149,7 @@ class Story664(GenericTest):
         self.execute_cli_remove_cmd(
             self.test_ms, rule_path)
 
+    @perf_utils.timed
     def _remove_logrotate_config(self, config_path):
         """
         Description:
@@ -143,25 +164,7 @@ class Story664(GenericTest):
         self.execute_cli_remove_cmd(
             self.test_ms, config_path)
 
-    def _force_rotate(self, node):
-        """
-        Description:
-            Function that forces the rotation of log files
-        Args:
-            node (str) node on which command is to executed
-        Actions:
-            Execute the command
-        Result:
-            Successful log rotation
-        """
-        rotatecmd = '/usr/sbin/logrotate {0}'.format(
-                    test_constants.LOGROTATE_CFG_FILE)
-        std_out, std_err, rc = self.run_command(
-            node, rotatecmd, su_root=True)
-        self.assertEquals(0, rc)
-        self.assertEquals([], std_out)
-        self.assertEquals([], std_err)
-
+    @perf_utils.timed
     def _check_file_contents(self, node, filename, explength):
         """
         Description:
@@ -184,6 +187,67 @@ class Story664(GenericTest):
         self.assertEqual(len(lfile), explength)
         return lfile
 
+    @perf_utils.timed
+    def _check_rendered_file(self, node, filename, props):
+        """
+        Description:
+            Function that checks the configuration file created in
+            /etc/logrotate.d matches the file rendered locally from the
+            logrotate-rule properties
+        Args:
+            node (str) node on which command is to executed
+            filename (str) name of the file created
+            props (dict) properties of the logrotate-rule
+        Actions:
+            Compare the whole configuration file with the expected one
+        Result:
+            return contents of file as a list
+        """
+        expected = logrotate_utils.render_rule_lines(props)
+        lfile = self._check_file_contents(node, filename, len(expected))
+        self.assertEqual(expected, lfile)
+        return lfile
+
+    @perf_utils.timed
+    def _snapshot_logrotated(self, node):
+        """
+        Description:
+            Function that fetches every file in /etc/logrotate.d on a node
+            in a single remote call
+        Args:
+            node (str) node on which command is executed
+        Actions:
+            Stream the directory as one archive and index it locally
+        Result:
+            return logrotate_utils.DirSnapshot of the directory
+        """
+        std_out, _, _ = self.run_command(
+            node, logrotate_utils.get_snapshot_cmd(
+                test_constants.LOGROTATE_PATH),
+            add_to_cleanup=False, su_root=True, default_asserts=True)
+        return logrotate_utils.DirSnapshot(std_out)
+
+    def _check_snapshot_file(self, snapshot, filename, props):
+        """
+        Description:
+            Function that checks a snapshot of /etc/logrotate.d holds
+            exactly one configuration file for the rule and that it
+            matches the file rendered from the logrotate-rule properties
+        Args:
+            snapshot (DirSnapshot) snapshot of /etc/logrotate.d
+            filename (str) name of the file created
+            props (dict) properties of the logrotate-rule
+        Actions:
+            Compare the whole configuration file with the expected one
+        Result:
+            return contents of file as a list
+        """
+        self.assertEqual([filename], snapshot.matching(filename))
+        lfile = snapshot.lines(filename)
+        self.assertEqual(logrotate_utils.render_rule_lines(props), lfile)
+        return lfile
+
+    @perf_utils.timed
     def _remove_created_logfiles(self, node, logfilepath):
         """
         Description:
@@ -204,6 +268,7 @@ class Story664(GenericTest):
         self.assertEquals([], std_out)
         self.assertEquals([], std_err)
 
+    @perf_utils.timed
     def _create_logrotate_rule_props_list(self, url, log_rule_name, props):
         """
         Description:
@@ -221,6 +286,136 @@ class Story664(GenericTest):
             self.test_ms, log_rule, "logrotate-rule", props)
         return log_rule
 
+    @perf_utils.timed
+    def _watch_plan(self, expected, task_desc=None, timeout_mins=60):
+        """
+        Description:
+            Follows the plan on the MS with adaptive polling until it
+            reaches a terminal state, or until the task described by
+            task_desc reaches the expected state. A plan that ends in any
+            other terminal state fails fast instead of waiting for the
+            timeout
+        Args:
+            expected (str): expected plan status, e.g. "Successful", or
+                            the expected task state if task_desc is given
+            task_desc (str): description of the task to wait for
+            timeout_mins (int): longest time to wait
+        Actions:
+            1. Poll show_plan, recording task state transitions
+        Results:
+            Returns True if the expected state was reached
+        """
+        def _show_plan():
+            std_out, _, _ = self.run_command(
+                self.test_ms, self.cli.get_show_plan_cmd())
+            return std_out
+
+        watcher = litp_output_utils.PlanWatcher(_show_plan)
+        if task_desc is None:
+            status, _ = watcher.wait(timeout_mins * 60)
+            reached = status == expected
+        else:
+            status, reached = watcher.wait(
+                timeout_mins * 60, task_desc, expected)
+        self.log("info", "Plan transitions:\n{0}".format(
+            watcher.format_transitions()))
+        if not reached:
+            self.log("error", "Plan status is {0}, expected {1}".format(
+                status, expected))
+        return reached
+
+    @perf_utils.timed
+    def _run_plan(self):
+        """
+        Description:
+            Creates and runs a plan and waits for it to finish
+        Actions:
+            1. Create plan
+            2. Run plan
+            3. Wait for the plan to finish
+        Results:
+            Returns True if the plan completed successfully
+        """
+        self.execute_cli_createplan_cmd(self.test_ms)
+        self.execute_cli_runplan_cmd(self.test_ms)
+        return self._watch_plan("Successful")
+
+    @perf_utils.timed
+    def _snapshot_logrotate_config(self, config_url, node, xml_filename):
+        """
+        Description:
+            Captures the state of a logrotate-rule-config, as model XML,
+            together with the contents of /etc/logrotate.d on its node
+        Args:
+            config_url (str): path of the logrotate-rule-config
+            node (str): node the logrotate-rule-config applies to
+            xml_filename (str): file on the MS the config is exported to
+        Actions:
+            1. Export the logrotate-rule-config
+            2. Snapshot /etc/logrotate.d on the node
+        Results:
+            Returns the snapshot, to be passed to
+            _restore_logrotate_config
+        """
+        self.execute_cli_export_cmd(self.test_ms, config_url, xml_filename)
+        model_xml, _, _ = self.run_command(
+            self.test_ms, "/bin/cat {0}".format(xml_filename),
+            add_to_cleanup=False, default_asserts=True)
+        files = self._snapshot_logrotated(node)
+        return {'url': config_url,
+                'parent': config_url.rsplit("/", 1)[0],
+                'node': node,
+                'xml_file': xml_filename,
+                'xml': model_xml,
+                'files': dict([(name, files.stat(name)['sha256'])
+                               for name in files.names()])}
+
+    @perf_utils.timed
+    def _restore_logrotate_config(self, snapshot):
+        """
+        Description:
+            Returns a logrotate-rule-config to the state captured by
+            _snapshot_logrotate_config using as few plans as possible:
+            none if the model has not drifted, otherwise one
+        Args:
+            snapshot (dict): snapshot of the logrotate-rule-config
+        Actions:
+            1. Export the current config and compare it with the snapshot
+            2. If it differs, load the snapshot with --replace and run
+               a plan
+            3. Compare /etc/logrotate.d on the node with the snapshot
+        Results:
+            Returns the number of plans run
+        """
+        export_file = "/tmp/restore_{0}".format(snapshot['xml_file'])
+        model_xml, _, rc = self.run_command(
+            self.test_ms,
+            "/usr/bin/litp export -p {0} -f {1} && /bin/cat {1}; "
+            "_rc=$?; /bin/rm -f {1}; exit $_rc".format(
+                snapshot['url'], export_file))
+
+        plans = 0
+        if rc != 0 or model_xml != snapshot['xml'] or \
+                not self.is_all_applied(self.test_ms):
+            self.execute_cli_load_cmd(
+                self.test_ms, snapshot['parent'],
+                snapshot['xml_file'], "--replace")
+            self.assertTrue(self._run_plan())
+            plans += 1
+
+        files = self._snapshot_logrotated(snapshot['node'])
+        drifted = sorted(
+            set(snapshot['files'].items()) ^
+            set([(name, files.stat(name)['sha256'])
+                 for name in files.names()]))
+        if drifted:
+            self.log("info", "{0} differs from the snapshot in: {1}, "
+                     "Puppet will correct it on its next run".format(
+                         test_constants.LOGROTATE_PATH,
+                         sorted(set([name for name, _ in drifted]))))
+        return plans
+
+    @perf_utils.timed
     def _backup_logrotated(self, node):
         """
         Description:
@@ -249,6 +444,7 @@ class Story664(GenericTest):
         self.assertEquals([], std_out)
         self.assertEquals([], std_err)
 
+    @perf_utils.timed
     def _return_logrotated(self, node):
         """
         Description:
@@ -277,125 +473,154 @@ class Story664(GenericTest):
         self.assertEquals([], std_out)
         self.assertEquals([], std_err)
 
+    def _fan_out(self, func, nodes):
+        """
+        Description:
+            Runs the same per-node operation concurrently on all nodes
+        Args:
+            func (callable): operation to run, called with the node
+            nodes (list): nodes on which to run the operation
+        Actions:
+            1. Run func on every node in its own thread
+            2. Wait for all of the nodes to finish
+        Results:
+            Returns a dict of node to result, failures on all nodes
+            are reported together
+        """
+        return session_utils.fan_out(func, nodes)
+
+    @perf_utils.timed
     def _test_04_setup(self):
         """
         Description:
             Function that creates the log files and directory structure
-            needed for test_04
+            needed for test_04, the nodes are set up concurrently
         """
-        # Create randomly generated file of size 1k
-        self.generate_file(self.test_ms, self.ranfile_path, 1)
-        self.generate_file(self.test_node1, self.ranfile_path, 1)
-        self.generate_file(self.test_node2, self.ranfile_path, 1)
+        def _setup_ms(node):
+            # Create randomly generated file of size 1k
+            self.generate_file(node, self.ranfile_path, 1)
 
-        # Append the randomly generated file to
-        # a log file which will be rotated
-        self.append_files(
-            self.test_ms, "/var/log/log1", self.ranfile_path)
+            # Append the randomly generated file to
+            # a log file which will be rotated
+            self.append_files(node, "/var/log/log1", self.ranfile_path)
 
-        cmd = \
-        "/bin/mkdir /tmp/log_test04"
-        std_out, std_err, rc = self.run_command(
-            self.test_node1, cmd, su_root=True)
-        self.assertEquals(0, rc)
-        self.assertEquals([], std_out)
-        self.assertEquals([], std_err)
+        def _setup_node1(node):
+            self.generate_file(node, self.ranfile_path, 1)
 
-        # Append the randomly generated file to
-        # a log file which will be rotated
-        self.append_files(
-            self.test_node1, "/tmp/log_test04/log1.log", self.ranfile_path)
-        self.append_files(
-            self.test_node1, "/tmp/log_test04/log2.log", self.ranfile_path)
+            cmd = \
+            "/bin/mkdir /tmp/log_test04"
+            std_out, std_err, rc = self.run_command(
+                node, cmd, su_root=True)
+            self.assertEquals(0, rc)
+            self.assertEquals([], std_out)
+            self.assertEquals([], std_err)
 
-        cmd = \
-        "/bin/mkdir /var/logs_test04"
-        std_out, std_err, rc = self.run_command(
-            self.test_node2, cmd, su_root=True)
-        self.assertEquals(0, rc)
-        self.assertEquals([], std_out)
-        self.assertEquals([], std_err)
+            # Append the randomly generated file to
+            # a log file which will be rotated
+            self.append_files(
+                node, "/tmp/log_test04/log1.log", self.ranfile_path)
+            self.append_files(
+                node, "/tmp/log_test04/log2.log", self.ranfile_path)
 
-        cmd = \
-        "/bin/mkdir /var/logs_test04/logs_t04"
-        std_out, std_err, rc = self.run_command(
-            self.test_node2, cmd, su_root=True)
-        self.assertEquals(0, rc)
-        self.assertEquals([], std_out)
-        self.assertEquals([], std_err)
+        def _setup_node2(node):
+            self.generate_file(node, self.ranfile_path, 1)
 
-        # Append the randomly generated file to
-        # a log file which will be rotated
-        self.append_files(
-            self.test_node2, "/var/logs_test04/log1.log", self.ranfile_path)
+            cmd = \
+            "/bin/mkdir -p /var/logs_test04/logs_t04"
+            std_out, std_err, rc = self.run_command(
+                node, cmd, su_root=True)
+            self.assertEquals(0, rc)
+            self.assertEquals([], std_out)
+            self.assertEquals([], std_err)
 
-        self.append_files(
-            self.test_node2, "/var/logs_test04/logs_t04/log2.log",
-            self.ranfile_path)
+            # Append the randomly generated file to
+            # a log file which will be rotated
+            self.append_files(
+                node, "/var/logs_test04/log1.log", self.ranfile_path)
+            self.append_files(
+                node, "/var/logs_test04/logs_t04/log2.log",
+                self.ranfile_path)
 
+        setup = {self.test_ms: _setup_ms,
+                 self.test_node1: _setup_node1,
+                 self.test_node2: _setup_node2}
+        self._fan_out(lambda node: setup[node](node), setup.keys())
+
+    @perf_utils.timed
     def _test_04_cleanup(self):
         """
         Function that cleans up directories and logs created
-        to test, test_04
+        to test, test_04, the nodes are cleaned up concurrently
         """
-        cmd = \
-        "/bin/rm /var/log/log1"
-        std_out, std_err, rc = self.run_command(
-            self.test_ms, cmd, su_root=True)
-        self.assertEquals(0, rc)
-        self.assertEquals([], std_out)
-        self.assertEquals([], std_err)
+        cleanup = {self.test_ms: "/bin/rm /var/log/log1",
+                   self.test_node1: "/bin/rm -rf /tmp/log_test04",
+                   self.test_node2: "/bin/rm -rf /var/logs_test04"}
 
-        cmd = \
-        "/bin/rm -rf /tmp/log_test04"
-        std_out, std_err, rc = self.run_command(
-            self.test_node1, cmd, su_root=True)
-        self.assertEquals(0, rc)
-        self.assertEquals([], std_out)
-        self.assertEquals([], std_err)
+        def _cleanup(node):
+            std_out, std_err, rc = self.run_command(
+                node, cleanup[node], su_root=True)
+            self.assertEquals(0, rc)
+            self.assertEquals([], std_out)
+            self.assertEquals([], std_err)
 
-        cmd = \
-        "/bin/rm -rf /var/logs_test04"
-        std_out, std_err, rc = self.run_command(
-            self.test_node2, cmd, su_root=True)
-        self.assertEquals(0, rc)
-        self.assertEquals([], std_out)
-        self.assertEquals([], std_err)
+        self._fan_out(_cleanup, cleanup.keys())
 
     def _assert_err_msg_list(self, err_list, results):
         """
         Description:
-            Function that checks that each error message in a list, of size
-            n,is associated with a unique path which precedes the error
-            message in the list of error messages generated
+            Function that checks that the error output contains exactly the
+            expected errors, each message being associated with the path
+            which precedes it in the error output, if any.
 
             Errors on err_list can be not in the same exact order as in results
         Args:
             err_list (list): list of error messages and paths
             results (dict):  dictionary of error data
         """
-        patterns = []
-        for res in results:
-            if res['path'] is None:
-                patterns.append([res['msg']])
-            else:
-                patterns.append([res['path'], res['msg']])
-        while len(patterns):
-            if not len(err_list):
-                break
-            to_remove = []
-            for index, tup in enumerate(patterns):
-                if tup == err_list[0:len(tup)]:
-                    err_list = err_list[len(tup):]
-                    to_remove.append(index)
-            if not len(to_remove):
-                break
-            for index in reversed(to_remove):
-                del patterns[index]
-        self.assertEqual(0, len(patterns),
-                         'Some rules did not match: ' + str(patterns))
-        self.assertEqual(0, len(err_list),
-                         'Some errors were not matched: ' + str(err_list))
+        missing, unexpected = litp_output_utils.diff_errors(
+            litp_output_utils.parse_error_output(err_list),
+            [(res['path'], res['msg']) for res in results])
+        self.assertEqual([], missing,
+                         'Some rules did not match: ' + str(missing))
+        self.assertEqual([], unexpected,
+                         'Some errors were not matched: ' + str(unexpected))
+
+    def _assert_invalid_creates(self, rule_url, rule_sets):
+        """
+        Description:
+            Function that attempts to create a logrotate-rule for each
+            invalid property set and checks that every create fails with
+            the expected errors. All the creates are sent to the MS in a
+            single batch, each under its own item id so that one
+            unexpected success cannot affect the other cases.
+        Args:
+            rule_url (str): url of the rule, suffixed with the case index
+            rule_sets (list): dictionaries with the description, param and
+                              results of each case
+        """
+        urls = ["{0}_{1}".format(rule_url, index)
+                for index in range(len(rule_sets))]
+        results = []
+        try:
+            results = self._run_cmds_batch(self.test_ms, [
+                self.cli.get_create_cmd(url, "logrotate-rule", rule['param'])
+                for url, rule in zip(urls, rule_sets)])
+        finally:
+            # Remove the items of creates which unexpectedly succeeded
+            # before anything is asserted; if the batch itself failed the
+            # created items are unknown, so every url is removed
+            created = [url for url, (_, _, rc) in zip(urls, results)
+                       if rc == 0] if results else urls
+            if created:
+                self._run_cmds_batch(
+                    self.test_ms,
+                    [self.cli.get_remove_cmd(url) for url in created])
+
+        for rule, (_, stderr, rc) in zip(rule_sets, results):
+            self.log("info", "\n*** Starting test for invalid logrotate "
+                     "rules data set : {0}".format(rule['description']))
+            self.assertNotEqual(0, rc, rule['description'])
+            self._assert_err_msg_list(stderr, rule['results'])
 
     @attr('all', 'revert', 'story664', 'story664_tc01')
     def test_01_p_create_logrotate_rule_positive_validation(self):
@@ -950,16 +1175,28 @@ class Story664(GenericTest):
         logrotate_config = self.find(
             self.test_ms, "/deployments", "logrotate-rule-config", True)[0]
 
-        # Test valid logrotate set
+        self.log("info", "1. Create and remove each valid logrotate-rule "
+                 "data set")
+        # Every create/remove pair is sent to the MS in a single batch and
+        # asserted per entry
+        log_rule = logrotate_config + "/rules/logrule01a"
+        cmds = []
         for rule in valid_logrotate_rule_set:
+            cmds.append(self.cli.get_create_cmd(
+                log_rule, "logrotate-rule", rule[1]))
+            cmds.append(self.cli.get_remove_cmd(log_rule))
+        results = self._run_cmds_batch(self.test_ms, cmds)
+
+        for index, rule in enumerate(valid_logrotate_rule_set):
             self.log("info", "\n*** Starting test for valid logrotate "
                      "rules data set : '{0}'".format(rule[0]))
-            log_rule = self._create_logrotate_rule_props_list(
-                logrotate_config, "logrule01a", rule[1])
-            self.execute_cli_remove_cmd(self.test_ms, log_rule)
+            for std_out, std_err, rc in results[2 * index:2 * index + 2]:
+                self.assertEquals(0, rc, rule[0])
+                self.assertEquals([], std_out, rule[0])
+                self.assertEquals([], std_err, rule[0])
 
-        # 59.Create a rule, then update the rule by adding
-        #    an additional property
+        self.log("info", "59. Create a rule, then update the rule by adding "
+                 "an additional property")
         logrotate_rule = logrotate_config + "/rules/logrule01b"
         props = 'name="logtest01b" path="var/log/tmp664.log"'
         self.log("info",
@@ -979,7 +1216,7 @@ class Story664(GenericTest):
         self.assertEqual("var/log/tmp664.log", props2["path"])
         self.assertEqual("3", props2["rotate"])
 
-        # 60.Remove a non-mandatory property from the rule
+        self.log("info", "60. Remove a non-mandatory property from the rule")
         self.log("info",
             "\n*** Starting test for valid logrotate-rule management: " +
             "60. Remove a non-mandatory property from the rule")
@@ -1126,6 +1363,8 @@ class Story664(GenericTest):
             "logrotate-rule-config creation: " +
             "1. Create empty logrotate-rule-config item")
 
+        self.log("info", "1. Create two logrotate-rule-configs on nodeX "
+                 "and check for the validation error")
         # 1a.Create a logrotate-rule-config on nodeX
         logrotate_config = self._create_logrotate_config(
             n1_config_path, "neg_config")
@@ -1672,18 +1911,10 @@ class Story664(GenericTest):
         logrotate_config = self.find(
             self.test_ms, "/deployments", "logrotate-rule-config", True)[0]
 
-        # Test invalid logrotate rule sets
+        self.log("info", "2. Attempt to create each invalid logrotate-rule "
+                 "data set 2 to 36")
         logrotate_invalid_rule = logrotate_config + "/rules/logrule02_a"
-
-        for rule in rule_sets:
-            self.log("info", "\n*** Starting test for invalid logrotate "
-                     "rules data set : {0}".format(rule['description']))
-
-            _, stderr, _ = self.execute_cli_create_cmd(
-                self.test_ms, logrotate_invalid_rule, "logrotate-rule",
-                rule['param'], expect_positive=False)
-
-            self._assert_err_msg_list(stderr, rule['results'])
+        self._assert_invalid_creates(logrotate_invalid_rule, rule_sets)
 
         rule_sets = []
         rule_set = {
@@ -1783,20 +2014,12 @@ class Story664(GenericTest):
         }
         rule_sets.append(rule_set.copy())
 
-        # Test invalid logrotate rule set using dictionary
-        for rule in rule_sets:
-
-            self.log("info", "\n*** Starting test for invalid logrotate "
-                         "rules data set : {0}"
-                         .format(rule['description']))
+        self.log("info", "37. Attempt to create rules with scripts wrapped in "
+                 "double quotes and containing unescaped double quotes")
+        self._assert_invalid_creates(logrotate_invalid_rule, rule_sets)
 
-            _, stderr, _ = self.execute_cli_create_cmd(
-                    self.test_ms, logrotate_invalid_rule, "logrotate-rule",
-                    rule['param'], expect_positive=False)
-
-            self._assert_err_msg_list(stderr, rule['results'])
-
-        # 38. test that the name property must be unique on a given node
+        self.log("info", "38. Test that the name property must be unique on a "
+                 "given node")
         # Create 2 logrotate rules on nodeX
         #    with the same name property value
         props1 = 'name="duplicatename" path="var/log/jboss.log"'
@@ -1855,7 +2078,7 @@ class Story664(GenericTest):
         self.execute_cli_remove_cmd(
             self.test_ms, logrotate_invalid_rule2)
 
-        # 39.Attempt to remove mandatory properties
+        self.log("info", "39. Attempt to remove mandatory properties")
         rule_sets = []
         rule_set = {
             'description': '39a.Attempt to remove mandatory properties',
@@ -1900,7 +2123,7 @@ class Story664(GenericTest):
 
             self._assert_err_msg_list(stderr, rule['results'])
 
-        # 40. Attempt to update name
+        self.log("info", "40. Attempt to update name")
         rule_sets = []
         rule_set = {
             'description': '40. Attempt to update name',
@@ -1924,8 +2147,7 @@ class Story664(GenericTest):
 
             self.execute_cli_createplan_cmd(self.test_ms)
             self.execute_cli_runplan_cmd(self.test_ms)
-            self.assertTrue(self.wait_for_plan_state(
-                            self.test_ms, test_constants.PLAN_COMPLETE))
+            self.assertTrue(self._watch_plan("Successful"))
 
             _, stderr, _ = self.execute_cli_update_cmd(
                            self.test_ms, logrotate_invalid_rule1,
@@ -1934,6 +2156,7 @@ class Story664(GenericTest):
             self._assert_err_msg_list(stderr, rule['results'])
 
     @attr('all', 'revert', 'story664', 'story664_tc03', 'cdb_priority1')
+    @perf_utils.budget(max_calls=150, max_secs=2700)
     def test_03_p_create_update_remove_logrotate_rules(self):
         """
         @tms_id: litpcds_664_tc03
@@ -2004,7 +2227,6 @@ class Story664(GenericTest):
         logdfilename = "rule1"
         logfilename = "logrotatetest.log"
         rotate = 3
-        size = 3
 
         # Create randomly generated file of size 1k
         self.generate_file(self.test_node1, self.ranfile_path, 1)
@@ -2014,155 +2236,126 @@ class Story664(GenericTest):
         self.append_files(
             self.test_node1, logfile_path + logfilename, self.ranfile_path)
 
-        # 1. Backup /etc/logrotated Directory
+        self.log("info", "1. Backup /etc/logrotated Directory")
         self.backup_dir(self.test_node1, test_constants.LOGROTATE_PATH)
 
         try:
-            # 2. Find the logrotate-rule-config already on node1
+            self.log("info", "2. Find the logrotate-rule-config already on "
+                     "node1")
             n1_logrotate_config = self.find(
                 self.test_ms, "/deployments",
                 "logrotate-rule-config", "True")[0]
 
-            # 3. Define logrotate rules on nodeX
+            self.log("info", "3. Define logrotate rules on nodeX")
             props = ("name='{0}' path='{1}' rotate='{2}' size='3k' "
                 "copytruncate='true' compress='false' "
                 "delaycompress='false'".format(
                 logdfilename, logfile_path + logfilename, rotate))
             n1_rule1 = self._create_logrotate_rule(
                 n1_logrotate_config, "logrule_03a", props)
+            rule_props = logrotate_utils.parse_props(props)
 
-            # 4. Create plan
+            self.log("info", "4. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 5. Run plan
+            self.log("info", "5. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
-
-            # 6. Check that the configuration is created in /etc/logrotate.d
-            outlist = self.list_dir_contents(
-                self.test_node1, test_constants.LOGROTATE_PATH,
-                su_root=True, grep_args=logdfilename)
-            self.assertEqual(1, len(outlist))
-
-            # 7. Check the contents of the configuration file
-            logfile = self._check_file_contents(
-                self.test_node1, logdfilename, 9)
-            self.assertEqual("{0}{1} {x}".format(
-                logfile_path, logfilename, x='{'), logfile[2])
-            self.assertEqual("copytruncate", logfile[3])
-            self.assertEqual("nocompress", logfile[4])
-            self.assertEqual("nodelaycompress", logfile[5])
-            self.assertEqual("rotate {0}".format(rotate), logfile[6])
-            self.assertEqual("size {0}k".format(size), logfile[7])
-
-            # 8. Create a randomly generated file of size equal
-            # to size specified in logrotate rule
-            self.generate_file(self.test_node1, self.ranfile_path, 3)
-
-            # 9. Append the randomly generated file to the log file
-            #    to be rotated for the number of times
-            #    specifed by the rotate property
-            count = 0
-            while count < rotate:
-                time.sleep(0.5)
-                # Append randomly generated file to logfile to be rotated
-                self.append_files(
-                    self.test_node1, logfile_path + logfilename,
-                    self.ranfile_path)
-
-                # 10. Force log rotation
-                self._force_rotate(self.test_node1)
-
-                count = count + 1
-
-            # 11.Check log file has been rotated
+            self.assertTrue(self._watch_plan("Successful"))
+
+            self.log("info", "6. Check that the configuration is created in "
+                     "/etc/logrotate.d")
+            self.log("info", "7. Check the contents of the configuration file")
+            self._check_snapshot_file(
+                self._snapshot_logrotated(self.test_node1),
+                logdfilename, rule_props)
+
+            self.log("info", "8. Generate random data of size equal to size "
+                     "specified in logrotate rule")
+            self.log("info", "9. Append the random data to the log file to be "
+                     "rotated for the number of times specifed by the rotate "
+                     "property")
+            self.log("info", "10. Force log rotation after each append")
+            report = self._run_rotation_workload(
+                self.test_node1, logdfilename,
+                [logfile_path + logfilename], rotate, 3)
+            for cycle in report:
+                self.assertEqual(
+                    [logfile_path + logfilename], cycle['rotated'])
+
+            self.log("info", "11. Check log file has been rotated")
             outlist = self.list_dir_contents(
                 self.test_node1, logfile_path,
                 su_root=True, grep_args=logfilename)
             self.assertEqual(rotate + 1, len(outlist))
 
-            # 12.Update the logrotate rule
+            self.log("info", "12. Update the logrotate rule")
             rotate += 1
             props = "compress='false' rotate='{0}'".format(rotate)
             self._update_logrotate_rule_props(n1_rule1, props)
+            rule_props.update(logrotate_utils.parse_props(props))
 
-            # 13.Create plan
+            self.log("info", "13. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 14.Run plan
+            self.log("info", "14. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
-
-            # 15.Check that the configuration is present in /etc/logrotate.d
-            outlist = self.list_dir_contents(
-                self.test_node1, test_constants.LOGROTATE_PATH,
-                su_root=True, grep_args=logdfilename)
-            self.assertEqual(1, len(outlist))
-
-            # 16.Check the contents of the file is as expected
-            logfile = self._check_file_contents(
-                self.test_node1, logdfilename, 9)
-            self.assertEqual("{0}{1} {x}".format(
-                logfile_path, logfilename, x='{'), logfile[2])
-            self.assertEqual("nocompress", logfile[4])
-            self.assertEqual("copytruncate", logfile[3])
-            self.assertEqual("nodelaycompress", logfile[5])
-            self.assertEqual("rotate {0}".format(rotate), logfile[6])
-            self.assertEqual("size {0}k".format(size), logfile[7])
-
-            # 17.Append the randomly generated file to the log file
-            #    to be rotated for the number of times
-            #    specifed by the updated rotate property
-            count = 0
-            while count < rotate + 1:
-                time.sleep(0.5)
-                # Append random generated file to log file
-                self.append_files(
-                    self.test_node1, logfile_path + logfilename,
-                    self.ranfile_path)
-
-                # 18.Force log rotation
-                self._force_rotate(self.test_node1)
-
-                count = count + 1
-
-            # 19.Check log file has been rotated
+            self.assertTrue(self._watch_plan("Successful"))
+
+            self.log("info", "15. Check that the configuration is present in "
+                     "/etc/logrotate.d")
+            self.log("info", "16. Check the contents of the file is as "
+                     "expected")
+            self._check_snapshot_file(
+                self._snapshot_logrotated(self.test_node1),
+                logdfilename, rule_props)
+
+            self.log("info", "17. Append random data to the log file to be "
+                     "rotated for the number of times specifed by the updated "
+                     "rotate property")
+            self.log("info", "18. Force log rotation after each append")
+            report = self._run_rotation_workload(
+                self.test_node1, logdfilename,
+                [logfile_path + logfilename], rotate + 1, 3)
+            for cycle in report:
+                self.assertEqual(
+                    [logfile_path + logfilename], cycle['rotated'])
+
+            self.log("info", "19. Check log file has been rotated")
             outlist = self.list_dir_contents(
                 self.test_node1, logfile_path,
                 su_root=True, grep_args=logfilename)
             self.assertEqual(rotate + 1, len(outlist))
 
-            # 20.Remove the logrotate rule on nodeX
+            self.log("info", "20. Remove the logrotate rule on nodeX")
             self._remove_logrotate_rule(n1_rule1)
 
-            # 21.Create plan
+            self.log("info", "21. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 22.Run plan
+            self.log("info", "22. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            self.assertTrue(self._watch_plan("Successful"))
 
-            # 23.Check that the configuration is removed in /etc/logrotate.d
+            self.log("info", "23. Check that the configuration is removed in "
+                     "/etc/logrotate.d")
             outlist = self.list_dir_contents(
                 self.test_node1, test_constants.LOGROTATE_PATH,
                 su_root=True, grep_args=logdfilename)
             self.assertEqual([], outlist)
 
         finally:
-            # 24.Remove log files created during test
+            self.log("info", "24. Remove log files created during test")
             self._remove_created_logfiles(
                 self.test_node1, logfile_path + logfilename)
 
     @attr('all', 'revert', 'story664', 'story664_tc04')
+    @perf_utils.budget(max_calls=250, max_secs=3600)
     def test_04_p_create_update_multiple_logrotate_rules(self):
         """
         @tms_id: litpcds_664_tc04
@@ -2217,48 +2410,39 @@ class Story664(GenericTest):
             @step:     Force log rotation on nodeY.
             @result:   nodeY log rotation occurs due to globbing file match
                        use.
-            @step:     Update multiple logrotate-rule model items.
-            @result:   logrotate-rule model items Updated.
-            @step:     Create LITP plan.
-            @result:   LITP plan created.
-            @step:     Run LITP plan.
+            @step:     Update the logrotate-rule model item on nodeX and
+                       remove the logrotate-rule model items from nodeY and
+                       MS.
+            @result:   logrotate-rule model items Updated and ForRemoval.
+            @step:     Create and run a single LITP plan.
             @result:   LITP plan execution completed successfully.
-            @step:     Check configuration file updated in '/etc/logrotate.d'.
-            @result:   Configuration file updated.
+            @step:     Check configuration file updated in '/etc/logrotate.d'
+                       on nodeX and removed on nodeY and MS.
+            @result:   Configuration file updated and files removed.
             @step:     Remove logrotate-rule model item from nodeX
             @result:   logrotate-rule model item ForRemoval.
-            @step:     Create LITP plan.
-            @result:   LITP plan created.
-            @step:     Run LITP plan.
+            @step:     Create and run LITP plan.
             @result:   LITP plan execution completed successfully.
             @step:     Check configuration file removed from
                        '/etc/logrotate.d' on nodeX.
             @result:   Configuration file removed.
-            @step:     Remove logrotate-rule model item from nodeY and MS.
-            @result:   logrotate-rule model items ForRemoval.
-            @step:     Create LITP plan.
-            @result:   LITP plan created.
-            @step:     Run LITP plan.
-            @result:   LITP plan execution completed successfully.
-            @step:     Check configuration files removed from
-                       '/etc/logrotate.d' on nodeY and MS.
-            @result:   Configuration files removed.
         @tms_test_precondition: N/A
         @tms_execution_type: Automated
         """
         # Test Attributes
         rotate = "6"
         rotate1 = "4"
+        test_nodes = [self.test_ms, self.test_node1, self.test_node2]
+
         # Backup /etc/logrotated Directory
-        self._backup_logrotated(self.test_ms)
-        self._backup_logrotated(self.test_node1)
-        self._backup_logrotated(self.test_node2)
+        self._fan_out(self._backup_logrotated, test_nodes)
 
         # Test Setup
         self._test_04_setup()
 
         try:
-            # 1. Find the existing logrotate-rule-config on MS, nodeX and nodeY
+            self.log("info", "1. Find the existing logrotate-rule-config on "
+                     "MS, nodeX and nodeY")
             # Find the logrotate-rule-config already on the ms
             ms_logrotate_config = self.find(
                 self.test_ms, "/ms", "logrotate-rule-config", "True")[0]
@@ -2273,16 +2457,17 @@ class Story664(GenericTest):
                 self.test_ms, "/deployments",
                 "logrotate-rule-config", "True")[1]
 
-            # 2. Create a logrotate rule which specifies a size limit
-            #   for rotation on the MS
+            self.log("info", "2. Create a logrotate rule which specifies a "
+                     "size limit for rotation on the MS")
             props = ("name='compress_rule1' path='/var/log/log1.log' "
                      "rotate={0} size='10k' "
                     "copytruncate='true' compress='true'".format(rotate))
             ms_rule1 = self._create_logrotate_rule(
                 ms_logrotate_config, "compress_rotate_rule1", props)
+            ms_rule1_props = logrotate_utils.parse_props(props)
 
-            # 3. Create a logrotate rule which specifies a time duration
-            #   for rotation node nodeX
+            self.log("info", "3. Create a logrotate rule which specifies a "
+                     "time duration for rotation node nodeX")
             props = ("name='time_rule1' "
                      "path='/tmp/log_test04/log1.log,"
                      "/tmp/log_test04/log2.log' "
@@ -2295,9 +2480,11 @@ class Story664(GenericTest):
 
             n1_rule1 = self._create_logrotate_rule(
                 n1_logrotate_config, "rotate_every_rule1", props)
+            n1_rule1_props = logrotate_utils.parse_props(props)
 
-            # 4. Create a logrotate rule which specifies a definition
-            #   with a filename on nodeY or filename match (globbing *)
+            self.log("info", "4. Create a logrotate rule which specifies a "
+                     "definition with a filename on nodeY or filename match "
+                     "(globbing *)")
             props = ("name=jboss "
                      "path='/var/logs_test04/log1.log,"
                      "/var/logs_test04/*/*.log' "
@@ -2309,99 +2496,41 @@ class Story664(GenericTest):
 
             n2_rule1 = self._create_logrotate_rule(
                 n2_logrotate_config, "globbing_rule1", props)
+            n2_rule1_props = logrotate_utils.parse_props(props)
 
-            # 5. Create plan
+            self.log("info", "5. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 6.Run plan
+            self.log("info", "6. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
-
-            # 7. Check that the configuration is created in /etc/logrotate.d
-            outlist = self.list_dir_contents(
-                    self.test_ms, test_constants.LOGROTATE_PATH,
-                    su_root=True, grep_args="compress_rule1")
-            self.assertEqual(1, len(outlist))
-
-            outlist = self.list_dir_contents(
-                    self.test_node1, test_constants.LOGROTATE_PATH,
-                    su_root=True, grep_args="time_rule1")
-            self.assertEqual(1, len(outlist))
-
-            outlist = self.list_dir_contents(
-                    self.test_node2, test_constants.LOGROTATE_PATH,
-                    su_root=True, grep_args="jboss")
-            self.assertEqual(1, len(outlist))
-
-            # 8. Check the contents of the configuration files are as expected
-            logfile = self._check_file_contents(
-                self.test_ms, "compress_rule1", 8)
-            self.assertEqual("/var/log/log1.log {x}".format(x='{'), logfile[2])
-            self.assertEqual("compress", logfile[3])
-            self.assertEqual("copytruncate", logfile[4])
-            self.assertEqual("rotate {0}".format(rotate), logfile[5])
-            self.assertEqual("size 10k", logfile[6])
-
-            logfile = self._check_file_contents(
-                self.test_node1, "time_rule1", 16)
-            self.assertEqual(
-                "/tmp/log_test04/log1.log " +
-                "/tmp/log_test04/log2.log {x}".format(x='{'),
-                logfile[2])
-            self.assertEqual("compress", logfile[3])
-            self.assertEqual("dateext", logfile[4])
-            self.assertEqual("dateformat -%Y%m%d-%s", logfile[5])
-            self.assertEqual("delaycompress", logfile[6])
-            self.assertEqual("nocreate", logfile[7])
-            self.assertEqual("rotate {0}".format(rotate1), logfile[8])
-            self.assertEqual("sharedscripts", logfile[9])
-            self.assertEqual("size 8k", logfile[10])
-            self.assertEqual("weekly", logfile[11])
-            self.assertEqual("postrotate", logfile[12])
-            self.assertEqual(
-                "/sbin/service rsyslog restart || true", logfile[13])
-            self.assertEqual("endscript", logfile[14])
-
-            logfile = self._check_file_contents(
-                self.test_node2, "jboss", 16)
-            self.assertEqual(
-                "/var/logs_test04/log1.log " +
-                "/var/logs_test04/*/*.log {x}".format(x='{'), logfile[2])
-            self.assertEqual("compress", logfile[3])
-            self.assertEqual("copytruncate", logfile[4])
-            self.assertEqual("dateext", logfile[5])
-            self.assertEqual("dateformat -%Y%m%d-%s", logfile[6])
-            self.assertEqual("delaycompress", logfile[7])
-            self.assertEqual("nocreate", logfile[8])
-            self.assertEqual("rotate {0}".format(rotate1), logfile[9])
-            self.assertEqual("sharedscripts", logfile[10])
-            self.assertEqual("size 4k", logfile[11])
-            self.assertEqual("postrotate", logfile[12])
-            self.assertEqual(
-                "/sbin/service rsyslog restart || true", logfile[13])
-            self.assertEqual("endscript", logfile[14])
-
-            # 9. Create a randomly generated file of size equal
-            # to size specified in logrotate rule
-            self.generate_file(self.test_ms, self.ranfile_path, 10)
-
-            # 10. Append the randomly generated file to the log file
-            #    to be rotated for the number of times
-            #    specifed by the rotate property
-            count = 0
-            while count < int(rotate):
-                time.sleep(0.5)
-                # Append randomly generated file to logfile to be rotated
-                self.append_files(
-                    self.test_ms, "/var/log/log1.log", self.ranfile_path)
-
-                # 11. Force log rotation
-                self._force_rotate(self.test_ms)
-
-                count += 1
+            self.assertTrue(self._watch_plan("Successful"))
+
+            self.log("info", "7. Check that the configuration is created in "
+                     "/etc/logrotate.d")
+            snapshots = self._fan_out(self._snapshot_logrotated, test_nodes)
+
+            self.log("info", "8. Check the contents of the configuration "
+                     "files are as expected")
+            self._check_snapshot_file(
+                snapshots[self.test_ms], "compress_rule1", ms_rule1_props)
+            self._check_snapshot_file(
+                snapshots[self.test_node1], "time_rule1", n1_rule1_props)
+            self._check_snapshot_file(
+                snapshots[self.test_node2], "jboss", n2_rule1_props)
+
+            self.log("info", "9. Generate random data of size equal to size "
+                     "specified in logrotate rule")
+            self.log("info", "10. Append the random data to the log file to "
+                     "be rotated for the number of times specifed by the "
+                     "rotate property")
+            self.log("info", "11. Force log rotation after each append")
+            report = self._run_rotation_workload(
+                self.test_ms, "compress_rule1", ["/var/log/log1.log"],
+                int(rotate), 10)
+            for cycle in report:
+                self.assertEqual(["/var/log/log1.log"], cycle['rotated'])
 
             outlist = self.list_dir_contents(
                     self.test_ms, "/var/log/",
@@ -2409,7 +2538,8 @@ class Story664(GenericTest):
                     grep_args=r"'log1\.log\.[1-{0}]\.gz'".format(rotate))
             self.assertEqual(int(rotate), len(outlist))
 
-            # 12.Check that the logs are rotated at that size on the MS
+            self.log("info", "12. Check that the logs are rotated at that "
+                     "size on the MS")
             sizecmd = "/usr/bin/du -sk /var/log/log1.log.1.gz"
 
             std_out, std_err, rc = self.run_command(
@@ -2420,51 +2550,42 @@ class Story664(GenericTest):
             self.assertTrue(
                 self.is_text_in_list("12", std_out))
 
-            # 13.Check that the logs are rotated based on the property,
-            #    rotate_every on nodeX
-            # Generate random files on node1 and node2
-            self.generate_file(self.test_node1, self.ranfile_path, 10)
-            self.generate_file(self.test_node2, self.ranfile_path, 10)
-
-            # Append the randomly generated files to the log file
+            self.log("info", "13. Check that the logs are rotated based on "
+                     "the property, rotate_every on nodeX")
+            # Append random data to the log files
             # to be rotated for the rules that specify the number of times
             # specifed by the rotate property, filename match (globbing *)
-            # and rotate_every property and the postrotate property
-            count = 0
-            while count < int(rotate1):
-                time.sleep(0.5)
-                # Append randomly generated file to logfile to be rotated
-                self.append_files(
-                    self.test_node1, "/tmp/log_test04/log1.log",
-                    self.ranfile_path)
-                self.append_files(
-                    self.test_node1, "/tmp/log_test04/log2.log",
-                    self.ranfile_path)
-                self.append_files(
-                    self.test_node2, "/var/logs_test04/log1.log",
-                    self.ranfile_path)
-                self.append_files(
-                    self.test_node2, "/var/logs_test04/logs_t04/log2.log",
-                    self.ranfile_path)
-
-                # Force log rotation
+            # and rotate_every property and the postrotate property,
+            # forcing log rotation after each append, on node1 and node2
+            # at the same time. Cycles are a second apart as both rules
+            # use a dateformat with a resolution of one second
+            workloads = {
+                self.test_node1: ("time_rule1", ["/tmp/log_test04/log1.log",
+                                                 "/tmp/log_test04/log2.log"]),
+                self.test_node2: ("jboss", [
+                    "/var/logs_test04/log1.log",
+                    "/var/logs_test04/logs_t04/log2.log"])}
+            reports = self._fan_out(
+                lambda node: self._run_rotation_workload(
+                    node, workloads[node][0], workloads[node][1],
+                    int(rotate1), 10, spacing_secs=1),
+                [self.test_node1, self.test_node2])
+
+            for cycle in reports[self.test_node1]:
                 # Node1:log rotation does not occur as rotate_every
                 # set to "weekly" despite size being met
                 # and post rotatescript is not executed
-                self._force_rotate(self.test_node1)
+                self.assertEqual([], cycle['rotated'])
+                self.assertEqual([], cycle['output'])
 
-                # Node1:log rotation occurs as size being met
+            for cycle in reports[self.test_node2]:
+                # Node2:log rotation occurs as size being met
                 # and post rotatescript is executed
                 # resulting in std_out containing output
-                rotatecmd = '/usr/sbin/logrotate {0}'.format(
-                    test_constants.LOGROTATE_CFG_FILE)
-                std_out, std_err, rc = self.run_command(
-                    self.test_node2, rotatecmd, su_root=True)
-                self.assertEquals(0, rc)
-                self.assertNotEqual([], std_out)
-                self.assertEquals([], std_err)
-
-                count += 1
+                self.assertTrue("/var/logs_test04/log1.log" in
+                                cycle['rotated'])
+                self.assertNotEqual([], cycle['output'])
+
             # Check that log has not been rotated
             # as rotate_every set to "weekly" and
             # despite size being met
@@ -2491,76 +2612,61 @@ class Story664(GenericTest):
             # Expect 4 as rotate is set to 4 so only 4 logs kept
             self.assertEqual(int(rotate1), len(outlist))
 
-            # 14.Update different logrotate rules
-            props = ("path='/tmp/log_test_04/log3.log' size='2k' "
-                     "rotate_every='day' delaycompress='false'")
-            self._update_logrotate_rule_props(n1_rule1, props)
-
-            props = "postrotate,sharedscripts,dateext"
-            self.execute_cli_update_cmd(
-            self.test_ms, n1_rule1, props, action_del=True)
-
-            # 15.Create plan
-            self.execute_cli_createplan_cmd(self.test_ms)
-
-            # 16.Run plan
-            self.execute_cli_runplan_cmd(self.test_ms)
-
-            # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
-
-            # 17.Check that the configurations are updated in /etc/logrotate.d
-            logfile = self._check_file_contents(
-                self.test_node1, "time_rule1", 11)
-            self.assertEqual("compress", logfile[3])
-            self.assertEqual("daily", logfile[4])
-            self.assertEqual("dateformat -%Y%m%d-%s", logfile[5])
-            self.assertEqual("nocreate", logfile[6])
-            self.assertEqual("nodelaycompress", logfile[7])
-            self.assertEqual("rotate {0}".format(rotate1), logfile[8])
-            self.assertEqual("size 2k", logfile[9])
-
-            # 18.Remove logrotate rule on node2
-            self._remove_logrotate_rule(n2_rule1)
-
-            # 19.Create plan
-            self.execute_cli_createplan_cmd(self.test_ms)
-
-            # 20.Run plan
-            self.execute_cli_runplan_cmd(self.test_ms)
-
-            # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
-
-            # 21.Check that the configuration is removed in /etc/logrotate.d
-            self.assertFalse(self.remote_path_exists(
-                self.test_node2, test_constants.LOGROTATE_PATH + "jboss",
-                expect_file=False))
-
-            # 22.Remove logrotate rule on node1
+            self.log("info", "14. Update the logrotate rule on nodeX and "
+                     "remove the rules on nodeY and the MS")
+            # The changes touch disjoint items so they are deployed by one
+            # plan and verified per scenario
+            plan = plan_utils.PlanCoalescer(self._run_plan)
+
+            def _update_n1_rule1():
+                props = ("path='/tmp/log_test_04/log3.log' size='2k' "
+                         "rotate_every='day' delaycompress='false'")
+                self._update_logrotate_rule_props(n1_rule1, props)
+                n1_rule1_props.update(logrotate_utils.parse_props(props))
+
+                props = "postrotate,sharedscripts,dateext"
+                self.execute_cli_update_cmd(
+                    self.test_ms, n1_rule1, props, action_del=True)
+                for prop in props.split(","):
+                    del n1_rule1_props[prop]
+
+            self.log("info", "15. Check that the configurations are updated "
+                     "in /etc/logrotate.d")
+            plan.add("update rule on nodeX", [n1_rule1], _update_n1_rule1,
+                     lambda: self._check_rendered_file(
+                         self.test_node1, "time_rule1", n1_rule1_props))
+
+            self.log("info", "16. Remove logrotate rule on nodeY and check "
+                     "that the configuration is removed in /etc/logrotate.d")
+            plan.add("remove rule on nodeY", [n2_rule1],
+                     lambda: self._remove_logrotate_rule(n2_rule1),
+                     lambda: self.assertFalse(self.remote_path_exists(
+                         self.test_node2,
+                         test_constants.LOGROTATE_PATH + "jboss",
+                         expect_file=False)))
+
+            self.log("info", "17. Remove logrotate rule on MS and check that "
+                     "the configuration is removed in /etc/logrotate.d")
+            plan.add("remove rule on MS", [ms_rule1],
+                     lambda: self._remove_logrotate_rule(ms_rule1),
+                     lambda: self.assertFalse(self.remote_path_exists(
+                         self.test_ms,
+                         test_constants.LOGROTATE_PATH + "compress_rule1",
+                         expect_file=False)))
+
+            self.log("info", "18. Create plan, run plan and wait for it to "
+                     "complete")
+            self.assertTrue(plan.run())
+
+            self.log("info", "19. Remove logrotate rule on nodeX")
             self._remove_logrotate_rule(n1_rule1)
 
-            # 23.Remove logrotate rule on MS
-            self._remove_logrotate_rule(ms_rule1)
-
-            # 24.Create plan
-            self.execute_cli_createplan_cmd(self.test_ms)
-
-            # 25.Run plan
-            self.execute_cli_runplan_cmd(self.test_ms)
-
-            # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
-
-            # 26.Check that the configuration is removed in /etc/logrotate.d
-            self.assertFalse(self.remote_path_exists(
-                self.test_node2,
-                test_constants.LOGROTATE_PATH + "compress_rule1",
-                expect_file=False))
+            self.log("info", "20. Create plan, run plan and wait for it to "
+                     "complete")
+            self.assertTrue(self._run_plan())
 
+            self.log("info", "21. Check that the configuration is removed in "
+                     "/etc/logrotate.d")
             self.assertFalse(self.remote_path_exists(
                 self.test_node1,
                 test_constants.LOGROTATE_PATH + "time_rule1",
@@ -2568,13 +2674,12 @@ class Story664(GenericTest):
 
         finally:
             # Move files back
-            self._return_logrotated(self.test_ms)
-            self._return_logrotated(self.test_node1)
-            self._return_logrotated(self.test_node2)
+            self._fan_out(self._return_logrotated, test_nodes)
 
             self._test_04_cleanup()
 
     @attr('all', 'revert', 'story664', 'story664_tc05')
+    @perf_utils.budget(max_calls=200, max_secs=3600)
     def test_05_p_update_name_of_logrotate_rules(self):
         """
         @tms_id: litpcds_664_tc05
@@ -2650,43 +2755,42 @@ class Story664(GenericTest):
             self.test_ms, "/deployments", "node-config", False)
         n2_config_path = config_path[1]
 
-        # 1. Find the exising logrotate config on nodeY
+        self.log("info", "1. Find the exising logrotate config on nodeY")
         n2_logrotate_config = self.find(
             self.test_ms, "/deployments", "logrotate-rule-config", True)[1]
 
         # Export configA
-        self.execute_cli_export_cmd(
-            self.test_ms, n2_logrotate_config, "xml_05_story664.xml")
+        snapshot = self._snapshot_logrotate_config(
+            n2_logrotate_config, self.test_node2, "xml_05_story664.xml")
 
         # Backup /etc/logrotated Directory
         self.backup_dir(self.test_node2, test_constants.LOGROTATE_PATH)
 
         try:
-            # 2. Define logrotate rule on nodeY with nameA
+            self.log("info", "2. Define logrotate rule on nodeY with nameA")
             props = ("name='{0}' path='{1}' rotate='{2}' size='3k' "
                 "copytruncate='true' compress='true'".format(
                 logdfilename, logfile_path + logfilename, rotate))
             n2_rule1 = self._create_logrotate_rule(
                 n2_logrotate_config, "logrule_03a", props)
 
-            # 3. Create plan
+            self.log("info", "3. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 4. Run plan
+            self.log("info", "4. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            self.assertTrue(self._watch_plan("Successful"))
 
-            # 5. Check that the configuration is created
-            #    in /etc/logrotate.d with nameA
+            self.log("info", "5. Check that the configuration is created in "
+                     "/etc/logrotate.d with nameA")
             outlist = self.list_dir_contents(
                 self.test_node2, test_constants.LOGROTATE_PATH,
                 su_root=True, grep_args=logdfilename)
             self.assertEqual(1, len(outlist))
 
-            # 6. Check the contents of the configuration file
+            self.log("info", "6. Check the contents of the configuration file")
             logfile = self._check_file_contents(
                 self.test_node2, logdfilename, 8)
             self.assertEqual("{0}{1} {x}".format(
@@ -2696,88 +2800,88 @@ class Story664(GenericTest):
             self.assertEqual("rotate {0}".format(rotate), logfile[5])
             self.assertEqual("size {0}k".format(rotate), logfile[6])
 
-            # 7. Update the logrotate rule name to nameB
+            self.log("info", "7. Update the logrotate rule name to nameB")
             props = "name='{0}'".format(logdfilenameupdate)
             _, stderr, _ = self.execute_cli_update_cmd(
                 self.test_ms, n2_rule1,
                 props, expect_positive=False)
 
-            # 8.Check for validation error
-            self.assertTrue(
-                self.is_text_in_list("InvalidRequestError in property",
-                stderr))
+            self.log("info", "8. Check for validation error")
+            errors = litp_output_utils.ErrorIndex(stderr)
+            self.assertNotEqual(
+                0, errors.count('InvalidRequestError', prop='name'),
+                errors.records)
 
-            # 9.Remove logrotate rule with nameA
+            self.log("info", "9. Remove logrotate rule with nameA")
             self._remove_logrotate_rule(n2_rule1)
 
-            # 10.Create new rule with nameA
+            self.log("info", "10. Create new rule with nameA")
             props = ("name='{0}' path='{1}' rotate='{2}' size='3k' "
                "copytruncate='true' compress='true'".format(
                logdfilename, logfile_path + logfilename, rotate))
             n2_rule2 = self._create_logrotate_rule(
                 n2_logrotate_config, "logrule_03b", props)
 
-            # 11.Create plan
+            self.log("info", "11. Create plan")
             _, stderr, _ = self.execute_cli_createplan_cmd(
                 self.test_ms, expect_positive=False)
 
-            # 12.Check for validation error
-            self.assertTrue(
-                self.is_text_in_list("ValidationError",
-                stderr))
+            self.log("info", "12. Check for validation error")
+            errors = litp_output_utils.ErrorIndex(stderr)
+            self.assertNotEqual(0, errors.count('ValidationError'),
+                                errors.records)
 
-            # 13. Remove rule
+            self.log("info", "13. Remove rule")
             self._remove_logrotate_rule(n2_rule2)
 
-            # 14. Create a new rule with a unique name
+            self.log("info", "14. Create a new rule with a unique name")
             props = ("name='test5_rulename3' path='{0}' rotate='{1}' "
                "size='3k' copytruncate='true' compress='true'".format(
                logfile_path + logfilename, rotate))
             self._create_logrotate_rule(
                 n2_logrotate_config, "logrule_03c", props)
 
-            # 15. Create plan
+            self.log("info", "15. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 16.Run plan
+            self.log("info", "16. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            self.assertTrue(self._watch_plan("Successful"))
 
-            # 17.Create logrotate configB on nodeY
+            self.log("info", "17. Create logrotate configB on nodeY")
             n2_logrotate_config2 = self._create_logrotate_config(
                 n2_config_path, "test05_log_config")
 
-            # 18.Define logrotate rule on nodeY with nameB
+            self.log("info", "18. Define logrotate rule on nodeY with nameB")
             props = ("name='{0}' path='{1}' rotate='{2}' size='3k' "
                 "copytruncate='true' compress='true'".format(
                 logdfilenameupdate, logfile_path + logfilename2, rotate))
             self._create_logrotate_rule(
                 n2_logrotate_config2, "logrule_03b", props)
 
-            # 19.Remove configA
+            self.log("info", "19. Remove configA")
             self._remove_logrotate_config(n2_logrotate_config)
 
-            # 20.Create plan
+            self.log("info", "20. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 21.Run plan
+            self.log("info", "21. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            self.assertTrue(self._watch_plan("Successful"))
 
-            # 22.Check that the configuration is created
-            #    in /etc/logrotate.d with nameB
+            self.log("info", "22. Check that the configuration is created in "
+                     "/etc/logrotate.d with nameB")
             outlist = self.list_dir_contents(
                 self.test_node2, test_constants.LOGROTATE_PATH,
                 su_root=True, grep_args=logdfilenameupdate)
             self.assertEqual(1, len(outlist))
 
-            # 23.Check the contents of the configuration file
+            self.log("info", "23. Check the contents of the configuration "
+                     "file")
             logfile = self._check_file_contents(
                 self.test_node2, logdfilenameupdate, 8)
             self.assertEqual("{0}{1} {x}".format(
@@ -2798,20 +2902,8 @@ class Story664(GenericTest):
             # Remove configB
             self._remove_logrotate_config(n2_logrotate_config2)
 
-            # Load xml snippet to return model to state proior to test
-            self.execute_cli_load_cmd(
-                self.test_ms, n2_config_path,
-                "xml_05_story664.xml", "--replace")
-
-            # Create plan
-            self.execute_cli_createplan_cmd(self.test_ms)
-
-            # Run plan
-            self.execute_cli_runplan_cmd(self.test_ms)
-
-            # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            # Return model to state prior to test
+            self._restore_logrotate_config(snapshot)
 
     @attr('all', 'revert', 'story664', 'story664_tc06')
     def test_06_p_export_load_logrotate_rules(self):
@@ -2899,7 +2991,7 @@ class Story664(GenericTest):
         n1_config_path = self.find(
             self.test_ms, "/deployments", "node-config", False)[0]
 
-        # 1. Backup /etc/logrotated Directory
+        self.log("info", "1. Backup /etc/logrotated Directory")
         self.backup_dir(self.test_node1, test_constants.LOGROTATE_PATH)
 
         # Find the existing logrotate config on nodeX
@@ -2907,8 +2999,8 @@ class Story664(GenericTest):
             self.test_ms, "/deployments", "logrotate-rule-config", True)[0]
 
         # Export existing logrotate config on nodeX
-        self.execute_cli_export_cmd(
-            self.test_ms, n1_logrotate_config1, "xml_06_story664.xml")
+        snapshot = self._snapshot_logrotate_config(
+            n1_logrotate_config1, self.test_node1, "xml_06_story664.xml")
 
         # Remove existing logrotate-rule-config
         self.execute_cli_remove_cmd(self.test_ms, n1_logrotate_config1)
@@ -2920,62 +3012,66 @@ class Story664(GenericTest):
         self.execute_cli_runplan_cmd(self.test_ms)
 
         # Wait for plan to complete
-        self.assertTrue(self.wait_for_plan_state(
-            self.test_ms, test_constants.PLAN_COMPLETE))
+        self.assertTrue(self._watch_plan("Successful"))
 
         try:
-            # 2. Create a logrotate config on nodeX
+            self.log("info", "2. Create a logrotate config on nodeX")
             n1_logrotate_config2 = self._create_logrotate_config(
                 n1_config_path, "n1test06a")
 
-            # 3. Define logrotate rules on nodeX
+            self.log("info", "3. Define logrotate rules on nodeX")
             props = ("name='{0}' path='{1}' rotate='{2}' size='3k' "
                 "copytruncate='true'".format(
                 logdfilename, logfile_path + logfilename, rotate))
             n1_rule1 = self._create_logrotate_rule(
                 n1_logrotate_config2, "logrule_06a", props)
 
-            # 4. export the logrotate-config
+            self.log("info", "4. export the logrotate-config")
             self.execute_cli_export_cmd(
                 self.test_ms, n1_logrotate_config2, "xml_06a_story664.xml")
 
-            # 5. export the logrotate rule item-type
+            self.log("info", "5. export the logrotate rule item-type")
             self.execute_cli_export_cmd(
                 self.test_ms, n1_rule1, "xml_06b_story664.xml")
 
-            # 6. remove the logrotate item-type
+            self.log("info", "6. remove the logrotate item-type")
             self._remove_logrotate_rule(n1_rule1)
 
-            # 7. load the logrotate config into the model using --merge
+            self.log("info", "7. load the logrotate config into the model "
+                     "using --merge")
             self.execute_cli_load_cmd(
                 self.test_ms, n1_config_path,
                 "xml_06a_story664.xml", "--merge")
 
-            # 8. Check the logrotate config is in state initial
+            self.log("info", "8. Check the logrotate config is in state "
+                     "initial")
             self.assertEqual(
                 self.get_item_state(
                 self.test_ms, n1_logrotate_config2), "Initial")
 
-            # 9. load the logrotate rule item-type into the model using --merge
+            self.log("info", "9. load the logrotate rule item-type into the "
+                     "model using --merge")
             self.execute_cli_load_cmd(
                 self.test_ms, n1_logrotate_config2 + "/rules",
                 "xml_06b_story664.xml", "--merge")
 
-            # 10. Check the logrotate rule is in state initial
+            self.log("info", "10. Check the logrotate rule is in state "
+                     "initial")
             self.assertEqual(
                 self.get_item_state(self.test_ms, n1_rule1), "Initial")
 
-            # 11. load the logrotate rule item-type
-            # into the model using --replace
+            self.log("info", "11. load the logrotate rule item-type into the "
+                     "model using --replace")
             self.execute_cli_load_cmd(
                 self.test_ms, n1_logrotate_config2 + "/rules",
                 "xml_06b_story664.xml", "--replace")
 
-            # 12. Check the logrotate rule is in state initial
+            self.log("info", "12. Check the logrotate rule is in state "
+                     "initial")
             self.assertEqual(
                 self.get_item_state(self.test_ms, n1_rule1), "Initial")
 
-            # 13. Copy xml files onto the MS
+            self.log("info", "13. Copy xml files onto the MS")
             #   XML files contain
             #   ==> logrotate-rule-config on nodeX
             #   ==> an additonal rule added to the config
@@ -2995,39 +3091,40 @@ class Story664(GenericTest):
                     self.test_ms, local_xml_filepath, xml_filepath,
                     root_copy=True))
 
-            # 14. Load xml file using the --merge
+            self.log("info", "14. Load xml file using the --merge")
             self.execute_cli_load_cmd(
                 self.test_ms, n1_config_path,
                 "/tmp/xml_logrotate_rule_1_story664.xml", "--merge")
 
-            # 15. Check the created logrotate rule config is in state "initial"
+            self.log("info", "15. Check the created logrotate rule config is "
+                     "in state \"initial\"")
             self.assertEqual(
                 self.get_item_state(
                 self.test_ms, n1_logrotate_config2), "Initial")
 
-            # 16. Create plan
+            self.log("info", "16. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 17. Run plan
+            self.log("info", "17. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            self.assertTrue(self._watch_plan("Successful"))
 
             self.execute_cli_removeplan_cmd(self.test_ms)
 
-            # 18. Check state of items in tree
+            self.log("info", "18. Check state of items in tree")
             self.assertTrue(self.is_all_applied(self.test_ms))
 
-            # 19. Check that the configuration is created
-            #     in /etc/logrotate.d on nodeX
+            self.log("info", "19. Check that the configuration is created in "
+                     "/etc/logrotate.d on nodeX")
             outlist = self.list_dir_contents(
                 self.test_node1, test_constants.LOGROTATE_PATH,
                 su_root=True, grep_args=logdfilename)
             self.assertEqual(1, len(outlist))
 
-            # 20. Check the contents of the configuration file on nodeX
+            self.log("info", "20. Check the contents of the configuration "
+                     "file on nodeX")
             logfile = self._check_file_contents(
                 self.test_node1, logdfilename, 8)
             self.assertEqual("{0}{1} {x}".format(
@@ -3037,39 +3134,39 @@ class Story664(GenericTest):
             self.assertEqual("rotate {0}".format(rotate), logfile[5])
             self.assertEqual("size 3k", logfile[6])
 
-            # 21. Load xml file using the --replace
+            self.log("info", "21. Load xml file using the --replace")
             self.execute_cli_load_cmd(
                 self.test_ms, n1_config_path,
                 "/tmp/xml_logrotate_rule_2_story664.xml", "--replace")
 
-            # 22. Check item-type is in state "Updated"
+            self.log("info", "22. Check item-type is in state \"Updated\"")
             self.assertEqual(
                 self.get_item_state(
                 self.test_ms, n1_rule1), "Updated")
 
-            # 23. Create plan
+            self.log("info", "23. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 24. Run plan
+            self.log("info", "24. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
             # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            self.assertTrue(self._watch_plan("Successful"))
 
             self.execute_cli_removeplan_cmd(self.test_ms)
 
-            # 25. Check state of items in tree
+            self.log("info", "25. Check state of items in tree")
             self.assertTrue(self.is_all_applied(self.test_ms))
 
-            # 26. Check that the configuration is created
-            #     in /etc/logrotate.d on nodeX
+            self.log("info", "26. Check that the configuration is created in "
+                     "/etc/logrotate.d on nodeX")
             outlist = self.list_dir_contents(
                 self.test_node1, test_constants.LOGROTATE_PATH,
                 su_root=True, grep_args=logdfilename)
             self.assertEqual(1, len(outlist))
 
-            # 27. Check the contents of the configuration file on nodeX
+            self.log("info", "27. Check the contents of the configuration "
+                     "file on nodeX")
             logfile = self._check_file_contents(
                 self.test_node1, logdfilename, 7)
             self.assertEqual("{0}{1} {x}".format(
@@ -3082,20 +3179,8 @@ class Story664(GenericTest):
             # Remove all items added in test
             self.execute_cli_remove_cmd(self.test_ms, n1_logrotate_config2)
 
-            # Load xml snippet to return model to state proior to test
-            self.execute_cli_load_cmd(
-                self.test_ms, n1_config_path,
-                "xml_06_story664.xml", "--replace")
-
-            # Create plan
-            self.execute_cli_createplan_cmd(self.test_ms)
-
-            # Run plan
-            self.execute_cli_runplan_cmd(self.test_ms)
-
-            # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            # Return model to state prior to test
+            self._restore_logrotate_config(snapshot)
 
     @attr('all', 'revert', 'story664', 'story664_tc07')
     def test_07_p_logrotate_manually_update_logrotated(self):
@@ -3143,46 +3228,43 @@ class Story664(GenericTest):
         logfilename = "logrotatetest.log"
         rotate = 3
 
-        # 1. Backup /etc/logrotated Directory
+        self.log("info", "1. Backup /etc/logrotated Directory")
         self.backup_dir(self.test_node1, test_constants.LOGROTATE_PATH)
 
-        # 2. Find the existing logrotate config on nodeX
+        self.log("info", "2. Find the existing logrotate config on nodeX")
         n1_logrotate_config = self.find(
             self.test_ms, "/deployments", "logrotate-rule-config", True)[0]
 
-        # 3. Define logrotate rules on nodeX
+        self.log("info", "3. Define logrotate rules on nodeX")
         props = ("name='{0}' path='{1}' rotate='{2}' size='3k' "
             "copytruncate='true'".format(
             logdfilename, logfile_path + logfilename, rotate))
         self._create_logrotate_rule(
             n1_logrotate_config, "logrule_03a", props)
+        rule_props = logrotate_utils.parse_props(props)
 
-        # 4. Create a plan
+        self.log("info", "4. Create a plan")
         self.execute_cli_createplan_cmd(self.test_ms)
 
-        # 5. Run plan
+        self.log("info", "5. Run plan")
         self.execute_cli_runplan_cmd(self.test_ms)
 
         # Wait for plan to complete
-        self.assertTrue(self.wait_for_plan_state(
-            self.test_ms, test_constants.PLAN_COMPLETE))
+        self.assertTrue(self._watch_plan("Successful"))
 
-        # 6. Check that the configuration is created in /etc/logrotate.d
+        self.log("info", "6. Check that the configuration is created in "
+                 "/etc/logrotate.d")
         outlist = self.list_dir_contents(
                 self.test_node1, test_constants.LOGROTATE_PATH,
                 su_root=True, grep_args=logdfilename)
         self.assertEqual(1, len(outlist))
 
-        # 7. Check the contents of the configuration file
-        logfile = self._check_file_contents(
-            self.test_node1, logdfilename, 7)
-        self.assertEqual("{0}{1} {x}".format(
-            logfile_path, logfilename, x='{'), logfile[2])
-        self.assertEqual("copytruncate", logfile[3])
-        self.assertEqual("rotate {0}".format(rotate), logfile[4])
-        self.assertEqual("size {0}k".format(rotate), logfile[5])
+        self.log("info", "7. Check the contents of the configuration file")
+        logfile = self._check_rendered_file(
+            self.test_node1, logdfilename, rule_props)
 
-        # 8. Manually update /etc/logrotate.d/{created_log_file}
+        self.log("info", "8. Manually update "
+                 "/etc/logrotate.d/{created_log_file}")
         std_out, std_err, rc = self.run_command(
             self.test_node1,
             "/bin/sed -i '5icompress' {0}".format(
@@ -3192,18 +3274,15 @@ class Story664(GenericTest):
         self.assertEquals([], std_out)
         self.assertEquals([], std_err)
 
-        # 9. Check line has been added
+        self.log("info", "9. Check line has been added")
         logfile_n1 = self.get_file_contents(
                 self.test_node1,
                 test_constants.LOGROTATE_PATH + logdfilename, su_root=True)
-        self.assertEqual(len(logfile_n1), 8)
-        self.assertEqual("compress", logfile_n1[3])
-        self.assertEqual("copytruncate", logfile_n1[4])
-        self.assertEqual("rotate {0}".format(rotate), logfile_n1[5])
-        self.assertEqual("size {0}k".format(rotate), logfile_n1[6])
-
-        # 10.Wait for a puppet run and check that manual
-        # update has been removed
+        self.assertEqual(logfile[:3] + ["compress"] + logfile[3:],
+                         logfile_n1)
+
+        self.log("info", "10. Wait for a puppet run and check that manual "
+                 "update has been removed")
         cmd_to_run = \
             self.redhatutils.get_grep_file_cmd(
             test_constants.LOGROTATE_PATH + logdfilename, "compress")
@@ -3252,50 +3331,47 @@ class Story664(GenericTest):
         filename = "yum"
         filenamepath = "/var/log/yum.log"
 
-        # 1. Check that a file named x exists in /etc/logrotate.d
+        self.log("info", "1. Check that a file named x exists in "
+                 "/etc/logrotate.d")
         dirlist = self.list_dir_contents(
             self.test_node1, test_constants.LOGROTATE_PATH,
             su_root=True, grep_args=filename)
         self.assertNotEqual([], dirlist)
 
-        # 2. Backup /etc/logrotated Directory
+        self.log("info", "2. Backup /etc/logrotated Directory")
         self.backup_dir(self.test_node1, test_constants.LOGROTATE_PATH)
 
-        # 3. Find the existing logrotate-rule-config on nodeX
+        self.log("info", "3. Find the existing logrotate-rule-config on nodeX")
         n1_logrotate_config = self.find(
             self.test_ms, "/deployments", "logrotate-rule-config", True)[0]
 
-        # 4. Define logrotate rule on nodeX with a
-        #    filename that exists in /etc/logrotate.d
+        self.log("info", "4. Define logrotate rule on nodeX with a filename "
+                 "that exists in /etc/logrotate.d")
         props = ("name='{0}' path='{1}' rotate='2' size='3k' "
             "copytruncate='true'".format(
             filename, filenamepath))
         self._create_logrotate_rule(
             n1_logrotate_config, "logrule_08a", props)
+        rule_props = logrotate_utils.parse_props(props)
 
-        # 5. Create a plan
+        self.log("info", "5. Create a plan")
         self.execute_cli_createplan_cmd(self.test_ms)
 
-        # 6. Run plan
+        self.log("info", "6. Run plan")
         self.execute_cli_runplan_cmd(self.test_ms)
 
         # Wait for plan to complete
-        self.assertTrue(self.wait_for_plan_state(
-            self.test_ms, test_constants.PLAN_COMPLETE))
+        self.assertTrue(self._watch_plan("Successful"))
 
-        # 7. Check that the file has been overwriten in /etc/logrotate.d
+        self.log("info", "7. Check that the file has been overwriten in "
+                 "/etc/logrotate.d")
         outlist = self.list_dir_contents(
             self.test_node1, test_constants.LOGROTATE_PATH,
             su_root=True, grep_args=filename)
         self.assertEqual(1, len(outlist))
 
-        # 8. Check the contents of the configuration file
-        logfile = self._check_file_contents(
-            self.test_node1, filename, 7)
-        self.assertEqual("{0} {x}".format(filenamepath, x='{'), logfile[2])
-        self.assertEqual("copytruncate", logfile[3])
-        self.assertEqual("rotate 2", logfile[4])
-        self.assertEqual("size 3k", logfile[5])
+        self.log("info", "8. Check the contents of the configuration file")
+        self._check_rendered_file(self.test_node1, filename, rule_props)
 
     @attr('all', 'revert', 'story664', 'story664_tc09')
     def test_09_p_verify_create_property_functionality(self):
@@ -3439,68 +3515,74 @@ class Story664(GenericTest):
             _, stderr, _ = self.execute_cli_createplan_cmd(self.test_ms,
                 expect_positive=False)
 
-            self.assertEqual(self.count_text_in_list(expected_error, stderr),
-                occurences)
+            errors = litp_output_utils.ErrorIndex(stderr)
+            self.assertEqual(occurences, errors.count(expected_error),
+                             errors.records)
 
             self.execute_cli_remove_cmd(self.test_ms, rule_url)
 
-        # 9. Verify that a user can update create from true to false
-        #    to fix an invalid rule
+        self.log("info", "9. Verify that a user can update create from true "
+                 "to false to fix an invalid rule")
         self.log("info", "\n*** Verify that a user can update create from " +
             "true to false to fix a validation error")
 
-        # 9.1 Create an invalid rule
+        self.log("info", "9.1 Create an invalid rule")
         props = ('name="create_props_log" path=/var/log/create_props_log ' +
              'create="true" create_owner="root"')
 
         self.execute_cli_create_cmd(
                 self.test_ms, rule_url, "logrotate-rule", props)
 
-        # 9.2 Creating plan expecting it to fail
+        self.log("info", "9.2 Creating plan expecting it to fail")
         _, std_err, _ = self.execute_cli_createplan_cmd(self.test_ms,
             expect_positive=False)
 
-        # 9.3 Checking that correct validation error is thrown
-        self.assertTrue(self.is_text_in_list("ValidationError", std_err))
+        self.log("info", "9.3 Checking that correct validation error is "
+                 "thrown")
+        self.assertNotEqual(
+            0, litp_output_utils.ErrorIndex(std_err).count('ValidationError'))
 
-        # 9.4 Updating create from "true to "false"
+        self.log("info", "9.4 Updating create from \"true to \"false\"")
         self.execute_cli_update_cmd(
                 self.test_ms, rule_url, 'create="false"')
 
-        # 9.5/6 Creating plan especting it to pass
+        self.log("info", "9.5/6 Creating plan especting it to pass")
         self.execute_cli_createplan_cmd(self.test_ms)
 
         self.execute_cli_remove_cmd(self.test_ms, rule_url)
 
-        # 10.Verify that a user can remove the offending property to fix an
-        #    invalid rule when create is set to true
+        self.log("info", "10. Verify that a user can remove the offending "
+                 "property to fix an invalid rule when create is set to true")
         self.log("info", "\n*** Verify that a user can remove the offending " +
             "property to fix an invalid rule when create is set to true")
 
-        # 10.1 Create an invalid rule
+        self.log("info", "10.1 Create an invalid rule")
         props = ('name="create_props_log" path=/var/log/create_props_log ' +
              'create="true" create_mode="755" create_group="root"')
 
         self.execute_cli_create_cmd(
             self.test_ms, rule_url, "logrotate-rule", props)
 
-        # 10.2 Create plan expecting it to fail
+        self.log("info", "10.2 Create plan expecting it to fail")
         _, std_err, _ = self.execute_cli_createplan_cmd(self.test_ms,
             expect_positive=False)
 
-        # 10.3 Checking that correct validation error is thrown
-        self.assertTrue(self.is_text_in_list("ValidationError", std_err))
+        self.log("info", "10.3 Checking that correct validation error is "
+                 "thrown")
+        self.assertNotEqual(
+            0, litp_output_utils.ErrorIndex(std_err).count('ValidationError'))
 
-        # 10.4 Removing offending property "create_group"
+        self.log("info", "10.4 Removing offending property \"create_group\"")
         self.execute_cli_update_cmd(
             self.test_ms, rule_url, 'create_group', action_del=True)
 
-        # 10.5/6 Creating plan expecting it to pass
+        self.log("info", "10.5/6 Creating plan expecting it to pass")
         self.execute_cli_createplan_cmd(self.test_ms)
 
         self.execute_cli_remove_cmd(self.test_ms, rule_url)
 
     @attr('all', 'revert', 'story664', 'story664_tc10')
+    @perf_utils.budget(max_calls=150, max_secs=2700)
     def test_10_p_create_remove_logrotate_config_stop_plan(self):
         """
         @tms_id: litpcds_664_tc10
@@ -3557,10 +3639,10 @@ class Story664(GenericTest):
         n1_host = self.get_props_from_url(
         self.test_ms, n1_path, "hostname")
 
-        # 1. Backup /etc/logrotated Directory
+        self.log("info", "1. Backup /etc/logrotated Directory")
         self.backup_dir(self.test_node2, test_constants.LOGROTATE_PATH)
 
-        # 2. Find existing logrotate config on nodeX
+        self.log("info", "2. Find existing logrotate config on nodeX")
         n1_logrotate_config = self.find(
             self.test_ms, "/deployments", "logrotate-rule-config", True)[0]
 
@@ -3569,8 +3651,8 @@ class Story664(GenericTest):
             self.test_ms, "/deployments", "node-config", False)[0]
 
         # Export existing logrotate config on nodeX
-        self.execute_cli_export_cmd(
-            self.test_ms, n1_logrotate_config, "xml_10_story664.xml")
+        snapshot = self._snapshot_logrotate_config(
+            n1_logrotate_config, self.test_node1, "xml_10_story664.xml")
 
         # Remove existing logrotate-rule-config
         self.execute_cli_remove_cmd(self.test_ms, n1_logrotate_config)
@@ -3582,43 +3664,39 @@ class Story664(GenericTest):
         self.execute_cli_runplan_cmd(self.test_ms)
 
         # Wait for plan to complete
-        self.assertTrue(self.wait_for_plan_state(
-            self.test_ms, test_constants.PLAN_COMPLETE))
+        self.assertTrue(self._watch_plan("Successful"))
 
         try:
-            # 2. Create logrotate-rule-config
+            self.log("info", "2. Create logrotate-rule-config")
             n1_logrotate_config = self._create_logrotate_config(
                 n1_config, "test10_log_rule")
-            # 3. Define logrotate rules on nodeX
+            self.log("info", "3. Define logrotate rules on nodeX")
             props = ("name='{0}' path='{1}' rotate='{2}' size='3k' "
                 "copytruncate='true'".format(
                 logdfilename, logfile_path + logfilename, rotate))
             n1_rule1 = self._create_logrotate_rule(
                 n1_logrotate_config, "logrule_10a", props)
-            # 4. Create plan
+            self.log("info", "4. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 5. Run plan
+            self.log("info", "5. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
-            # 6. Wait until phase 2 task is running to stop the plan
-            self.assertTrue(self.wait_for_task_state(
-                self.test_ms,
-                'Create logrotate rule "{0}" on node "{1}"'.format(
-                logdfilename, n1_host),
-                test_constants.PLAN_TASKS_RUNNING, ignore_variables=False))
+            self.log("info", "6. Wait until phase 2 task is running to stop "
+                     "the plan")
+            self.assertTrue(self._watch_plan(
+                "Running", 'Create logrotate rule "{0}" on node "{1}"'.format(
+                logdfilename, n1_host)))
 
-            # 7. Stop plan
+            self.log("info", "7. Stop plan")
             self.execute_cli_stopplan_cmd(self.test_ms)
 
-            # 8. Wait for plan to stop
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_STOPPED))
+            self.log("info", "8. Wait for plan to stop")
+            self.assertTrue(self._watch_plan("Stopped"))
 
-            # 9. Check the state of items under logrotate on node1
-            #    get set to "Applied"
-            #    when the ms task is completed and
-            #    the rules' config is set to 'Applied'
+            self.log("info", "9. Check the state of items under logrotate on "
+                     "node1 get set to \"Applied\" when the ms task is "
+                     "completed and the rules' config is set to 'Applied'")
             state = self.get_item_state(self.test_ms, n1_rule1)
             self.assertEqual(state, "Applied")
 
@@ -3626,66 +3704,50 @@ class Story664(GenericTest):
 
             self.assertEqual(state, "Applied")
 
-            # 10. Create plan
+            self.log("info", "10. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 11. Run plan
+            self.log("info", "11. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
-            # 12. Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            self.log("info", "12. Wait for plan to complete")
+            self.assertTrue(self._watch_plan("Successful"))
 
-            # 13.Remove logrotate items
+            self.log("info", "13. Remove logrotate items")
             self.execute_cli_remove_cmd(self.test_ms, n1_logrotate_config)
 
-            # 14.Create plan
+            self.log("info", "14. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 15.Run plan
+            self.log("info", "15. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
-            # 16.Wait until phase 2 task is running to stop the plan
-            self.assertTrue(self.wait_for_task_state(
-                self.test_ms,
-                'Remove logrotate rule "{0}" on node "{1}"'.format(
-                logdfilename, n1_host),
-                test_constants.PLAN_TASKS_RUNNING, ignore_variables=False))
+            self.log("info", "16. Wait until phase 2 task is running to stop "
+                     "the plan")
+            self.assertTrue(self._watch_plan(
+                "Running", 'Remove logrotate rule "{0}" on node "{1}"'.format(
+                logdfilename, n1_host)))
 
-            # 17.Stop plan
+            self.log("info", "17. Stop plan")
             self.execute_cli_stopplan_cmd(self.test_ms)
 
-            # 18.Wait for plan to stop
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_STOPPED))
+            self.log("info", "18. Wait for plan to stop")
+            self.assertTrue(self._watch_plan("Stopped"))
 
-            # 19.Check logrotate item states
+            self.log("info", "19. Check logrotate item states")
             state = self.get_item_state(self.test_ms, n1_logrotate_config)
             expected = "ForRemoval (deployment of properties indeterminable)"
             self.assertEqual(expected, state)
 
-            # 20.Create plan
+            self.log("info", "20. Create plan")
             self.execute_cli_createplan_cmd(self.test_ms)
 
-            # 21.Run plan
+            self.log("info", "21. Run plan")
             self.execute_cli_runplan_cmd(self.test_ms)
 
-            # 22.Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            self.log("info", "22. Wait for plan to complete")
+            self.assertTrue(self._watch_plan("Successful"))
 
         finally:
-            # Load xml snippet to return model to state proior to test
-            self.execute_cli_load_cmd(
-                self.test_ms, n1_config,
-                "xml_10_story664.xml", "--replace")
-
-            # Create plan
-            self.execute_cli_createplan_cmd(self.test_ms)
-
-            # Run plan
-            self.execute_cli_runplan_cmd(self.test_ms)
-
-            # Wait for plan to complete
-            self.assertTrue(self.wait_for_plan_state(
-                self.test_ms, test_constants.PLAN_COMPLETE))
+            # Return model to state prior to test
+            self._restore_logrotate_config(snapshot)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Story664 run against offline_litp's in memory model of a
+            deployment instead of the MS and peer nodes, so that changes
+            to its helpers and scenarios can be checked in seconds. Log
+            rotation runs with the local logrotate in a LogrotateSandbox,
+            steps needing it are skipped where it is not installed.
+'''
+
+from litp_generic_test import GenericTest
+import offline_litp
+import testset_story664
+
+# Tests whose steps the model and the sandbox implement: test_07 waits
+# for a Puppet run and test_10 for tasks of other plugins in its plan
+OFFLINE_TESTS = [
+    'test_01_p_create_logrotate_rule_positive_validation',
+    'test_02_n_create_logrotate_rule_negative_validation',
+    'test_03_p_create_update_remove_logrotate_rules',
+    'test_04_p_create_update_multiple_logrotate_rules',
+    'test_05_p_update_name_of_logrotate_rules',
+    'test_06_p_export_load_logrotate_rules',
+    'test_08_p_logrotate_filename_exists_logrotated',
+    'test_09_p_verify_create_property_functionality',
+]
+
+
+class OfflineGenericTest(offline_litp.OfflineDeploymentMixin, GenericTest):
+
+    '''
+    GenericTest with its deployment replaced by an OfflineModel
+    '''
+
+
+class Story664Offline(offline_litp.OfflineCLIMixin, testset_story664.Story664,
+                      OfflineGenericTest):
+
+    '''
+    Story664 against an OfflineModel
+    '''
+
+    def setUp(self):
+        """
+        Description:
+            Runs before every single test
+        Actions:
+            1. Skip the tests which need a deployment
+            2. Call the super class setup method
+        Results:
+            The test runs against a fresh OfflineModel
+        """
+        if self._testMethodName not in OFFLINE_TESTS:
+            self.skipTest("needs a deployment")
+        super(Story664Offline, self).setUp()
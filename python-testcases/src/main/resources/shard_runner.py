@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+
+'''
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     October 2026
+@summary:   Runs the test methods of a set of testsets across several LITP
+            deployments at once and merges the nosetests xunit reports.
+
+            Tests are spread over the deployments longest first, each to
+            the deployment with the least work so far, using the durations
+            found in previous xunit reports. Each deployment runs its share
+            with its own nosetests process and environment, so that the
+            framework connects to that deployment's ms1, node1 and node2.
+
+            Deployments are described in a JSON file, e.g.
+            [{"name": "dep1", "env": {"LITP_CONN_DATA_FILES_PATH": "/d1"}},
+             {"name": "dep2", "env": {"LITP_CONN_DATA_FILES_PATH": "/d2"}}]
+
+            Usage:
+            shard_runner.py --deployments deployments.json -a all
+                --history nosetests.xml --xunit-file nosetests.xml
+                logrotate/testset_story664.py testset_bug566538.py
+'''
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from logrotate import perf_utils
+
+# Duration assumed for tests without history, in seconds
+DEFAULT_DURATION = 600.0
+
+
+def _get_attrs(func):
+    """
+    Description:
+        Get the attributes a test method is tagged with by @attr.
+    Args:
+        func (ast.FunctionDef): the test method
+    Returns:
+        list. Attribute names.
+    """
+    attrs = []
+    for decorator in func.decorator_list:
+        if isinstance(decorator, ast.Call) and \
+                getattr(decorator.func, 'id', None) == 'attr':
+            for arg in decorator.args:
+                # ast.Str before Python 3.8, ast.Constant since
+                value = getattr(arg, 'value', getattr(arg, 's', None))
+                if isinstance(value, str):
+                    attrs.append(value)
+    return attrs
+
+
+def collect_tests(testsets, attribute=None):
+    """
+    Description:
+        Find the test methods of the testsets without importing them.
+    Args:
+        testsets (list): paths of the testset files
+        attribute (str): only include tests tagged with this attribute
+    Returns:
+        list. (testset path, class name, method name) tuples, in file
+        order.
+    """
+    tests = []
+    for testset in testsets:
+        with open(testset) as source:
+            tree = ast.parse(source.read(), testset)
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for func in node.body:
+                if not isinstance(func, ast.FunctionDef) or \
+                        not func.name.startswith('test'):
+                    continue
+                if attribute and attribute not in _get_attrs(func):
+                    continue
+                tests.append((testset, node.name, func.name))
+    return tests
+
+
+def load_durations(reports):
+    """
+    Description:
+        Read test durations from xunit reports of previous runs.
+    Args:
+        reports (list): paths of xunit reports, missing ones are ignored
+    Returns:
+        dict. (class name, method name) to duration in seconds; the class
+        name is the last part of the report's classname.
+    """
+    durations = {}
+    for report in reports:
+        if not os.path.exists(report):
+            continue
+        for case in ET.parse(report).getroot().iter('testcase'):
+            key = (case.get('classname', '').split('.')[-1], case.get('name'))
+            durations[key] = float(case.get('time', 0))
+    return durations
+
+
+def plan_shards(tests, durations, shards):
+    """
+    Description:
+        Spread tests over shards, longest first, each to the shard with
+        the least total duration so far.
+    Args:
+        tests (list): tests as returned by collect_tests
+        durations (dict): as returned by load_durations
+        shards (int): number of shards
+    Returns:
+        list. One (total duration, tests) tuple per shard.
+    """
+    known = [durations[(test[1], test[2])] for test in tests
+             if (test[1], test[2]) in durations]
+    default = sum(known) / len(known) if known else DEFAULT_DURATION
+
+    plan = [[0.0, []] for _ in range(shards)]
+    for test in sorted(tests, key=lambda test: -durations.get(
+            (test[1], test[2]), default)):
+        shard = min(plan, key=lambda shard: shard[0])
+        shard[0] += durations.get((test[1], test[2]), default)
+        shard[1].append(test)
+    return [(total, shard_tests) for total, shard_tests in plan]
+
+
+def merge_reports(reports, xunit_file):
+    """
+    Description:
+        Merge xunit reports into one testsuite.
+    Args:
+        reports (list): paths of the shard reports, missing ones are
+                        ignored
+        xunit_file (str): path of the merged report
+    Returns:
+        dict. Totals of the merged testsuite.
+    """
+    totals = {'tests': 0, 'errors': 0, 'failures': 0, 'skip': 0}
+    suite = ET.Element('testsuite', name='nosetests')
+    for report in reports:
+        if not os.path.exists(report):
+            continue
+        root = ET.parse(report).getroot()
+        for name in totals:
+            totals[name] += int(root.get(name, 0))
+        for case in root.iter('testcase'):
+            suite.append(case)
+    for name, value in totals.items():
+        suite.set(name, str(value))
+    ET.ElementTree(suite).write(xunit_file, encoding='utf-8',
+                                xml_declaration=True)
+    return totals
+
+
+def run_shards(deployments, plan, attribute, xunit_file, nosetests,
+               step_timings=None):
+    """
+    Description:
+        Run each shard's tests with nosetests against its deployment, all
+        shards at the same time, and merge their reports.
+    Args:
+        deployments (list): deployment definitions
+        plan (list): as returned by plan_shards
+        attribute (str): passed to nosetests -a
+        xunit_file (str): path of the merged report
+        nosetests (str): nosetests command
+        step_timings (str): directory the tests write step timings to,
+                            merged into the report if given
+    Returns:
+        int. 0 if every shard passed.
+    """
+    procs = []
+    reports = []
+    for deployment, (total, tests) in zip(deployments, plan):
+        if not tests:
+            continue
+        report = '{0}.{1}.xml'.format(
+            os.path.splitext(xunit_file)[0], deployment['name'])
+        reports.append(report)
+        cmd = [nosetests, '--with-xunit', '--xunit-file', report]
+        if attribute:
+            cmd.extend(['-a', attribute])
+        cmd.extend(['{0}:{1}.{2}'.format(*test) for test in tests])
+        env = dict(os.environ)
+        env.update(deployment.get('env', {}))
+        if step_timings:
+            env['STEP_TIMING_DIR'] = os.path.abspath(step_timings)
+        print('{0}: {1} tests, about {2:.0f}s'.format(
+            deployment['name'], len(tests), total))
+        procs.append(subprocess.Popen(cmd, env=env,
+                                      cwd=deployment.get('cwd')))
+
+    rcode = 0
+    for proc in procs:
+        rcode = proc.wait() or rcode
+    totals = merge_reports(reports, xunit_file)
+    print('Merged {0}: {1}'.format(xunit_file, totals))
+    if step_timings:
+        perf_utils.merge_into_xunit(xunit_file, step_timings)
+    return rcode
+
+
+def main(args=None):
+    """
+    Description:
+        Command line entry point.
+    """
+    parser = argparse.ArgumentParser(
+        description='Run testsets sharded across LITP deployments')
+    parser.add_argument('--deployments', required=True,
+                        help='JSON file describing the deployments')
+    parser.add_argument('-a', '--attr', dest='attribute',
+                        help='only run tests with this attribute')
+    parser.add_argument('--history', action='append', default=[],
+                        help='xunit report of a previous run, repeatable')
+    parser.add_argument('--xunit-file', default='nosetests.xml',
+                        help='merged report')
+    parser.add_argument('--nosetests', default='nosetests',
+                        help='nosetests command')
+    parser.add_argument('--step-timings',
+                        help='merge step timings from this directory')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print the plan without running it')
+    parser.add_argument('testsets', nargs='+')
+    args = parser.parse_args(args)
+
+    with open(args.deployments) as deployments_file:
+        deployments = json.load(deployments_file)
+    tests = collect_tests(args.testsets, args.attribute)
+    plan = plan_shards(tests, load_durations(args.history),
+                       len(deployments))
+
+    if args.dry_run:
+        for deployment, (total, shard_tests) in zip(deployments, plan):
+            print('{0}: about {1:.0f}s'.format(deployment['name'], total))
+            for test in shard_tests:
+                print('    {0}:{1}.{2}'.format(*test))
+        return 0
+    return run_shards(deployments, plan, args.attribute, args.xunit_file,
+                      args.nosetests, args.step_timings)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,15 +10,148 @@ program(s) have been supplied.
 @author:    Laurence Canny
 @summary:   TORF-566538
 """
+import os
 import re
 import time
-import itertools
 from litp_generic_test import GenericTest, attr
 from redhat_cmd_utils import RHCmdUtils
+import perf_utils
+import session_utils
 import test_constants as const
 
+# One line per host of "mco puppet status", e.g.
+#   ms1: Currently idling; last completed run 2 minutes 16 seconds ago
+PUPPET_STATUS_RE = re.compile(
+    r'^\s*(?P<host>\S+):\s+Currently (?P<state>[^;]+); last completed run')
 
-class Bug566538(GenericTest):
+PUPPET_LAST_RUN_SUMMARY = '/var/lib/puppet/state/last_run_summary.yaml'
+
+# Multipliers of the unit suffixes allowed in puppet duration settings
+PUPPET_DURATION_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400,
+                         'y': 31536000}
+
+LOG_CURSOR_MARKER = "@@LOG_CURSOR@@"
+LOG_EOF_MARKER = "@@LOG_EOF@@"
+
+
+class LogFollower(object):
+    """
+    Follows remote log files, keeping a byte offset and inode per host and
+    file so that every read returns only the bytes appended since the
+    previous one. If the file was rotated in the meantime, the rest of
+    the rotated file is read, found by its inode, before the new file.
+    """
+
+    def __init__(self, run_command):
+        """
+        Args:
+            run_command (callable): given a node and a command, runs the
+                                    command as root and returns
+                                    (stdout, stderr, rc)
+        """
+        self.run_command = run_command
+        self.cursors = {}
+
+    def mark(self, node, path):
+        """
+        Description:
+            Set the cursor of a file to its current end.
+        Args:
+            node (str): node on which the file is
+            path (str): path of the file
+        """
+        std_out, _, rcode = self.run_command(
+            node, "/usr/bin/stat -c '%i %s' {0}".format(path))
+        assert rcode == 0, "Cannot stat {0} on {1}".format(path, node)
+        inode, size = std_out[0].split()
+        self.cursors[(node, path)] = (inode, int(size))
+
+    def _get_read_cmd(self, path, inode, offset):
+        """
+        Description:
+            Command which prints the new cursor of the file followed by
+            the bytes appended since offset. If the file is smaller than
+            offset it was truncated in place (copytruncate) and is read
+            from its start; if the inode changed, the rest of the rotated
+            file is read first, its last line being complete by then. The
+            new cursor is the byte offset just past the last newline read
+            from the current file, so a trailing partial line of it is
+            read again next time. Output always ends with an end marker
+            so that partial line can be told apart from complete ones.
+        """
+        return (
+            "set -- $(/usr/bin/stat -c '%i %s' {0}); _i=$1; _z=$2; "
+            "if [ \"$_i\" = {1} ] && [ \"$_z\" -ge {2} ]; then _o={2}; "
+            "else _o=0; fi; "
+            "_seg() {{ /usr/bin/tail -c +$((_o + 1)) {0} | "
+            "/usr/bin/head -c $((_z - _o)); }}; "
+            "_p=$({{ _seg; echo; }} | /usr/bin/tail -n 1 | /usr/bin/wc -c); "
+            "echo \"{3} $_i $((_z - _p + 1))\"; "
+            "if [ \"$_i\" != {1} ]; then "
+            "_r=$(/usr/bin/find {5} -maxdepth 1 -inum {1} | "
+            "/usr/bin/head -1); "
+            "[ -n \"$_r\" ] && /usr/bin/tail -c +{4} \"$_r\" && "
+            "[ -n \"$(/usr/bin/tail -c 1 \"$_r\")\" ] && echo; "
+            "fi; _seg; echo \"{6}\"".format(
+                path, inode, offset, LOG_CURSOR_MARKER, offset + 1,
+                os.path.dirname(path), LOG_EOF_MARKER))
+
+    def read(self, node, path):
+        """
+        Description:
+            Read the complete lines appended to a file since the last
+            read and advance its cursor. A trailing partial line is left
+            for the next read.
+        Args:
+            node (str): node on which the file is
+            path (str): path of the file, which must have been marked
+        Returns:
+            list. New lines of the file.
+        """
+        inode, offset = self.cursors[(node, path)]
+        std_out, _, rcode = self.run_command(
+            node, self._get_read_cmd(path, inode, offset))
+        assert rcode == 0, "Cannot read {0} on {1}".format(path, node)
+
+        new_inode, cursor = std_out[0].split()[1:]
+        self.cursors[(node, path)] = (new_inode, max(0, int(cursor)))
+        # The last line holds the partial line, if any, and the end marker
+        return std_out[1:-1]
+
+    def wait_for(self, node, path, patterns, timeout_secs=30,
+                 interval_secs=2):
+        """
+        Description:
+            Read new lines from a file until every pattern has matched at
+            least one of them. Each line is checked against all the
+            patterns still outstanding in a single pass.
+        Args:
+            node (str): node on which the file is
+            path (str): path of the file, which must have been marked
+            patterns (list): regular expressions to look for
+            timeout_secs (int): longest time to wait
+            interval_secs (int): time between reads
+        Returns:
+            dict. pattern to the first line it matched; patterns which
+            did not match before the timeout are missing.
+        """
+        outstanding = dict([(pattern, re.compile(pattern))
+                            for pattern in patterns])
+        found = {}
+        deadline = time.time() + timeout_secs
+        while True:
+            for line in self.read(node, path):
+                for pattern, regex in list(outstanding.items()):
+                    if regex.search(line):
+                        found[pattern] = line
+                        del outstanding[pattern]
+            if not outstanding or time.time() > deadline:
+                return found
+            time.sleep(interval_secs)
+
+
+class Bug566538(perf_utils.StepTimingMixin,
+                session_utils.PooledCommandsMixin, GenericTest):
     """
     Bug566538 RHEL7 rsyslog: messages not getting updated; logrotate not
         working
@@ -36,11 +169,24 @@ class Bug566538(GenericTest):
             "storing reload"
         self.node_log_str = ["node1 puppet-agent\\[2302\\]: Caught USR1;",
                              "node2 puppet-agent\\[2305\\]: Caught USR1;"]
+        self.puppet_wait_secs = []
+        self.log_follower = LogFollower(
+            lambda node, cmd: self.run_command(node, cmd, su_root=True))
+        self.open_conn_pool()
+        self.start_timing()
 
     def tearDown(self):
         """ Runs after every single test """
+        self.step_timer.start_step('tearDown')
+        if self.puppet_wait_secs:
+            self.log('info', 'Puppet wait time: {0:.1f} seconds over {1} '
+                     'checks'.format(sum(self.puppet_wait_secs),
+                                     len(self.puppet_wait_secs)))
+        self.log_conn_pool()
+        self.finish_timing()
         super(Bug566538, self).tearDown()
 
+    @perf_utils.timed
     def _force_rotate(self, node, service):
         """
         Description:
@@ -60,64 +206,204 @@ class Bug566538(GenericTest):
         self.assertEquals([], std_out)
         self.assertEquals([], std_err)
 
-    def check_for_puppet_run(self):
-        """
-        The puppet timeout value is triggered from the time the
-        puppet runonce is called. It is not dependent on the
-        mco cycle or puppet_poll_interval. The biggest delay is
-        due to an ongoing puppet run
-        Puppet run interval is 12 minutes
-        """
-        self.log('info',
-                 'Ensuring that puppet is not applying catalog'
-                 'on the MS before running plan')
-        self.wait_for_puppet_idle(self.ms_node, self.ms_node)
-
-        cmd = '/usr/bin/mco puppet status | grep ms1'
-        self.log('info',
-                 'ensuring that there is at least 1 minutes '
-                 'before next scheduled puppet run')
-
-        for _ in range(0, 1):
-            std_out, _, rcode = self.run_command(self.ms_node, cmd)
-            self.assertTrue(rcode == 0,
-                            "Failed to get response from mco puppet status")
-
-            search_pattern = re.compile(r'Currently idling; last completed'
-                                        r' run (\d+) minutes \d+ seconds ago')
-
-            search_result = search_pattern.match(std_out[0])
-            if search_result:
-                elapsed_puppet_time = int(search_result.groups()[-1])
-                if elapsed_puppet_time > 9:
-                    self.log('info',
-                             'Puppet was last executed '
-                             '{0}'.format(elapsed_puppet_time) +
-                             ' minutes ago, sleeping for 180 sec')
-                    time.sleep(180)
-                else:
-                    self.log('info',
-                             'Puppet was last executed '
-                             '{0}'.format(elapsed_puppet_time) +
-                             ' minutes ago, running the plan')
-                    break
-
-    def _get_log_timestamp(self, log):
-        """
-        Description: Get timestamp of log file after logrotate
+    def _get_runinterval(self):
+        """
+        Description:
+            Read the puppet run interval from the MS
+        Returns:
+            int. The run interval in seconds
+        """
+        std_out, _, rcode = self.run_command(
+            self.ms_node, '/usr/bin/puppet config print runinterval',
+            su_root=True)
+        self.assertEqual(0, rcode, "Failed to get the puppet runinterval")
+        interval = re.match(r'^(\d+)([smhdy]?)$', std_out[0].strip())
+        self.assertTrue(interval, "Unexpected puppet runinterval {0}"
+                        .format(std_out[0]))
+        return int(interval.group(1)) * \
+            PUPPET_DURATION_UNITS[interval.group(2)]
+
+    def _get_puppet_states(self):
+        """
+        Description:
+            Read the puppet state of every host managed by the MS in one
+            call
+        Returns:
+            dict. hostname to its state, e.g. "idling"
+        """
+        std_out, _, rcode = self.run_command(
+            self.ms_node, '/usr/bin/mco puppet status', su_root=True)
+        self.assertEqual(0, rcode,
+                         "Failed to get response from mco puppet status")
+        states = {}
+        for line in std_out:
+            status = PUPPET_STATUS_RE.match(line)
+            if status:
+                states[status.group('host')] = status.group('state')
+        return states
+
+    def _get_last_run(self, node):
+        """
+        Description:
+            Read the end time and the duration of the last completed puppet
+            run of a node from its last run summary, along with the node's
+            current time
         Args:
-            log file (str): log queried for timestamp
+            node (str): node filename
+        Returns:
+            dict. now and last_run as epoch seconds, total as the duration
+            of the run in seconds
         """
-        cmd = "stat -c %Y {0}".format(log)
-        stdout, _, _ = self.run_command(self.ms_node, cmd, su_root=True,
+        cmd = "/bin/date +%s; /usr/bin/awk '/^ *[a-z_]+:$/ " \
+              "{{t = ($1 == \"time:\"); next}} t && ($1 == \"last_run:\" " \
+              "|| $1 == \"total:\") {{print $1, $2}}' {0}".format(
+                  PUPPET_LAST_RUN_SUMMARY)
+        std_out, _, rcode = self.run_command(node, cmd, su_root=True)
+        self.assertEqual(0, rcode, "Failed to read {0} on {1}".format(
+            PUPPET_LAST_RUN_SUMMARY, node))
+        last_run = {'now': int(std_out[0])}
+        for line in std_out[1:]:
+            key, value = line.split()
+            last_run[key.rstrip(':')] = float(value)
+        self.assertTrue('last_run' in last_run,
+                        "No last_run in {0} on {1}".format(
+                            PUPPET_LAST_RUN_SUMMARY, node))
+        return last_run
+
+    @perf_utils.timed
+    def _wait_for_new_run(self, node, last_run, timeout_secs=600,
+                          interval_secs=5):
+        """
+        Description:
+            Wait until a node has completed a puppet run after the one
+            ending at last_run, i.e. until last_run changes in its last
+            run summary
+        Args:
+            node (str): node filename
+            last_run (float): last_run before the awaited run
+            timeout_secs (int): longest time to wait
+            interval_secs (int): time between checks
+        """
+        deadline = time.time() + timeout_secs
+        while self._get_last_run(node)['last_run'] == last_run:
+            self.assertTrue(time.time() < deadline,
+                            "No puppet run completed on {0} within {1} "
+                            "seconds".format(node, timeout_secs))
+            time.sleep(interval_secs)
+
+    @perf_utils.timed
+    def check_for_puppet_run(self, nodes=None, window_secs=60, attempts=3):
+        """
+        Description:
+            Make sure puppet is idle on the given nodes and that none of
+            them is scheduled to run puppet within the next window_secs.
+            A run is scheduled runinterval after the start of the previous
+            one, i.e. the last_run of the last run summary less its
+            duration. Nodes with a run in progress have it awaited, nodes
+            with a run due inside the window have one triggered; either way
+            the wait ends when last_run changes on the node and puppet is
+            idle again, after which the window is checked again.
+        Args:
+            nodes (list): node filenames, defaults to the MS
+            window_secs (int): seconds without a scheduled puppet run
+                               needed by the caller
+            attempts (int): number of times puppet is waited for or run
+                            before giving up, the schedule is checked
+                            again after each of them
+        Returns:
+            float. Seconds spent waiting, also appended to
+            self.puppet_wait_secs.
+        """
+        nodes = nodes or [self.ms_node]
+        hosts = dict([(node, self.get_node_att(node, 'hostname'))
+                      for node in nodes])
+        runinterval = self._get_runinterval()
+        start = time.time()
+
+        for attempt in range(attempts + 1):
+            states = self._get_puppet_states()
+            for node in nodes:
+                self.assertTrue(hosts[node] in states,
+                                "No puppet status for {0}".format(
+                                    hosts[node]))
+            last_runs = dict([(node, self._get_last_run(node))
+                              for node in nodes])
+            busy = [node for node in nodes
+                    if states[hosts[node]] != 'idling']
+            due = [node for node in nodes if node not in busy and
+                   last_runs[node]['last_run'] -
+                   last_runs[node].get('total', 0) + runinterval -
+                   last_runs[node]['now'] < window_secs]
+            if not busy and not due:
+                break
+            if attempt == attempts:
+                self.fail("No {0} second window without a puppet run on "
+                          "{1}".format(window_secs, sorted(hosts.values())))
+
+            if busy:
+                self.log('info', 'Puppet busy on {0}, waiting for its run'
+                         .format(busy))
+            if due:
+                self.log('info', 'Puppet run due on {0} in less than {1} '
+                         'seconds, triggering it'.format(due, window_secs))
+                self.run_command(
+                    self.ms_node, '{0} {1}'.format(
+                        self.mco_cmd,
+                        ' '.join(['-I {0}'.format(hosts[node])
+                                  for node in due])),
+                    su_root=True, default_asserts=True)
+            for node in busy + due:
+                self._wait_for_new_run(node, last_runs[node]['last_run'])
+                self.wait_for_puppet_idle(self.ms_node, node)
+
+        waited = time.time() - start
+        self.puppet_wait_secs.append(waited)
+        self.log('info', 'Waited {0:.1f} seconds for a puppet idle window '
+                 'on {1}'.format(waited, sorted(hosts.values())))
+        return waited
+
+    @perf_utils.timed
+    def _stat_files(self, node, paths):
+        """
+        Description:
+            Get the inode, mtime and size of a list of files in one call
+        Args:
+            node (str): node on which the files are
+            paths (list): paths of the files
+        Returns:
+            dict. path to a dict with the inode, mtime and size of the file
+        """
+        cmd = "/usr/bin/stat -c '%n %i %Y %s' {0}".format(' '.join(paths))
+        stdout, _, _ = self.run_command(node, cmd, su_root=True,
                                         default_asserts=True)
-
-        logtime = ''.join(stdout)
-        log_timestamp = int(logtime)
-
-        return log_timestamp
+        stats = {}
+        for line in stdout:
+            path, inode, mtime, size = line.rsplit(None, 3)
+            stats[path] = {'inode': inode, 'mtime': int(mtime),
+                           'size': int(size)}
+        self.assertEqual(sorted(paths), sorted(stats))
+        return stats
+
+    def _assert_rotated(self, node, baseline):
+        """
+        Description:
+            Assert that every file in a baseline taken with _stat_files
+            has since been rotated, i.e. has been replaced by a new file
+            (new inode) which is no older than the one it replaced
+        Args:
+            node (str): node on which the files are
+            baseline (dict): _stat_files result from before the rotation
+        """
+        after = self._stat_files(node, list(baseline))
+        not_rotated = [
+            path for path in sorted(baseline)
+            if after[path]['inode'] == baseline[path]['inode'] or
+            after[path]['mtime'] < baseline[path]['mtime']]
+        self.assertEqual([], not_rotated,
+                         "Files not rotated: {0}".format(not_rotated))
 
     @attr('all', 'revert', 'bug566538', 'bug566538_tc01')
+    @perf_utils.budget(max_calls=300, max_secs=1800)
     def test_01_p_verify_syslog_after_rotate(self):
         """
         @tms_id: torf_566538_tc01
@@ -127,19 +413,18 @@ class Bug566538(GenericTest):
         @tms_test_steps:
             @step: Get list of log files covered by syslog logrotate config
             @result: syslog files returned from model
-            @step: Get current time to allow for filestamp comparison after
-            forcing logrotate
-            @result: Successfully returns time
+            @step: Get inode, mtime and size of the syslog config log files
+            @result: Baseline of the log files returned
             @step: Force a logrotate on syslog
             @result: logrotate runs successfully
-            @step: Get timestamps for syslog config log files
-            @result: syslog timestamps returned
-            @step: Verify logs have been rotated by comparing timestamps
-            @result: Successfully assert log file stamps are newer
+            @step: Verify logs have been rotated by comparing with the
+            baseline
+            @result: Successfully assert log files have new inodes and are
+            no older than before
             @step: Ensure that puppet is not busy
             @result: check on puppet run
-            @step: Determine log position before calling command to write log
-            @result: Log position determined
+            @step: Mark the end of the MS and peer syslogs
+            @result: Log positions determined
             @step: Run a command that writes a message to syslog
             @result: Successfully run 'mco puppet runonce'
             @step: Get timestamp of ms_log_str from log file
@@ -158,60 +443,46 @@ class Bug566538(GenericTest):
 
         stdout, _, _ = self.run_command(self.ms_node, cmd, su_root=True,
                                         default_asserts=True)
-        syslogs_rotated = ''.join(stdout)
+        syslogs_rotated = [path.strip() for path in ''.join(stdout).split(",")
+                           if path.strip()]
 
-        self.log('info', '2. Get current time to allow for filestamp'
-                         'comparison after forcing logrotate')
-        cmd = "date +%s"
-        stdout, _, _ = self.run_command(self.ms_node, cmd, su_root=True,
-                                        default_asserts=True)
-        time_of_logrotate = int(''.join(stdout))
+        self.log('info', '2. Get inode, mtime and size of the syslog config '
+                         'log files')
+        baseline = self._stat_files(self.ms_node, syslogs_rotated)
 
         self.log('info', '3. Force a logrotate on syslog')
         self._force_rotate(self.ms_node, '{0}syslog'.format(
             const.LOGROTATE_PATH))
 
-        self.log('info', '4. Get timestamps for syslog config log files')
-
-        for logfile in syslogs_rotated.split(","):
-            log_ts = self._get_log_timestamp(logfile)
-
-            self.log("info", "5. Verify logs have been rotated by comparing "
-                             "timestamps")
-            self.assertTrue(log_ts > time_of_logrotate)
+        self.log("info", "4. Verify logs have been rotated by comparing "
+                         "with the baseline")
+        self._assert_rotated(self.ms_node, baseline)
 
-        self.log('info', ' 6. Ensure that puppet is not busy')
+        self.log('info', ' 5. Ensure that puppet is not busy')
         self.check_for_puppet_run()
 
-        self.log('info', ' 7. Determine {0} position at the start before'
+        self.log('info', ' 6. Mark the end of {0} on all nodes before'
                  ' calling command to write log.'
                  .format(const.GEN_SYSTEM_LOG_PATH))
-        pos_1 = self.get_file_len(
-            self.ms_node, const.GEN_SYSTEM_LOG_PATH)
+        for node in [self.ms_node] + self.mn_nodes:
+            self.log_follower.mark(node, const.GEN_SYSTEM_LOG_PATH)
 
-        time.sleep(3)
-        self.log('info', ' 8. Run a command that writes a message to syslog')
+        self.log('info', ' 7. Run a command that writes a message to syslog')
         self.run_command(self.ms_node, self.mco_cmd, su_root=True,
                          default_asserts=True)
 
-        self.assertTrue(self.wait_for_log_msg(self.ms_node, self.ms_log_str,
-                                              timeout_sec=30, log_len=pos_1))
+        found = self.log_follower.wait_for(
+            self.ms_node, const.GEN_SYSTEM_LOG_PATH, [self.ms_log_str])
+        self.assertTrue(self.ms_log_str in found)
 
-        self.log('info', ' 9. Get timestamp of ms_log_str from log file')
-        msg_ts = "{0} -n +{1} {2} | {3} \"{4}\" | {5} -F ' ' '{{print $3}}'" \
-                 .format(const.TAIL_PATH, pos_1, const.GEN_SYSTEM_LOG_PATH,
-                         const.GREP_PATH, self.ms_log_str, const.AWK_PATH)
+        self.log('info', ' 8. Get timestamp of ms_log_str from log file')
+        msg_timestamp = found[self.ms_log_str].split()[2]
 
-        timestamp, _, _ = self.run_command(self.ms_node, msg_ts, su_root=True)
-        msg_timestamp = ''.join(timestamp)
-
-        self.log('info', ' 10. Check peer node logs for log message at '
+        self.log('info', ' 9. Check peer node logs for log message at '
                          ' timestamp')
-        for log_msg, node in itertools.izip(self.node_log_str, self.mn_nodes):
-
-            peer_messages = "{0} \"{1} {2}\" {3}" \
-                            .format(const.GREP_PATH, msg_timestamp,
-                                    log_msg, const.GEN_SYSTEM_LOG_PATH)
-
-            self.run_command(node, peer_messages,
-                             su_root=True, default_asserts=True)
+        for log_msg, node in zip(self.node_log_str, self.mn_nodes):
+            peer_msg = "{0} {1}".format(re.escape(msg_timestamp), log_msg)
+            found = self.log_follower.wait_for(
+                node, const.GEN_SYSTEM_LOG_PATH, [peer_msg])
+            self.assertTrue(peer_msg in found,
+                            "{0} not found on {1}".format(peer_msg, node))